@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script para completar os metadados das mídias (tabela memory_media)
+Calcula tamanho, sha256, dimensões e duração dos arquivos gravados em disco
+"""
+
+import os
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.app_factory import create_app
+from src.config import config
+from src.repositories.memory_repository import MemoryRepository
+
+def backfill_media():
+    """Backfill dos metadados de mídia"""
+    print("🔄 Iniciando backfill dos metadados de mídia...")
+    
+    env = os.environ.get('FLASK_ENV', 'development')
+    app = create_app(config.get(env, config['default']))
+    
+    with app.app_context():
+        try:
+            updated = MemoryRepository().backfill_media_metadata()
+            print(f"✅ {updated} mídia(s) atualizada(s)")
+        except Exception as e:
+            print(f"❌ Erro no backfill: {e}")
+            return False
+    
+    return True
+
+if __name__ == "__main__":
+    if backfill_media():
+        print("\n🎉 Backfill concluído!")
+    else:
+        print("\n💥 Falha no backfill dos metadados de mídia.")
+        sys.exit(1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script para preencher as colunas espaciais (lat_e7/lng_e7) de memórias antigas
+Necessário para que memórias criadas antes do índice apareçam em /nearby
+"""
+
+import os
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.app_factory import create_app
+from src.config import config
+from src.repositories.memory_repository import MemoryRepository
+
+def backfill_spatial():
+    """Backfill das coordenadas E7"""
+    print("🔄 Iniciando backfill das coordenadas E7...")
+    
+    env = os.environ.get('FLASK_ENV', 'development')
+    app = create_app(config.get(env, config['default']))
+    
+    with app.app_context():
+        try:
+            updated = MemoryRepository().backfill_spatial_columns()
+            print(f"✅ {updated} memória(s) atualizada(s)")
+        except Exception as e:
+            print(f"❌ Erro no backfill: {e}")
+            return False
+    
+    return True
+
+if __name__ == "__main__":
+    if backfill_spatial():
+        print("\n🎉 Backfill concluído!")
+    else:
+        print("\n💥 Falha no backfill das coordenadas.")
+        sys.exit(1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização da listagem de memórias (to_dict + resposta JSON)
+Compara o caminho anterior (to_dict por coluna + json padrão) com o atual
+(serializador pré-compilado + FastJSONProvider)
+
+Uso: python bench_serialization.py [quantidade de memórias]
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from flask.json.provider import DefaultJSONProvider
+
+from src.app_factory import create_app
+from src.config import Config
+from src.models import Memory
+from src.utils.helpers import serialize_memory_dict
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+def build_memories(count):
+    """Memórias em memória (sem banco): mede apenas a serialização"""
+    now = datetime.utcnow()
+    memories = []
+    for i in range(count):
+        memory = Memory(
+            title=f'Memória {i}', description='Descrição ' * 20, date=date(2024, 1, 1) + timedelta(days=i % 365),
+            lat=-23.5 + i * 1e-4, lng=-46.6 + i * 1e-4, color='#FF6B6B', user_id=1, spotify_url=None,
+            photos=[f'/api/media/files/1/memory_{i}/photos/a.jpg', f'/api/media/files/1/memory_{i}/videos/b.mp4'],
+            music={'title': 'Música', 'artist': 'Artista', 'spotify_id': 'abc'}
+        )
+        memory.id, memory.created_at, memory.updated_at = i + 1, now, now
+        memories.append(memory)
+    return memories
+
+def legacy_to_dict(memory):
+    """to_dict anterior: getattr por coluna a cada linha"""
+    data = {column.name: getattr(memory, column.name) for column in memory.__table__.columns}
+    return serialize_memory_dict(data)
+
+def measure(label, memories, to_dict, provider):
+    start = time.perf_counter()
+    response = provider.response({'memories': [to_dict(m) for m in memories], 'total': len(memories)})
+    elapsed = time.perf_counter() - start
+    print(f'{label:<10} {len(memories) / elapsed:>12,.0f} linhas/s  ({len(response.get_data()):,} bytes)')
+    return response
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = create_app(BenchConfig)
+    with app.app_context():
+        memories = build_memories(count)
+        print(f'📊 Serializando {count} memórias')
+        for _ in range(3):
+            before = measure('antes', memories, legacy_to_dict, DefaultJSONProvider(app))
+            after = measure('depois', memories, Memory.to_dict, app.json)
+        assert app.json.loads(before.get_data()) == app.json.loads(after.get_data())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+# ============================================
+# GUNICORN
+# Configuração do servidor WSGI (Procfile: gunicorn -c gunicorn.conf.py app:app)
+# ============================================
+
+"""
+Hooks do gunicorn para os recursos mantidos por processo.
+
+post_worker_init roda em cada worker depois de carregar a aplicação
+(create_app já aplicou a configuração) e antes das threads de requisição.
+"""
+
+def post_worker_init(worker):
+    # Pool de hash de senhas pronto antes da primeira requisição deste worker
+    from src.utils.password_hasher import password_hasher
+    password_hasher.start()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Script para migrar mídias legadas em base64 para arquivos no disco
+Substitui data URLs da coluna photos por URLs de /api/media
+"""
+
+import os
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.app_factory import create_app
+from src.config import config
+from src.repositories.memory_repository import MemoryRepository
+
+def migrate_media():
+    """Migração das mídias inline"""
+    print("🔄 Iniciando migração de mídias inline...")
+    
+    env = os.environ.get('FLASK_ENV', 'development')
+    app = create_app(config.get(env, config['default']))
+    
+    with app.app_context():
+        try:
+            migrated = MemoryRepository().externalize_inline_media()
+            print(f"✅ {migrated} memória(s) migrada(s) para o armazenamento em disco")
+        except Exception as e:
+            print(f"❌ Erro ao migrar mídias: {e}")
+            return False
+    
+    return True
+
+if __name__ == "__main__":
+    if migrate_media():
+        print("\n🎉 Migração concluída!")
+    else:
+        print("\n💥 Falha na migração de mídias.")
+        sys.exit(1)
@@ -0,0 +1,99 @@
+"""Esquema inicial (users, memories, themes)
+
+Bancos criados por db.create_all() antes das migrações já têm estas tabelas e
+não têm alembic_version: a revisão adota as tabelas existentes em vez de
+recriá-las, então `flask db upgrade` funciona neles sem `stamp` prévio.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    if op.get_context().as_sql:
+        return set()  # Modo offline (--sql): sem banco para inspecionar
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    existing = _existing_tables()
+
+    if 'users' not in existing:
+        _create_users()
+    if 'memories' not in existing:
+        _create_memories()
+    if 'themes' not in existing:
+        _create_themes()
+
+
+def _create_users():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=128), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('selected_gradient', sa.String(length=50), nullable=False),
+        sa.Column('theme_preference', sa.String(length=20), nullable=False),
+        sa.Column('map_theme', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+
+def _create_memories():
+    op.create_table(
+        'memories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('date', sa.String(length=10), nullable=False),
+        sa.Column('lat', sa.Float(), nullable=False),
+        sa.Column('lng', sa.Float(), nullable=False),
+        sa.Column('photos', sa.JSON(), nullable=True),
+        sa.Column('music', sa.JSON(), nullable=True),
+        sa.Column('spotify_url', sa.String(length=500), nullable=True),
+        sa.Column('color', sa.String(length=7), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def _create_themes():
+    op.create_table(
+        'themes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('gradient_name', sa.String(length=50), nullable=False),
+        sa.Column('gradient_css', sa.Text(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('themes')
+    op.drop_table('memories')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,66 @@
+"""Colunas de versão/coordenadas E7 e índices compostos de memórias
+
+Revision ID: 0002_memory_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_memory_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# Caminhos quentes: listagem/contagem por usuário e período (user_id, date, id)
+# e o pré-filtro espacial por caixa envolvente (user_id, lat_e7, lng_e7)
+MEMORY_INDEXES = [
+    ('ix_memories_user_date_id', ['user_id', 'date', 'id']),
+    ('ix_memories_user_lat_lng_e7', ['user_id', 'lat_e7', 'lng_e7']),
+]
+
+
+def _columns(table):
+    if op.get_context().as_sql:
+        return set()  # Modo offline (--sql): sem banco para inspecionar
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    if op.get_context().as_sql:
+        return set()
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    # As verificações permitem adotar bancos criados por db.create_all() em
+    # versões intermediárias (colunas/índices que já existam são mantidos)
+    if 'memories_version' not in _columns('users'):
+        # Default constante: no Postgres 11+ não reescreve a tabela
+        op.add_column('users', sa.Column('memories_version', sa.Integer(), server_default='0', nullable=False))
+
+    memory_columns = _columns('memories')
+    for name in ('lat_e7', 'lng_e7'):
+        if name not in memory_columns:
+            op.add_column('memories', sa.Column(name, sa.Integer(), nullable=True))
+
+    existing = _indexes('memories')
+    # Fora da transação: no Postgres os índices são criados CONCURRENTLY,
+    # sem bloquear escritas na tabela durante a construção
+    with op.get_context().autocommit_block():
+        for name, columns in MEMORY_INDEXES:
+            if name not in existing:
+                op.create_index(name, 'memories', columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    for name, _ in reversed(MEMORY_INDEXES):
+        op.drop_index(name, table_name='memories')
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.drop_column('lng_e7')
+        batch_op.drop_column('lat_e7')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('memories_version')
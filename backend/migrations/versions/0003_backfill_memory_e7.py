@@ -0,0 +1,49 @@
+"""Backfill de lat_e7/lng_e7 em lotes curtos
+
+Revision ID: 0003_backfill_memory_e7
+Revises: 0002_memory_indexes
+Create Date: 2026-10-18 09:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_backfill_memory_e7'
+down_revision = '0002_memory_indexes'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+BACKFILL = sa.text(
+    "UPDATE memories "
+    "SET lat_e7 = CAST(ROUND(lat * 10000000) AS INTEGER), "
+    "lng_e7 = CAST(ROUND(lng * 10000000) AS INTEGER) "
+    "WHERE id >= :start AND id < :end AND (lat_e7 IS NULL OR lng_e7 IS NULL)"
+)
+
+
+def upgrade():
+    if op.get_context().as_sql:
+        # Modo offline: um único UPDATE no script gerado
+        op.execute(
+            "UPDATE memories SET lat_e7 = CAST(ROUND(lat * 10000000) AS INTEGER), "
+            "lng_e7 = CAST(ROUND(lng * 10000000) AS INTEGER) "
+            "WHERE lat_e7 IS NULL OR lng_e7 IS NULL"
+        )
+        return
+
+    bind = op.get_bind()
+    # Cada lote (faixa de ids pela chave primária) é um UPDATE curto com
+    # commit próprio, então nenhum lock é mantido sobre a tabela inteira
+    with op.get_context().autocommit_block():
+        max_id = bind.execute(sa.text("SELECT MAX(id) FROM memories")).scalar() or 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            bind.execute(BACKFILL, {'start': start, 'end': start + BATCH_SIZE})
+
+
+def downgrade():
+    # Dados derivados de lat/lng: nada a desfazer
+    pass
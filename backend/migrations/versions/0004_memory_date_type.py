@@ -0,0 +1,156 @@
+"""Converte memories.date de VARCHAR(10) para DATE
+
+Revision ID: 0004_memory_date_type
+Revises: 0003_backfill_memory_e7
+Create Date: 2026-10-18 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.helpers import parse_date
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_memory_date_type'
+down_revision = '0003_backfill_memory_e7'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+MAX_REPORTED_IDS = 50
+
+# Conversão por dialeto: no SQLite o tipo Date do SQLAlchemy já é armazenado
+# como texto ISO (YYYY-MM-DD), então basta copiar o valor
+COPY_EXPRESSION = {
+    'postgresql': 'CAST(date AS DATE)',
+    'sqlite': 'substr(date, 1, 10)',
+}
+
+
+def _date_is_converted():
+    columns = sa.inspect(op.get_bind()).get_columns('memories')
+    date_type = next(column['type'] for column in columns if column['name'] == 'date')
+    return isinstance(date_type, sa.Date)
+
+
+def _normalize_dates(bind):
+    """
+    Valida as datas legadas (texto livre, sem checagem de formato) antes da troca
+
+    Valores com prefixo YYYY-MM-DD válido (ex: '2024-01-10T12:00', com espaços)
+    são regravados como YYYY-MM-DD. Os demais (ex: '10/01/2024', ordem de dia e
+    mês ambígua) interrompem a migração com a lista de ids, para correção manual:
+    no SQLite virariam um DATE ilegível pelo SQLAlchemy e no Postgres o CAST
+    falharia no meio da cópia.
+    """
+    invalid = []
+    last_id = 0
+    select = sa.text("SELECT id, date FROM memories WHERE id > :last ORDER BY id LIMIT :limit")
+    while True:
+        rows = bind.execute(select, {'last': last_id, 'limit': BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        for memory_id, value in rows:
+            try:
+                normalized = parse_date(value.strip()[:10]).isoformat()
+            except (AttributeError, ValueError):
+                invalid.append(memory_id)
+                continue
+            if normalized != value:
+                bind.execute(sa.text("UPDATE memories SET date = :date WHERE id = :id"),
+                             {'date': normalized, 'id': memory_id})
+        last_id = rows[-1][0]
+
+    if invalid:
+        shown = ', '.join(str(memory_id) for memory_id in invalid[:MAX_REPORTED_IDS])
+        more = f' e mais {len(invalid) - MAX_REPORTED_IDS}' if len(invalid) > MAX_REPORTED_IDS else ''
+        raise RuntimeError(
+            f'{len(invalid)} memória(s) com data fora do formato YYYY-MM-DD (ids: {shown}{more}); '
+            'corrija memories.date dessas linhas e rode a migração novamente'
+        )
+
+
+def _backfill(bind, copy):
+    if op.get_context().as_sql:
+        op.execute(copy.bindparams(start=0, end=2 ** 31 - 1))
+        return
+    # Lotes por faixa de id (chave primária), cada um com commit próprio
+    max_id = bind.execute(sa.text("SELECT MAX(id) FROM memories")).scalar() or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        bind.execute(copy, {'start': start, 'end': start + BATCH_SIZE})
+
+
+def upgrade():
+    """
+    Troca de tipo sem reescrever a tabela sob lock exclusivo:
+
+    0. Normaliza ou recusa datas fora do formato YYYY-MM-DD (_normalize_dates)
+    1. Adiciona a coluna nova (nullable, sem default: operação só de catálogo)
+    2. Copia os valores em lotes por faixa de id, cada um com commit próprio
+    3. Troca as colunas (remove a antiga e renomeia a nova) e recria o índice
+
+    No Postgres, um trigger mantém a coluna nova preenchida para escritas
+    concorrentes durante a cópia, e NOT NULL e o índice são preparados antes
+    da troca (CHECK validada sem bloquear escritas, índice CONCURRENTLY), então
+    a transação final só altera o catálogo. No SQLite a troca usa o batch mode
+    do Alembic (recriação da tabela).
+    """
+    bind = op.get_bind()
+    if not op.get_context().as_sql and _date_is_converted():
+        # Banco criado por db.create_all() já com o tipo DATE
+        return
+
+    if not op.get_context().as_sql:
+        # Modo offline (--sql) não tem como ler as linhas: validar antes de gerar o script
+        _normalize_dates(bind)
+
+    dialect = bind.dialect.name
+    op.add_column('memories', sa.Column('date_value', sa.Date(), nullable=True))
+    copy = sa.text(
+        f"UPDATE memories SET date_value = {COPY_EXPRESSION.get(dialect, 'CAST(date AS DATE)')} "
+        "WHERE id >= :start AND id < :end AND date_value IS NULL"
+    )
+
+    if dialect != 'postgresql':
+        with op.get_context().autocommit_block():
+            _backfill(bind, copy)
+        op.drop_index('ix_memories_user_date_id', table_name='memories')
+        with op.batch_alter_table('memories') as batch_op:
+            batch_op.drop_column('date')
+            batch_op.alter_column('date_value', new_column_name='date', existing_type=sa.Date(), nullable=False)
+        op.create_index('ix_memories_user_date_id', 'memories', ['user_id', 'date', 'id'])
+        return
+
+    op.execute(
+        "CREATE FUNCTION memories_sync_date_value() RETURNS trigger AS $$ "
+        "BEGIN NEW.date_value := CAST(NEW.date AS DATE); RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER memories_sync_date_value BEFORE INSERT OR UPDATE OF date ON memories "
+        "FOR EACH ROW EXECUTE FUNCTION memories_sync_date_value()"
+    )
+    with op.get_context().autocommit_block():
+        _backfill(bind, copy)
+        # CHECK NOT VALID é instantânea; VALIDATE só usa SHARE UPDATE EXCLUSIVE
+        op.execute("ALTER TABLE memories ADD CONSTRAINT ck_memories_date_value_not_null "
+                   "CHECK (date_value IS NOT NULL) NOT VALID")
+        op.execute("ALTER TABLE memories VALIDATE CONSTRAINT ck_memories_date_value_not_null")
+        op.create_index('ix_memories_user_date_value_id', 'memories', ['user_id', 'date_value', 'id'],
+                        postgresql_concurrently=True)
+
+    # Troca: apenas catálogo (SET NOT NULL aproveita a CHECK validada, Postgres 12+)
+    op.execute("DROP TRIGGER memories_sync_date_value ON memories")
+    op.execute("DROP FUNCTION memories_sync_date_value()")
+    op.drop_column('memories', 'date')  # remove também o índice antigo
+    op.alter_column('memories', 'date_value', new_column_name='date', nullable=False)
+    op.drop_constraint('ck_memories_date_value_not_null', 'memories', type_='check')
+    op.execute("ALTER INDEX ix_memories_user_date_value_id RENAME TO ix_memories_user_date_id")
+
+
+def downgrade():
+    op.drop_index('ix_memories_user_date_id', table_name='memories')
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.alter_column('date', existing_type=sa.Date(), type_=sa.String(length=10),
+                              existing_nullable=False, postgresql_using='CAST(date AS VARCHAR(10))')
+    op.create_index('ix_memories_user_date_id', 'memories', ['user_id', 'date', 'id'])
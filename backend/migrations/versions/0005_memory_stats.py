@@ -0,0 +1,51 @@
+"""Tabela memory_stats (agregados de memórias por usuário)
+
+Revision ID: 0005_memory_stats
+Revises: 0004_memory_date_type
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_memory_stats'
+down_revision = '0004_memory_date_type'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sem backfill: os agregados de cada usuário são calculados no primeiro
+    # acesso (MemoryRepository.get_stats / primeira escrita)
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('memory_stats'):
+        return  # Já criada por db.create_all()
+    op.create_table(
+        'memory_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_memories', sa.Integer(), nullable=False),
+        sa.Column('monthly_counts', sa.JSON(), nullable=False),
+        sa.Column('photo_count', sa.Integer(), nullable=False),
+        sa.Column('video_count', sa.Integer(), nullable=False),
+        sa.Column('music_count', sa.Integer(), nullable=False),
+        sa.Column('min_lat', sa.Float(), nullable=True),
+        sa.Column('max_lat', sa.Float(), nullable=True),
+        sa.Column('min_lng', sa.Float(), nullable=True),
+        sa.Column('max_lng', sa.Float(), nullable=True),
+        sa.Column('first_date', sa.Date(), nullable=True),
+        sa.Column('last_date', sa.Date(), nullable=True),
+        sa.Column('sum_x', sa.Float(), nullable=False),
+        sa.Column('sum_y', sa.Float(), nullable=False),
+        sa.Column('sum_z', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('memory_stats')
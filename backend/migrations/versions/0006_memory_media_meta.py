@@ -0,0 +1,25 @@
+"""Revisão vazia: metadados de mídia ficam em memory_media (0007)
+
+Revision ID: 0006_memory_media_meta
+Revises: 0005_memory_stats
+Create Date: 2026-10-18 11:00:00
+
+"""
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_memory_media_meta'
+down_revision = '0005_memory_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A coluna memories.media_meta foi substituída pelas linhas de memory_media
+    # antes de ser liberada: não é criada (evita reescrever memories duas vezes
+    # no SQLite). A revisão continua na cadeia para bancos já marcados nela.
+    pass
+
+
+def downgrade():
+    pass
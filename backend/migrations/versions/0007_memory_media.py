@@ -0,0 +1,107 @@
+"""Tabela memory_media (mídias normalizadas) a partir da coluna photos
+
+Revision ID: 0007_memory_media
+Revises: 0006_memory_media_meta
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_memory_media'
+down_revision = '0006_memory_media_meta'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+# Mesma regra de helpers.is_video_media: data URLs pelo cabeçalho, demais URLs
+# pela extensão ou pela pasta /videos/ (sem LIKE: '%' seria duplicado no --sql)
+KIND_SQL = (
+    "CASE WHEN lower(substr({v}, 1, 5)) = 'data:' "
+    "THEN (CASE WHEN lower(substr({v}, 6, 6)) = 'video/' THEN 'video' ELSE 'photo' END) "
+    "WHEN lower(substr({v}, length({v}) - 3)) IN ('.mp4', '.mov', '.avi', '.mkv', '.m4v') "
+    "OR lower(substr({v}, length({v}) - 4)) = '.webm' "
+    "OR {find}(lower({v}), '/videos/') > 0 THEN 'video' ELSE 'photo' END"
+)
+
+# Uma linha por item textual de photos, com a posição na lista; memórias que
+# já têm mídias (gravadas pela aplicação nova ou por um lote anterior) são puladas
+BACKFILL = {
+    'sqlite': (
+        "INSERT INTO memory_media (memory_id, kind, url, position, created_at, updated_at) "
+        "SELECT m.id, " + KIND_SQL.format(v='j.value', find='instr') + ", j.value, CAST(j.key AS INTEGER), "
+        "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM memories m, json_each(m.photos) j "
+        "WHERE {where} AND json_type(m.photos) = 'array' AND j.type = 'text' "
+        "AND NOT EXISTS (SELECT 1 FROM memory_media mm WHERE mm.memory_id = m.id)"
+    ),
+    'postgresql': (
+        "INSERT INTO memory_media (memory_id, kind, url, position, created_at, updated_at) "
+        "SELECT m.id, " + KIND_SQL.format(v="(e.item #>> '{{}}')", find='strpos') + ", e.item #>> '{{}}', "
+        "e.ordinality - 1, now(), now() "
+        "FROM memories m CROSS JOIN LATERAL json_array_elements("
+        "CASE WHEN json_typeof(m.photos::json) = 'array' THEN m.photos::json ELSE '[]'::json END"
+        ") WITH ORDINALITY AS e(item, ordinality) "
+        "WHERE {where} AND json_typeof(e.item) = 'string' "
+        "AND NOT EXISTS (SELECT 1 FROM memory_media mm WHERE mm.memory_id = m.id)"
+    ),
+}
+
+
+def _columns(table):
+    if op.get_context().as_sql:
+        return set()  # Modo offline (--sql): sem banco para inspecionar
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    context = op.get_context()
+    if context.as_sql or not sa.inspect(op.get_bind()).has_table('memory_media'):
+        op.create_table(
+            'memory_media',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('memory_id', sa.Integer(), nullable=False),
+            sa.Column('kind', sa.String(length=10), nullable=False),
+            sa.Column('url', sa.Text(), nullable=False),
+            sa.Column('mime', sa.String(length=100), nullable=True),
+            sa.Column('bytes', sa.BigInteger(), nullable=True),
+            sa.Column('width', sa.Integer(), nullable=True),
+            sa.Column('height', sa.Integer(), nullable=True),
+            sa.Column('duration', sa.Float(), nullable=True),
+            sa.Column('sha256', sa.String(length=64), nullable=True),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['memory_id'], ['memories.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_memory_media_memory_position', 'memory_media', ['memory_id', 'position'])
+
+    # Só tipo, URL e posição: mime, tamanho, sha256, dimensões e duração são
+    # completados por backfill_media.py (lê os arquivos, com a aplicação no ar)
+    backfill = BACKFILL.get(context.dialect.name, BACKFILL['postgresql'])
+    if context.as_sql:
+        op.execute(backfill.format(where='TRUE'))
+    else:
+        bind = op.get_bind()
+        # Lotes por faixa de id com commit próprio (sem lock longo em memories)
+        with context.autocommit_block():
+            max_id = bind.execute(sa.text("SELECT MAX(id) FROM memories")).scalar() or 0
+            for start in range(0, max_id + 1, BATCH_SIZE):
+                bind.execute(
+                    sa.text(backfill.format(where='m.id >= :start AND m.id < :end')),
+                    {'start': start, 'end': start + BATCH_SIZE}
+                )
+
+    # Bancos que rodaram a primeira versão de 0006 ainda têm memories.media_meta
+    if 'media_meta' in _columns('memories'):
+        with op.batch_alter_table('memories') as batch_op:
+            batch_op.drop_column('media_meta')
+
+
+def downgrade():
+    op.drop_index('ix_memory_media_memory_position', table_name='memory_media')
+    op.drop_table('memory_media')
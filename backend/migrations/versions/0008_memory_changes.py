@@ -0,0 +1,54 @@
+"""Índice de sincronização (user_id, updated_at, id) e tabela memory_tombstones
+
+Revision ID: 0008_memory_changes
+Revises: 0007_memory_media
+Create Date: 2026-10-18 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_memory_changes'
+down_revision = '0007_memory_media'
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    if op.get_context().as_sql:
+        return None  # Modo offline (--sql): sem banco para inspecionar
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    # Sem backfill: remoções anteriores a esta versão não têm tombstone, e
+    # clientes sem token fazem a sincronização inicial completa
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table('memory_tombstones'):
+        op.create_table(
+            'memory_tombstones',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('memory_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_memory_tombstones_user_id_id', 'memory_tombstones', ['user_id', 'id'])
+
+    existing = set() if inspector is None else {index['name'] for index in inspector.get_indexes('memories')}
+    if 'ix_memories_user_updated_id' not in existing:
+        # Fora da transação: no Postgres o índice é criado CONCURRENTLY,
+        # sem bloquear escritas na tabela durante a construção
+        with op.get_context().autocommit_block():
+            op.create_index('ix_memories_user_updated_id', 'memories', ['user_id', 'updated_at', 'id'],
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    op.drop_index('ix_memories_user_updated_id', table_name='memories')
+    op.drop_index('ix_memory_tombstones_user_id_id', table_name='memory_tombstones')
+    op.drop_table('memory_tombstones')
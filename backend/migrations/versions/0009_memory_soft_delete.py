@@ -0,0 +1,49 @@
+"""Remoção lógica de memórias (deleted_at) e índice parcial do expurgo
+
+Revision ID: 0009_memory_soft_delete
+Revises: 0008_memory_changes
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_memory_soft_delete'
+down_revision = '0008_memory_changes'
+branch_labels = None
+depends_on = None
+
+PURGE_WHERE = sa.text('deleted_at IS NOT NULL')
+
+
+def _inspector():
+    if op.get_context().as_sql:
+        return None  # Modo offline (--sql): sem banco para inspecionar
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    inspector = _inspector()
+    columns = set() if inspector is None else {column['name'] for column in inspector.get_columns('memories')}
+    if 'deleted_at' not in columns:
+        # Coluna anulável sem default: no Postgres não reescreve a tabela
+        op.add_column('memories', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    indexes = set() if inspector is None else {index['name'] for index in inspector.get_indexes('memories')}
+    if 'ix_memories_deleted_at' not in indexes:
+        # Índice parcial (vazio no momento da criação); CONCURRENTLY no Postgres
+        with op.get_context().autocommit_block():
+            op.create_index('ix_memories_deleted_at', 'memories', ['deleted_at'],
+                            postgresql_where=PURGE_WHERE, sqlite_where=PURGE_WHERE,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    # Memórias ainda não expurgadas continuariam visíveis sem a coluna
+    op.execute('DELETE FROM memory_media WHERE memory_id IN (SELECT id FROM memories WHERE deleted_at IS NOT NULL)')
+    op.execute('DELETE FROM memories WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_memories_deleted_at', table_name='memories')
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,40 @@
+"""Tabela token_blocklist (tokens JWT revogados no logout)
+
+Revision ID: 0010_token_blocklist
+Revises: 0009_memory_soft_delete
+Create Date: 2026-10-18 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_token_blocklist'
+down_revision = '0009_memory_soft_delete'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('token_blocklist'):
+        return  # Já criada por db.create_all()
+    op.create_table(
+        'token_blocklist',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jti')
+    )
+    op.create_index('ix_token_blocklist_created_at', 'token_blocklist', ['created_at'])
+    op.create_index('ix_token_blocklist_expires_at', 'token_blocklist', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_token_blocklist_expires_at', table_name='token_blocklist')
+    op.drop_index('ix_token_blocklist_created_at', table_name='token_blocklist')
+    op.drop_table('token_blocklist')
@@ -0,0 +1,82 @@
+"""Coluna users.email_normalized (busca de email sem diferenciar maiúsculas)
+
+Revision ID: 0011_user_email_normalized
+Revises: 0010_token_blocklist
+Create Date: 2026-10-18 16:00:00
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_user_email_normalized'
+down_revision = '0010_token_blocklist'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Mesmo logger das mensagens do Alembic ("Running upgrade ..."), configurado pelo alembic.ini
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def _normalize(email):
+    # Mesma regra de src.utils.helpers.normalize_email (migração não importa o app)
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def _backfill(bind):
+    # Contas que diferem apenas em maiúsculas/espaços: a conta cujo email já está
+    # na forma canônica (ou a mais antiga) recebe email_normalized; as demais
+    # ficam com NULL e continuam acessíveis pelo email exato
+    owners = {}
+    user_ids = []
+    for user_id, email in bind.execute(sa.text('SELECT id, email FROM users ORDER BY id')):
+        user_ids.append(user_id)
+        normalized = _normalize(email)
+        rank = (email != normalized, user_id)
+        if normalized not in owners or rank < owners[normalized][0]:
+            owners[normalized] = (rank, user_id)
+
+    rows = [{'id': user_id, 'normalized': normalized} for normalized, (_, user_id) in owners.items()]
+    statement = sa.text('UPDATE users SET email_normalized = :normalized WHERE id = :id')
+    for start in range(0, len(rows), BATCH_SIZE):
+        bind.execute(statement, rows[start:start + BATCH_SIZE])
+
+    kept = {row['id'] for row in rows}
+    duplicates = [user_id for user_id in user_ids if user_id not in kept]
+    if duplicates:
+        logger.warning('0011: %d conta(s) duplicada(s) por maiúsculas mantida(s) sem email_normalized (ids: %s)',
+                       len(duplicates), ', '.join(str(user_id) for user_id in duplicates))
+
+
+def upgrade():
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(op.get_bind())
+    if inspector is None or 'email_normalized' not in {c['name'] for c in inspector.get_columns('users')}:
+        op.add_column('users', sa.Column('email_normalized', sa.String(length=120), nullable=True))
+
+    if offline:
+        # Modo --sql: aproximação em SQL (lower() do banco) mantendo a conta mais antiga
+        op.execute(
+            "UPDATE users SET email_normalized = lower(trim(email)) WHERE id IN ("
+            "SELECT min(id) FROM users GROUP BY lower(trim(email)))"
+        )
+    else:
+        _backfill(op.get_bind())
+
+    indexes = set() if inspector is None else {index['name'] for index in inspector.get_indexes('users')}
+    if 'ix_users_email_normalized' not in indexes:
+        # Fora da transação (o backfill é confirmado antes); CONCURRENTLY no Postgres
+        with op.get_context().autocommit_block():
+            op.create_index('ix_users_email_normalized', 'users', ['email_normalized'], unique=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_normalized', table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('email_normalized')
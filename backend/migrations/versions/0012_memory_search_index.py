@@ -0,0 +1,82 @@
+"""Índice de busca textual (FTS5 / tsvector) criado e populado por migração
+
+Revision ID: 0012_memory_search_index
+Revises: 0011_user_email_normalized
+Create Date: 2026-10-18 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils import search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_memory_search_index'
+down_revision = '0011_user_email_normalized'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Modo offline: sem normalize_text no SQL (o FTS5 remove acentos no tokenizer;
+# no Postgres só minúsculas)
+OFFLINE_BACKFILL = {
+    'sqlite': (
+        f"INSERT INTO {search_index.SQLITE_TABLE} (rowid, title, description, owner) "
+        "SELECT id, lower(title), lower(coalesce(description, '')), 'u' || user_id "
+        "FROM memories WHERE deleted_at IS NULL"
+    ),
+    'postgresql': (
+        f"INSERT INTO {search_index.POSTGRES_TABLE} (memory_id, user_id, document) "
+        "SELECT id, user_id, setweight(to_tsvector('simple', lower(title)), 'A') || "
+        "setweight(to_tsvector('simple', lower(coalesce(description, ''))), 'B') "
+        "FROM memories WHERE deleted_at IS NULL "
+        "ON CONFLICT (memory_id) DO NOTHING"
+    ),
+}
+
+
+def upgrade():
+    context = op.get_context()
+    dialect = context.dialect.name
+    if dialect not in OFFLINE_BACKFILL:
+        return  # Busca por LIKE (src.utils.search_index) dispensa índice
+
+    if context.as_sql:
+        if dialect == 'sqlite':
+            op.execute(f'DROP TABLE IF EXISTS {search_index.SQLITE_TABLE}')
+        for statement in search_index.create_statements(dialect):
+            op.execute(statement)
+        op.execute(OFFLINE_BACKFILL[dialect])
+        return
+
+    bind = op.get_bind()
+    if search_index.search_index_exists(bind):
+        if dialect == 'postgresql':
+            return  # Estrutura inalterada, já mantida pelas escritas
+        # FTS5 criado na inicialização por versões anteriores (user_id UNINDEXED):
+        # recriado com o dono indexado
+        search_index.drop_search_index(bind)
+    search_index.create_search_index(bind)
+
+    # Lotes por id com commit próprio: nenhuma transação longa sobre memories
+    select = sa.text(
+        "SELECT id, user_id, title, description FROM memories "
+        "WHERE id > :last_id AND deleted_at IS NULL ORDER BY id LIMIT :limit"
+    )
+    with context.autocommit_block():
+        last_id = 0
+        while True:
+            rows = bind.execute(select, {'last_id': last_id, 'limit': BATCH_SIZE}).all()
+            if not rows:
+                break
+            search_index.insert_documents(bind, [tuple(row) for row in rows])
+            last_id = rows[-1][0]
+
+
+def downgrade():
+    dialect = op.get_context().dialect.name
+    if dialect in OFFLINE_BACKFILL:
+        table = search_index.POSTGRES_TABLE if dialect == 'postgresql' else search_index.SQLITE_TABLE
+        op.execute(f'DROP TABLE IF EXISTS {table}')
@@ -0,0 +1,50 @@
+"""Versão de sincronização das memórias (sync_version) e índice do /changes
+
+Revision ID: 0013_memory_sync_version
+Revises: 0012_memory_search_index
+Create Date: 2026-10-18 18:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013_memory_sync_version'
+down_revision = '0012_memory_search_index'
+branch_labels = None
+depends_on = None
+
+
+def _inspector():
+    if op.get_context().as_sql:
+        return None  # Modo offline (--sql): sem banco para inspecionar
+    return sa.inspect(op.get_bind())
+
+
+def upgrade():
+    # Sem backfill: linhas existentes ficam na versão 0 (anteriores a qualquer
+    # token novo); tokens antigos recomeçam do início
+    inspector = _inspector()
+    columns = set() if inspector is None else {column['name'] for column in inspector.get_columns('memories')}
+    if 'sync_version' not in columns:
+        # Default constante: no Postgres (11+) não reescreve a tabela
+        op.add_column('memories', sa.Column('sync_version', sa.Integer(), server_default='0', nullable=False))
+
+    indexes = set() if inspector is None else {index['name'] for index in inspector.get_indexes('memories')}
+    with op.get_context().autocommit_block():
+        if 'ix_memories_user_sync_version_id' not in indexes:
+            op.create_index('ix_memories_user_sync_version_id', 'memories', ['user_id', 'sync_version', 'id'],
+                            postgresql_concurrently=True)
+        if inspector is None or 'ix_memories_user_updated_id' in indexes:
+            # Substituído pelo índice acima: não precisa mais ser mantido a cada escrita
+            op.drop_index('ix_memories_user_updated_id', table_name='memories', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_memories_user_updated_id', 'memories', ['user_id', 'updated_at', 'id'],
+                        postgresql_concurrently=True)
+    op.drop_index('ix_memories_user_sync_version_id', table_name='memories')
+    with op.batch_alter_table('memories') as batch_op:
+        batch_op.drop_column('sync_version')
@@ -0,0 +1,37 @@
+"""Tabela login_attempts (limite de tentativas de login compartilhado entre workers)
+
+Revision ID: 0014_login_attempts
+Revises: 0013_memory_sync_version
+Create Date: 2026-10-18 19:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014_login_attempts'
+down_revision = '0013_memory_sync_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('login_attempts'):
+        return  # Já criada por db.create_all()
+    op.create_table(
+        'login_attempts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_login_attempts_key_created_at', 'login_attempts', ['key', 'created_at'])
+    op.create_index('ix_login_attempts_created_at', 'login_attempts', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_login_attempts_created_at', table_name='login_attempts')
+    op.drop_index('ix_login_attempts_key_created_at', table_name='login_attempts')
+    op.drop_table('login_attempts')
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script para expurgar as memórias removidas (linhas e pastas de mídia)
+Alternativa à thread do memory_purger (ex: cron com MEMORY_PURGE_ENABLED=false)
+"""
+
+import os
+import sys
+
+# Adicionar o diretório src ao path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.app_factory import create_app
+from src.config import config
+from src.utils.memory_purger import memory_purger
+
+def purge_memories():
+    """Expurgo das memórias removidas logicamente"""
+    print("🔄 Iniciando expurgo das memórias removidas...")
+    
+    env = os.environ.get('FLASK_ENV', 'development')
+    app = create_app(config.get(env, config['default']))
+    memory_purger.stop()  # Execução única, sem a thread em segundo plano
+    memory_purger.configure(app.config)
+    
+    with app.app_context():
+        try:
+            purged = 0
+            while True:
+                batch = memory_purger.run_once()
+                if not batch:
+                    break
+                purged += batch
+            metrics = memory_purger.metrics()
+            print(f"✅ {purged} memória(s) expurgada(s), {metrics['reclaimed_bytes']} bytes liberados")
+        except Exception as e:
+            print(f"❌ Erro no expurgo: {e}")
+            return False
+    
+    return True
+
+if __name__ == "__main__":
+    if purge_memories():
+        print("\n🎉 Expurgo concluído!")
+    else:
+        print("\n💥 Falha no expurgo das memórias removidas.")
+        sys.exit(1)
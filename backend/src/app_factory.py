@@ -52,10 +52,40 @@ def create_app(config_class):
     # Aplicar configurações
     app.config.from_object(config_class)
     
-    # Inicializar extensões
-    db.init_app(app)
+    # Provedor JSON rápido (orjson quando instalado) para jsonify/get_json
+    from src.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # IP real do cliente atrás de proxies confiáveis (limite de login por IP)
+    if app.config.get('PROXY_FIX_X_FOR'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+    
+    # Custo do bcrypt e pool de hash de senhas
+    from src.utils.password_hasher import password_hasher
+    password_hasher.configure(app.config)
+    
+    # Limite de tentativas de login
+    from src.utils.login_throttle import login_throttle
+    login_throttle.configure(app.config)
+    
+    # Cache de usuário/tema das leituras autenticadas
+    from src.utils.identity_cache import identity_cache
+    identity_cache.configure(app.config)
+    
+    # Inicializar extensões (banco e migrações via src.database.init_db)
+    from src.database import init_db
+    init_db(app)
     jwt.init_app(app)
     
+    # Revogação de tokens: filtro de Bloom na frente da tabela token_blocklist
+    from src.utils.token_revocation import revocation_filter
+    revocation_filter.configure(app.config)
+    
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):
+        return revocation_filter.is_revoked(jwt_payload['jti'])
+    
     # Configurar CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
@@ -72,14 +102,22 @@ def create_app(config_class):
     app.register_blueprint(theme_bp, url_prefix='/api/themes')
     app.register_blueprint(media_bp, url_prefix='/api/media')
     
-    # Criar tabelas do banco de dados
-    with app.app_context():
-        db.create_all()
+    # Expurgo das memórias removidas (thread daemon por processo)
+    from src.utils.memory_purger import memory_purger
+    if app.config.get('MEMORY_PURGE_ENABLED'):
+        memory_purger.start(app)
     
     # Rota de health check
     @app.route('/api/health')
     def health_check():
-        return {'status': 'OK', 'message': 'Memory Book API is running'}
+        return {
+            'status': 'OK',
+            'message': 'Memory Book API is running',
+            'memory_purger': memory_purger.metrics(),
+            'login_throttle': login_throttle.metrics(),
+            'identity_cache': identity_cache.metrics(),
+            'token_revocation': revocation_filter.metrics()
+        }
 
     # Rota raiz para teste de conectividade (Render)
     @app.route('/')
@@ -41,6 +41,37 @@ class Config:
     JWT_IDENTITY_CLAIM = 'sub'  # Claim padrão para identity
     JWT_ALGORITHM = 'HS256'  # Algoritmo de assinatura
     
+    # Revogação de tokens (logout): filtro de Bloom local sincronizado com a
+    # tabela token_blocklist; revogações de outro worker valem em até
+    # JWT_BLOCKLIST_SYNC_INTERVAL segundos
+    JWT_BLOCKLIST_CAPACITY = 100000  # Revogações ativas antes de redimensionar
+    JWT_BLOCKLIST_ERROR_RATE = 0.01  # Falsos positivos (confirmados no banco)
+    JWT_BLOCKLIST_SYNC_INTERVAL = 5.0  # Segundos
+    JWT_BLOCKLIST_REBUILD_INTERVAL = 3600.0  # Segundos (descarta revogações expiradas)
+    
+    # Hash de senhas (bcrypt): custo e pool de processos por worker; logins com
+    # hash de outro custo são regravados de forma transparente
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # 0 = na thread da requisição
+    PASSWORD_HASH_MAX_PENDING = 4  # Hashes em andamento por worker antes de responder 503
+    PASSWORD_HASH_TIMEOUT = 10.0  # Segundos
+    
+    # Limite de tentativas de login (janela deslizante, antes do bcrypt)
+    LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() == 'true'
+    LOGIN_THROTTLE_EMAIL_LIMIT = 10  # Tentativas por email na janela
+    LOGIN_THROTTLE_EMAIL_WINDOW = 300  # Segundos
+    LOGIN_THROTTLE_IP_LIMIT = 50  # Tentativas por IP na janela
+    LOGIN_THROTTLE_IP_WINDOW = 300  # Segundos
+    
+    # Cache de identidade (snapshots de usuário e tema por worker); alterações
+    # feitas em outro worker ficam visíveis em até IDENTITY_CACHE_TTL segundos
+    IDENTITY_CACHE_TTL = float(os.environ.get('IDENTITY_CACHE_TTL', 30))  # 0 desativa
+    IDENTITY_CACHE_MAX_ENTRIES = 1024
+    
+    # Proxies reversos confiáveis à frente da aplicação (ex: Render = 1); define
+    # quantos valores de X-Forwarded-For são usados para obter o IP do cliente
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    
     # Configurações do banco de dados
     # Fix para Render: Postgres deve usar protocolo 'postgresql://'
     database_url = os.environ.get('DATABASE_URL')
@@ -50,12 +81,39 @@ class Config:
     SQLALCHEMY_DATABASE_URI = database_url or 'sqlite:///memory_book.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Aplicar migrações pendentes (Alembic) ao iniciar; em produção prefira
+    # rodar `flask db upgrade` antes de subir os workers
+    AUTO_MIGRATE = os.environ.get('AUTO_MIGRATE', 'false').lower() == 'true'
+    
     # Configurações de CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173,http://localhost:5174').split(',')
     
     # Configurações de upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
+    
+    # Links de mídia (GET /api/media/...): absolutos, assinados com SECRET_KEY e
+    # válidos por MEDIA_URL_TTL a 2x MEDIA_URL_TTL segundos. MEDIA_BASE_URL é a
+    # origem pública da API (ex: https://api.exemplo.com); sem ela, usa a URL
+    # da requisição (atrás de proxy TLS pode sair http://)
+    MEDIA_BASE_URL = os.environ.get('MEDIA_BASE_URL')
+    MEDIA_URL_TTL = int(os.environ.get('MEDIA_URL_TTL', 43200))  # 12 horas
+    
+    # Importação em massa de memórias (NDJSON, lido em streaming)
+    IMPORT_MAX_CONTENT_LENGTH = 512 * 1024 * 1024  # 512MB por importação
+    IMPORT_CHUNK_SIZE = 1000  # Linhas por INSERT/commit
+    
+    # Lote de operações de memórias (uma transação por requisição)
+    BATCH_MAX_OPERATIONS = 200
+    
+    # Expurgo em segundo plano das memórias removidas (linhas e pastas de mídia)
+    MEMORY_PURGE_ENABLED = os.environ.get('MEMORY_PURGE_ENABLED', 'true').lower() == 'true'
+    MEMORY_PURGE_INTERVAL = 30.0  # Segundos entre ciclos
+    MEMORY_PURGE_BATCH_SIZE = 100  # Memórias por lote
+    MEMORY_PURGE_PAUSE = 0.5  # Segundos entre lotes de um ciclo
+    MEMORY_PURGE_MAX_BATCHES = 20  # Teto de lotes por ciclo
+    MEMORY_PURGE_GRACE_SECONDS = 60  # Idade mínima da remoção antes do expurgo
+    MEMORY_PURGE_MAX_ATTEMPTS = 5  # Tentativas por pasta de mídia
 
     # Integração Spotify (Client Credentials)
     SPOTIFY_CLIENT_ID = os.environ.get('SPOTIFY_CLIENT_ID')
@@ -65,6 +123,7 @@ class DevelopmentConfig(Config):
     """Configuração para desenvolvimento"""
     DEBUG = True
     FLASK_ENV = 'development'
+    AUTO_MIGRATE = True
 
 class ProductionConfig(Config):
     """Configuração para produção"""
@@ -19,7 +19,6 @@ Dependências:
 - flask: Framework web e utilitários (Blueprint, request, jsonify)
 - flask_jwt_extended: Gerenciamento de tokens JWT
 - src.repositories.user_repository: Operações de dados de usuários
-- src.repositories.theme_repository: Operações de dados de temas
 
 Padrões de Projeto:
 - MVC Pattern: Controller na arquitetura Model-View-Controller
@@ -29,16 +28,26 @@ Padrões de Projeto:
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from datetime import datetime, timezone
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from src.repositories.user_repository import UserRepository
-from src.repositories.theme_repository import ThemeRepository
+from src.utils.login_throttle import login_throttle
+from src.utils.password_hasher import HasherBusyError
+from src.utils.token_revocation import revocation_filter
 
 # Blueprint para rotas de autenticação (Blueprint Pattern)
 auth_bp = Blueprint('auth', __name__)
 
 # Instâncias dos repositórios (Repository Pattern)
 user_repo = UserRepository()
-theme_repo = ThemeRepository()
+
+def hasher_busy_response():
+    """Resposta 503 quando o pool de hash de senhas está saturado"""
+    return jsonify({
+        'message': 'Servidor ocupado, tente novamente em instantes',
+        'error_type': 'server_busy'
+    }), 503, {'Retry-After': '1'}
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -79,20 +88,17 @@ def register():
                 'suggestion': 'Digite uma senha com pelo menos 6 caracteres'
             }), 400
         
-        # Verificar se o email já existe
-        if user_repo.get_by_email(email):
+        # Criar usuário e tema padrão em uma única transação (email duplicado
+        # é detectado pela restrição única, sem consulta prévia)
+        try:
+            user = user_repo.register_user(name=name, email=email, password=password)
+        except IntegrityError:
             return jsonify({
                 'message': 'Email já está em uso',
                 'error_type': 'email_already_exists',
                 'suggestion': 'Tente fazer login ou use outro email'
             }), 400
         
-        # Criar usuário
-        user = user_repo.create(name=name, email=email, password=password)
-        
-        # Criar tema padrão para o usuário
-        theme_repo.get_or_create_default_theme(user.id)
-        
         # Gerar token de acesso
         access_token = create_access_token(identity=str(user.id))
         
@@ -102,6 +108,8 @@ def register():
             'access_token': access_token
         }), 201
         
+    except HasherBusyError:
+        return hasher_busy_response()
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -121,16 +129,16 @@ def get_user_preferences():
     """
     try:
         user_id = int(get_jwt_identity())
-        user = user_repo.get_by_id(user_id)
+        user = user_repo.get_snapshot(user_id)  # Cache de identidade (sem consulta no acerto)
         
-        if not user or not user.is_active:
+        if not user or not user['is_active']:
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
         return jsonify({
             'preferences': {
-                'selected_gradient': user.selected_gradient,
-                'theme_preference': user.theme_preference,
-                'map_theme': user.map_theme
+                'selected_gradient': user['selected_gradient'],
+                'theme_preference': user['theme_preference'],
+                'map_theme': user['map_theme']
             }
         }), 200
         
@@ -227,6 +235,18 @@ def login():
         email = data['email']
         password = data['password']
         
+        # Limite de tentativas (por email e por IP) antes de qualquer hash de senha
+        throttled = login_throttle.attempt(email, request.remote_addr)
+        if throttled:
+            scope, retry_after = throttled
+            return jsonify({
+                'message': 'Muitas tentativas de login. Aguarde antes de tentar novamente.',
+                'suggestion': f'Tente novamente em {retry_after} segundos.',
+                'error_type': 'too_many_attempts',
+                'scope': scope,
+                'retry_after': retry_after
+            }), 429, {'Retry-After': str(retry_after)}
+        
         # Autenticar usuário com detalhes
         user, auth_result = user_repo.authenticate_with_details(email, password)
         
@@ -256,6 +276,8 @@ def login():
                     'error_type': 'unknown'
                 }), 401
         
+        login_throttle.succeeded(email)
+        
         # Gerar token de acesso
         access_token = create_access_token(identity=str(user.id))
         
@@ -265,6 +287,8 @@ def login():
             'access_token': access_token
         }), 200
         
+    except HasherBusyError:
+        return hasher_busy_response()
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
@@ -282,13 +306,13 @@ def get_current_user():
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
-        user = user_repo.get_by_id(user_id)
+        user = user_repo.get_snapshot(user_id)  # Cache de identidade (sem consulta no acerto)
         
-        if not user or not user.is_active:
+        if not user or not user['is_active']:
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': user
         }), 200
         
     except Exception as e:
@@ -308,13 +332,13 @@ def refresh_token():
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
-        user = user_repo.get_by_id(user_id)
+        user = user_repo.get_snapshot(user_id)  # Cache de identidade (sem consulta no acerto)
         
-        if not user or not user.is_active:
+        if not user or not user['is_active']:
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
         # Gerar novo token
-        new_token = create_access_token(identity=str(user.id))  # Converter para string
+        new_token = create_access_token(identity=str(user_id))  # Converter para string
         
         return jsonify({
             'access_token': new_token
@@ -328,10 +352,16 @@ def refresh_token():
 def logout():
     """
     Endpoint para logout do usuário
+    
+    Revoga o token usado na requisição (jti na token_blocklist até expirar)
+    
+    Headers:
+        Authorization: Bearer <token>
     """
     try:
-        # Como estamos usando JWT stateless, o logout é apenas uma confirmação
-        # O token será removido no frontend
+        claims = get_jwt()
+        expires_at = datetime.fromtimestamp(claims['exp'], tz=timezone.utc).replace(tzinfo=None)
+        revocation_filter.revoke(claims['jti'], int(claims['sub']), expires_at)
         return jsonify({'message': 'Logout realizado com sucesso'}), 200
         
     except Exception as e:
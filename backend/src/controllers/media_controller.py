@@ -5,12 +5,19 @@
 # 3) Para vídeos, valida duração (máx. 30s)
 # 4) Move para destino final (global ou por usuário/memória)
 # 5) Retorna caminho público e metadados simples
+# O GET /user_<id>/memory_<id>/(photos|videos)/<arquivo> serve as mídias gravadas
+# por memória (inclusive as extraídas de data URLs na criação/edição de memórias)
+# apenas com link assinado e válido (media_manager.public_media_url), pois
+# <img>/<video> do frontend não enviam o token JWT
 import os
-from flask import Blueprint, request, jsonify, current_app
+import time
+from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from werkzeug.utils import secure_filename
 from src.utils.validators import validate_video_duration
 from src.utils.helpers import sanitize_filename, generate_unique_filename
-from src.utils.media_manager import build_memory_dirs, make_file_url
+from src.utils.media_manager import (
+    SERVED_MEDIA_TYPES, build_memory_dirs, make_file_url, memory_media_dir, public_media_url, verify_media_url
+)
 import logging
 
 media_bp = Blueprint('media', __name__)
@@ -84,7 +91,7 @@ def upload_media():
         rel_path = f"/static/uploads/{folder}/{filename}"
         api_url = None
         if user_id_arg and memory_id_arg:
-            api_url = make_file_url(user_id_arg, memory_id_arg, 'video' if folder=='videos' else 'photo', filename)
+            api_url = public_media_url(make_file_url(user_id_arg, memory_id_arg, 'video' if folder=='videos' else 'photo', filename))
         # Log leve para auditoria de upload
         logger.info('media_upload', extra={'filename': filename, 'ext': ext, 'folder': folder, 'user_id': user_id_arg, 'memory_id': memory_id_arg})
         # Resposta padronizada com tipo de mídia e caminho público
@@ -93,3 +100,22 @@ def upload_media():
         # Erro genérico: retorna detalhe para facilitar diagnóstico em ambiente de desenvolvimento
         return jsonify({'error': 'Falha ao enviar mídia', 'detail': str(e)}), 500
 
+@media_bp.route('/user_<int:user_id>/memory_<int:memory_id>/<media_type>/<path:filename>', methods=['GET'])
+def get_memory_media(user_id, memory_id, media_type, filename):
+    ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if media_type not in ('photos', 'videos') or ext not in SERVED_MEDIA_TYPES:
+        return jsonify({'error': 'Mídia não encontrada'}), 404
+    expires = request.args.get('expires', type=int)
+    if not verify_media_url(make_file_url(user_id, memory_id, media_type, filename), expires,
+                            request.args.get('signature')):
+        return jsonify({'error': 'Link de mídia inválido ou expirado'}), 403
+    directory = memory_media_dir(user_id, memory_id, media_type)
+    # Nomes de arquivo são únicos (timestamp + uuid): cacheável até o link expirar,
+    # mas só pelo navegador (mídias privadas não ficam em caches compartilhados)
+    response = send_from_directory(directory, filename, max_age=max(0, expires - int(time.time())),
+                                   mimetype=SERVED_MEDIA_TYPES[ext])
+    response.cache_control.public = False
+    response.cache_control.private = True
+    # Content-Type fixo pela extensão: o navegador não deve reinterpretar o arquivo
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
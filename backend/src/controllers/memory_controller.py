@@ -3,10 +3,24 @@
 # Controller para operações com memórias
 # ============================================
 
-from flask import Blueprint, request, jsonify
+import hashlib
+import io
+import json
+from functools import wraps
+from flask import Blueprint, request, jsonify, make_response, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.wsgi import get_input_stream
 from src.repositories.memory_repository import MemoryRepository
-from src.utils.validators import validate_music
+from src.models.memory import Memory
+from src.utils.media_manager import (
+    DATA_URL_MIME_EXTENSIONS, canonical_media_url, data_url_mime, is_data_url, media_url_window
+)
+from src.utils.export_stream import iter_geojson, iter_ndjson, iter_zip
+from src.utils.helpers import parse_bbox
+from src.utils.validators import (
+    validate_music, validate_memory_title, validate_memory_description,
+    validate_date, validate_coordinates, validate_color
+)
 
 # Blueprint para rotas de memórias
 memory_bp = Blueprint('memories', __name__)
@@ -14,8 +28,41 @@ memory_bp = Blueprint('memories', __name__)
 # Instância do repositório
 memory_repo = MemoryRepository()
 
+def conditional_on_collection(view):
+    """
+    Decorator de leitura condicional (ETag / If-None-Match) para a coleção de memórias
+    
+    O ETag é derivado da versão da coleção do usuário (users.memories_version),
+    da URL completa e da janela de assinatura dos links de mídia, então a
+    verificação não toca a tabela memories e uma resposta em cache nunca traz
+    links expirados. Se o cliente já possui a representação atual, responde
+    304 sem executar a view. Deve ser aplicado abaixo de @jwt_required().
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = int(get_jwt_identity())
+        version = memory_repo.get_collection_version(user_id)
+        digest = hashlib.sha1(
+            f'{user_id}:{request.full_path}:{media_url_window()}'.encode('utf-8')
+        ).hexdigest()[:16]
+        etag = f'{version}-{digest}'
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Authorization')
+        return response
+    return wrapper
+
 @memory_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional_on_collection
 def get_memories():
     """
     Endpoint para listar memórias do usuário
@@ -26,9 +73,11 @@ def get_memories():
     Query Parameters:
         start_date (str, optional): Data inicial (YYYY-MM-DD)
         end_date (str, optional): Data final (YYYY-MM-DD)
+        limit (int, optional): Ativa paginação por cursor (máx. 100 por página)
+        cursor (str, optional): Cursor opaco retornado em next_cursor
         
     Returns:
-        JSON: Lista de memórias do usuário
+        JSON: Lista de memórias do usuário (com next_cursor quando paginada)
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
@@ -37,10 +86,31 @@ def get_memories():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
+        # Paginação por cursor (opt-in para manter compatibilidade com o frontend)
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            try:
+                page = memory_repo.get_by_user_page(user_id, limit=limit or 50, cursor=cursor,
+                                                    include=Memory.HEAVY_FIELDS,
+                                                    start_date=start_date, end_date=end_date)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            memories_data = [memory.to_dict() for memory in page['items']]
+            return jsonify({
+                'memories': memories_data,
+                'total': len(memories_data),
+                'limit': page['limit'],
+                'has_next': page['has_next'],
+                'next_cursor': page['next_cursor']
+            }), 200
+        
         if start_date and end_date:
-            memories = memory_repo.get_memories_by_date_range(user_id, start_date, end_date)
+            memories = memory_repo.get_memories_by_date_range(user_id, start_date, end_date,
+                                                              include=Memory.HEAVY_FIELDS)
         else:
-            memories = memory_repo.get_by_user(user_id)
+            memories = memory_repo.get_by_user(user_id, include=Memory.HEAVY_FIELDS)
         
         # Converter para dicionários
         memories_data = [memory.to_dict() for memory in memories]
@@ -50,6 +120,8 @@ def get_memories():
             'total': len(memories_data)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Erro no endpoint de estatísticas: {e}")  # Debug temporário
         return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -117,6 +189,285 @@ def create_memory():
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
+def _validate_memory_fields(data, partial=False):
+    """
+    Valida e normaliza os campos de uma memória enviados pelo cliente
+    
+    Args:
+        data (dict): Campos no formato do POST /api/memories
+        partial (bool): Atualização parcial (valida apenas os campos presentes)
+        
+    Returns:
+        tuple: (campos da memória, None) ou (None, mensagem de erro)
+    """
+    if not isinstance(data, dict):
+        return None, 'Dados da memória devem ser um objeto JSON'
+    if not partial and not all(k in data for k in ('title', 'date', 'lat', 'lng')):
+        return None, 'Título, data, latitude e longitude são obrigatórios'
+    
+    fields = {}
+    if 'title' in data:
+        ok, err = validate_memory_title(data['title'])
+        if not ok:
+            return None, err
+        fields['title'] = data['title']
+    if 'date' in data:
+        ok, err = validate_date(data['date'])
+        if not ok:
+            return None, err
+        fields['date'] = data['date']
+    if 'lat' in data or 'lng' in data:
+        ok, err = validate_coordinates(data.get('lat', 0), data.get('lng', 0))
+        if not ok:
+            return None, err
+        for key in ('lat', 'lng'):
+            if key in data:
+                fields[key] = float(data[key])
+    if not partial or 'description' in data:
+        ok, err = validate_memory_description(data.get('description'))
+        if not ok:
+            return None, err
+        fields['description'] = data.get('description', '')
+    if data.get('color') and not validate_color(data['color']):
+        return None, 'Cor inválida. Use o formato #RRGGBB'
+    if not partial or 'color' in data:
+        fields['color'] = data.get('color')
+    if data.get('music') is not None:
+        ok, err = validate_music(data['music'])
+        if not ok:
+            return None, err
+    if not partial or 'music' in data:
+        fields['music'] = data.get('music')
+    if not partial or 'spotifyUrl' in data:
+        fields['spotify_url'] = data.get('spotifyUrl')
+    
+    # Mesma unificação de mídia do POST: vídeos junto às fotos
+    if not partial or 'photos' in data or 'videos' in data:
+        photos = list(data.get('photos') or []) + list(data.get('videos') or [])
+        if any(not isinstance(m, str) for m in photos):
+            return None, 'Mídias devem ser URLs ou data URLs'
+        for item in photos:
+            if is_data_url(item) and data_url_mime(item) not in DATA_URL_MIME_EXTENSIONS:
+                return None, f'Tipo de mídia não suportado: {data_url_mime(item) or "desconhecido"}'
+        fields['photos'] = photos or None
+    
+    return fields, None
+
+def _parse_import_line(line, user_id):
+    """
+    Converte e valida uma linha NDJSON da importação
+    
+    Args:
+        line (str): Linha NDJSON
+        user_id (int): Dono das memórias importadas
+    
+    Returns:
+        tuple: (campos da memória, None) ou (None, mensagem de erro)
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, 'JSON inválido'
+    fields, error = _validate_memory_fields(data)
+    if error:
+        return None, error
+    if any(is_data_url(m) for m in fields['photos'] or ()):
+        return None, 'Mídias devem ser URLs (envie arquivos por /api/media/upload)'
+    if fields['photos']:
+        # Links exportados (absolutos e assinados) voltam à forma gravada
+        try:
+            fields['photos'] = [canonical_media_url(m, user_id) for m in fields['photos']]
+        except ValueError as e:
+            return None, str(e)
+    return fields, None
+
+@memory_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_memories():
+    """
+    Endpoint de importação em massa de memórias (NDJSON em streaming)
+    
+    Headers:
+        Authorization: Bearer <token>
+        Content-Type: application/x-ndjson
+        
+    Body:
+        Uma memória JSON por linha (mesmos campos do POST /api/memories)
+        
+    Returns:
+        NDJSON em streaming: uma linha {"line", "error"} por linha rejeitada e,
+        ao final, uma linha {"summary": {...}} com os totais
+    """
+    user_id = int(get_jwt_identity())  # Converter string de volta para int
+    chunk_size = current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+    stream = get_input_stream(
+        request.environ,
+        max_content_length=current_app.config.get('IMPORT_MAX_CONTENT_LENGTH')
+    )
+    if isinstance(stream, io.RawIOBase):
+        # Leitura de linhas sobre stream "cru" seria byte a byte; bufferizar
+        stream = io.BufferedReader(stream, buffer_size=64 * 1024)
+    
+    def generate():
+        imported = 0
+        failed = 0
+        chunk = []
+        chunk_lines = []
+        
+        def flush():
+            nonlocal imported, failed
+            try:
+                memory_repo.bulk_create_memories(user_id, chunk)
+                imported += len(chunk)
+                return []
+            except Exception:
+                failed += len(chunk)
+                return [{'line': number, 'error': 'Erro ao salvar no banco'} for number in chunk_lines]
+        
+        # Lê o corpo linha a linha: memória limitada ao tamanho de um lote
+        for number, raw in enumerate(stream, start=1):
+            line = raw.strip()
+            if not line:
+                continue
+            row, error = _parse_import_line(line, user_id)
+            if error:
+                failed += 1
+                yield json.dumps({'line': number, 'error': error}, ensure_ascii=False) + '\n'
+                continue
+            chunk.append(row)
+            chunk_lines.append(number)
+            if len(chunk) >= chunk_size:
+                for item in flush():
+                    yield json.dumps(item, ensure_ascii=False) + '\n'
+                chunk, chunk_lines = [], []
+        
+        if chunk:
+            for item in flush():
+                yield json.dumps(item, ensure_ascii=False) + '\n'
+        
+        yield json.dumps({'summary': {'imported': imported, 'failed': failed}}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@memory_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_memories():
+    """
+    Endpoint para aplicar várias operações de memórias em uma única transação
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Body:
+        operations (list): Operações na ordem de aplicação, cada uma com
+            op ('create' | 'update' | 'delete'), id (update/delete),
+            data (create/update, mesmos campos do POST) e client_id opcional
+            (ecoado no resultado)
+        
+    Returns:
+        JSON: Um resultado por operação (status, memory/id ou error) e totais
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        data = request.get_json(silent=True) or {}
+        operations = data.get('operations')
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'Lista de operações é obrigatória'}), 400
+        max_operations = current_app.config.get('BATCH_MAX_OPERATIONS', 200)
+        if len(operations) > max_operations:
+            return jsonify({'error': f'Máximo de {max_operations} operações por lote'}), 400
+        
+        # Validação de todas as operações antes de tocar no banco
+        results = [None] * len(operations)
+        valid = []
+        positions = []
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update', 'delete'):
+                results[index] = {'status': 400, 'error': "Operação inválida. Use 'create', 'update' ou 'delete'"}
+                continue
+            kind = operation['op']
+            memory_id = operation.get('id')
+            if kind != 'create' and (not isinstance(memory_id, int) or isinstance(memory_id, bool)):
+                results[index] = {'op': kind, 'status': 400, 'error': 'ID da memória é obrigatório'}
+                continue
+            fields = None
+            if kind != 'delete':
+                fields, error = _validate_memory_fields(operation.get('data'), partial=kind == 'update')
+                if error:
+                    results[index] = {'op': kind, 'status': 400, 'error': error}
+                    continue
+            valid.append({'op': kind, 'id': memory_id, 'fields': fields})
+            positions.append(index)
+        
+        for index, result in zip(positions, memory_repo.apply_batch(user_id, valid) if valid else []):
+            if 'memory' in result:
+                result['memory'] = result['memory'].to_dict()
+            results[index] = result
+        
+        for index, (operation, result) in enumerate(zip(operations, results)):
+            result['index'] = index
+            if isinstance(operation, dict) and 'client_id' in operation:
+                result['client_id'] = operation['client_id']
+        
+        failed = sum(1 for result in results if result['status'] >= 400)
+        return jsonify({
+            'results': results,
+            'applied': len(results) - failed,
+            'failed': failed
+        }), 200
+        
+    except ValueError as e:
+        # Recusa do repositório (ex: mídia inválida): nada do lote foi gravado
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+# Formatos de exportação: (mimetype, nome do arquivo)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'memories.ndjson'),
+    'geojson': ('application/geo+json', 'memories.geojson'),
+    'zip': ('application/zip', 'memories.zip'),
+}
+
+@memory_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_memories():
+    """
+    Endpoint de exportação completa das memórias do usuário (em streaming)
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Query Parameters:
+        format (str, optional): ndjson (padrão), geojson ou zip
+        media (bool, optional): No zip, incluir os arquivos de mídia (padrão: true)
+        
+    Returns:
+        Arquivo para download, gerado incrementalmente
+    """
+    user_id = int(get_jwt_identity())  # Converter string de volta para int
+    export_format = (request.args.get('format') or 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Formato inválido. Use ndjson, geojson ou zip'}), 400
+    
+    def records():
+        # Percorre o banco em lotes (yield_per), sem montar a lista completa
+        return (memory.to_dict() for memory in memory_repo.iter_by_user(user_id, include=Memory.HEAVY_FIELDS))
+    
+    if export_format == 'zip':
+        include_media = request.args.get('media', 'true').lower() not in ('0', 'false', 'no')
+        body = iter_zip(user_id, records, include_media=include_media)
+    elif export_format == 'geojson':
+        body = iter_geojson(records())
+    else:
+        body = iter_ndjson(records())
+    
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
 @memory_bp.route('/<int:memory_id>', methods=['GET'])
 @jwt_required()
 def get_memory(memory_id):
@@ -134,7 +485,7 @@ def get_memory(memory_id):
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
-        memory = memory_repo.get_user_memory(memory_id, user_id)
+        memory = memory_repo.get_user_memory(memory_id, user_id, include=Memory.HEAVY_FIELDS)
         
         if not memory:
             return jsonify({'error': 'Memória não encontrada'}), 404
@@ -171,20 +522,17 @@ def update_memory(memory_id):
         if not data:
             return jsonify({'error': 'Dados para atualização são obrigatórios'}), 400
         
-        # Compatibilidade: mesclar vídeos (se enviados) com fotos antes de atualizar
-        if 'videos' in data:
-            photos = data.get('photos') or []
-            videos = data.get('videos') or []
-            if isinstance(videos, list) and len(videos) > 0:
-                data['photos'] = list(photos) + list(videos)
-            data.pop('videos', None)
-
-        if data.get('music') is not None:
-            ok, err = validate_music(data.get('music'))
-            if not ok:
-                return jsonify({'error': err}), 400
+        # Mesma validação do lote e da importação: apenas campos editáveis chegam
+        # ao modelo (lat_e7, deleted_at, media etc. são internos); vídeos são
+        # unificados com as fotos
+        fields, err = _validate_memory_fields(data, partial=True)
+        if err:
+            return jsonify({'error': err}), 400
+        if not fields:
+            return jsonify({'error': 'Nenhum campo editável informado'}), 400
+        
         # Atualizar memória
-        memory = memory_repo.update_memory(memory_id, user_id, **data)
+        memory = memory_repo.update_memory(memory_id, user_id, **fields)
         
         if not memory:
             return jsonify({'error': 'Memória não encontrada'}), 404
@@ -229,6 +577,7 @@ def delete_memory(memory_id):
 
 @memory_bp.route('/nearby', methods=['GET'])
 @jwt_required()
+@conditional_on_collection
 def get_nearby_memories():
     """
     Endpoint para buscar memórias próximas a uma localização
@@ -239,7 +588,9 @@ def get_nearby_memories():
     Query Parameters:
         lat (float): Latitude central
         lng (float): Longitude central
-        radius (float, optional): Raio de busca (padrão: 0.01)
+        radius (float, optional): Raio de busca em graus (legado, padrão: 0.01)
+        radius_m (float, optional): Raio real de busca em metros; quando enviado,
+            o resultado é ordenado por distância e inclui distance_m
         
     Returns:
         JSON: Lista de memórias próximas
@@ -250,11 +601,30 @@ def get_nearby_memories():
         lat = request.args.get('lat', type=float)
         lng = request.args.get('lng', type=float)
         radius = request.args.get('radius', type=float, default=0.01)
+        radius_m = request.args.get('radius_m', type=float)
         
         if lat is None or lng is None:
             return jsonify({'error': 'Latitude e longitude são obrigatórias'}), 400
         
-        memories = memory_repo.get_memories_by_location(user_id, lat, lng, radius)
+        if radius_m is not None:
+            if radius_m <= 0:
+                return jsonify({'error': 'radius_m deve ser maior que zero'}), 400
+            
+            results = memory_repo.get_memories_within_radius(user_id, lat, lng, radius_m,
+                                                             include=Memory.HEAVY_FIELDS)
+            memories_data = []
+            for memory, distance in results:
+                memory_data = memory.to_dict()
+                memory_data['distance_m'] = round(distance, 1)
+                memories_data.append(memory_data)
+            
+            return jsonify({
+                'memories': memories_data,
+                'total': len(memories_data)
+            }), 200
+        
+        memories = memory_repo.get_memories_by_location(user_id, lat, lng, radius,
+                                                        include=Memory.HEAVY_FIELDS)
         memories_data = [memory.to_dict() for memory in memories]
         
         return jsonify({
@@ -265,8 +635,198 @@ def get_nearby_memories():
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
 
+@memory_bp.route('/nearest', methods=['GET'])
+@jwt_required()
+@conditional_on_collection
+def get_nearest_memories():
+    """
+    Endpoint para buscar as k memórias mais próximas de um ponto
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Query Parameters:
+        lat (float): Latitude do ponto
+        lng (float): Longitude do ponto
+        k (int, optional): Quantidade de memórias (padrão: 20, máximo: 100)
+        
+    Returns:
+        JSON: Memórias ordenadas por distância, com distance_m
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        k = request.args.get('k', type=int, default=20)
+        
+        if lat is None or lng is None:
+            return jsonify({'error': 'Latitude e longitude são obrigatórias'}), 400
+        
+        k = max(1, min(100, k))
+        results = memory_repo.get_nearest_memories(user_id, lat, lng, k, include=Memory.HEAVY_FIELDS)
+        memories_data = []
+        for memory, distance in results:
+            memory_data = memory.to_dict()
+            memory_data['distance_m'] = round(distance, 1)
+            memories_data.append(memory_data)
+        
+        return jsonify({
+            'memories': memories_data,
+            'total': len(memories_data)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@memory_bp.route('/search', methods=['GET'])
+@jwt_required()
+@conditional_on_collection
+def search_memories():
+    """
+    Endpoint de busca textual em título e descrição das memórias
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Query Parameters:
+        q (str): Texto de busca (sem distinção de acentos, casa por prefixo)
+        page (int, optional): Página (padrão: 1)
+        per_page (int, optional): Itens por página (padrão: 20, máximo: 100)
+        
+    Returns:
+        JSON: Memórias ordenadas por relevância
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        
+        query = (request.args.get('q') or '').strip()
+        page = request.args.get('page', type=int, default=1)
+        per_page = request.args.get('per_page', type=int, default=20)
+        
+        if not query:
+            return jsonify({'error': 'Parâmetro q é obrigatório'}), 400
+        
+        result = memory_repo.search_memories(user_id, query, page, per_page, include=Memory.HEAVY_FIELDS)
+        memories_data = []
+        for memory, rank in result['items']:
+            memory_data = memory.to_dict()
+            memory_data['rank'] = rank
+            memories_data.append(memory_data)
+        
+        return jsonify({
+            'memories': memories_data,
+            'total': len(memories_data),
+            'current_page': result['current_page'],
+            'per_page': result['per_page'],
+            'has_next': result['has_next'],
+            'next_page': result['next_page']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@memory_bp.route('/timeline', methods=['GET'])
+@jwt_required()
+@conditional_on_collection
+def get_memory_timeline():
+    """
+    Endpoint com o histograma de memórias por período (linha do tempo)
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Query Parameters:
+        bucket (str, optional): day, week, month (padrão) ou year
+        bbox (str, optional): min_lng,min_lat,max_lng,max_lat
+        
+    Returns:
+        JSON: Buckets em ordem cronológica com contagem e primeira memória
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        bucket = request.args.get('bucket', 'month')
+        
+        try:
+            bbox = parse_bbox(request.args['bbox']) if request.args.get('bbox') else None
+            timeline = memory_repo.get_timeline(user_id, bucket, bbox=bbox)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'bucket': bucket,
+            'timeline': timeline,
+            'total': sum(item['count'] for item in timeline)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@memory_bp.route('/changes', methods=['GET'])
+@jwt_required()
+@conditional_on_collection
+def get_memory_changes():
+    """
+    Endpoint de sincronização incremental (memórias alteradas e removidas)
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Query Parameters:
+        since (str, optional): Token de sincronização da chamada anterior
+            (ausente na sincronização inicial)
+        limit (int, optional): Máximo de memórias e de remoções (padrão 100, máx. 500)
+        
+    Returns:
+        JSON: Memórias criadas/alteradas, IDs removidos, próximo token e has_more
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        limit = request.args.get('limit', 100, type=int)
+        
+        try:
+            changes = memory_repo.get_changes(user_id, since=request.args.get('since'), limit=limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'memories': [memory.to_dict() for memory in changes['memories']],
+            'deleted': changes['deleted'],
+            'next_token': changes['next_token'],
+            'has_more': changes['has_more']
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
+@memory_bp.route('/markers', methods=['GET'])
+@jwt_required()
+def get_memory_markers():
+    """
+    Endpoint com a projeção leve das memórias para desenhar o mapa
+    
+    Headers:
+        Authorization: Bearer <token>
+        
+    Returns:
+        JSON: Lista de marcadores (id, title, date, lat, lng, color)
+    """
+    try:
+        user_id = int(get_jwt_identity())  # Converter string de volta para int
+        memories = memory_repo.get_markers_by_user(user_id)
+        markers_data = [memory.to_marker_dict() for memory in memories]
+        
+        return jsonify({
+            'markers': markers_data,
+            'total': len(markers_data)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Erro interno do servidor'}), 500
+
 @memory_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@conditional_on_collection
 def get_memory_stats():
     """
     Endpoint para obter estatísticas das memórias do usuário
@@ -275,15 +835,16 @@ def get_memory_stats():
         Authorization: Bearer <token>
         
     Returns:
-        JSON: Estatísticas das memórias
+        JSON: Estatísticas das memórias (totais por ano/mês, mídias, caixa
+        envolvente, centroide e primeira/última data)
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
-        total_memories = memory_repo.count_user_memories(user_id)
         
-        return jsonify({
-            'total_memories': total_memories
-        }), 200
+        # Agregados mantidos a cada escrita: leitura de uma única linha
+        stats = memory_repo.get_stats(user_id)
+        
+        return jsonify(stats.to_dict()), 200
         
     except Exception as e:
         return jsonify({'error': 'Erro interno do servidor'}), 500
@@ -4,11 +4,11 @@
 # ============================================
 
 from flask import Blueprint, request, jsonify, current_app
-import unicodedata
 import json
 import logging
 from urllib import parse as urlparse
 from src.utils.spotify_client import SpotifyClient
+from src.utils.helpers import normalize_text as _normalize
 
 spotify_bp = Blueprint('spotify', __name__)
 logger = logging.getLogger(__name__)
@@ -33,12 +33,6 @@ def _search_spotify_api(query: str, limit: int = 10) -> list[dict]:
         logger.error('spotify_search_error', extra={'error': str(e)})
         return []
 
-def _normalize(text: str) -> str:
-    return ''.join(
-        c for c in unicodedata.normalize('NFD', (text or '').lower().strip())
-        if unicodedata.category(c) != 'Mn'
-    )
-
 @spotify_bp.route('/search', methods=['GET'])
 def search_tracks():
     try:
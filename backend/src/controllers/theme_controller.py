@@ -27,10 +27,10 @@ def get_user_theme():
     """
     try:
         user_id = int(get_jwt_identity())  # Converter string de volta para int
-        theme = theme_repo.get_or_create_default_theme(user_id)
+        theme = theme_repo.get_snapshot(user_id)  # Cache de identidade (sem consulta no acerto)
         
         return jsonify({
-            'theme': theme.to_dict()
+            'theme': theme
         }), 200
         
     except Exception as e:
@@ -3,30 +3,51 @@
 # Configuração do banco de dados SQLAlchemy
 # ============================================
 
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+import os
+from flask_migrate import Migrate, stamp, upgrade
+from sqlalchemy import inspect, insert
+from src.app_factory import db
 
-# Instância global do SQLAlchemy
-db = SQLAlchemy()
+# Instância global do SQLAlchemy (a mesma usada pelos modelos, definida em app_factory)
 migrate = Migrate()
 
+# Migrações Alembic (backend/migrations)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Revisão que corresponde ao esquema criado por db.create_all() antes das migrações
+BASELINE_REVISION = '0001_baseline'
+
 def init_db(app):
     """
     Inicializa o banco de dados com a aplicação Flask
     
+    - Banco vazio: cria o esquema atual e o marca na última revisão
+    - Banco sem alembic_version (criado por create_all antes das migrações):
+      marcado na revisão base e atualizado, se AUTO_MIGRATE estiver ativo
+    - Demais bancos: aplica as revisões pendentes, se AUTO_MIGRATE estiver ativo
+    
+    Sem AUTO_MIGRATE (produção), nada é feito aqui: a etapa release roda
+    `flask db upgrade`, e a revisão 0001_baseline adota as tabelas de bancos
+    sem alembic_version.
+    
     Args:
         app: Instância da aplicação Flask
     """
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
     
     # Importar modelos para que sejam reconhecidos pelo SQLAlchemy
-    from src.models import User, Memory, Theme
+    from src.models import User, Memory, Theme, MemoryStats, MemoryMedia, MemoryTombstone, TokenBlocklist
     
-    # Criar tabelas se não existirem (apenas em desenvolvimento)
     with app.app_context():
-        if app.config.get('FLASK_ENV') == 'development':
+        tables = inspect(db.engine).get_table_names()
+        if not tables:
             db.create_all()
+            stamp(directory=MIGRATIONS_DIR)
+        elif app.config.get('AUTO_MIGRATE'):
+            if 'alembic_version' not in tables:
+                stamp(directory=MIGRATIONS_DIR, revision=BASELINE_REVISION)
+            upgrade(directory=MIGRATIONS_DIR)
 
 def get_db():
     """
@@ -142,6 +163,57 @@ class DatabaseManager:
             db.session.rollback()
             raise e
     
+    @staticmethod
+    def insert_rows(model, rows, returning=None):
+        """
+        Insere várias linhas em lote (INSERT Core com múltiplos VALUES)
+        
+        Não cria objetos ORM nem faz commit: o chamador controla a transação.
+        
+        Args:
+            model: Classe do modelo (ou tabela) de destino
+            rows (list[dict]): Linhas com as mesmas chaves
+            returning (list, optional): Colunas a retornar das linhas inseridas;
+                a ordem do resultado não é garantida (mantém o INSERT em lote)
+            
+        Returns:
+            list: Linhas com as colunas de returning (ou lista vazia)
+        """
+        if not rows:
+            return []
+        # Tabela Core (sem o caminho de bulk do ORM)
+        statement = insert(getattr(model, '__table__', model))
+        if not returning:
+            db.session.execute(statement, rows)
+            return []
+        return db.session.execute(statement.returning(*returning), rows).all()
+    
+    @staticmethod
+    def insert_ignore(model, row, conflict_columns):
+        """
+        Insere uma linha ignorando conflito de unicidade (upsert sem atualização)
+        
+        Usa INSERT ... ON CONFLICT DO NOTHING (SQLite e PostgreSQL), então
+        criações concorrentes da mesma linha não geram IntegrityError. Não faz
+        commit: o chamador controla a transação.
+        
+        Args:
+            model: Classe do modelo de destino
+            row (dict): Valores da linha
+            conflict_columns (list[str]): Colunas da restrição de unicidade
+            
+        Returns:
+            bool: True se a linha foi inserida (False se já existia)
+        """
+        table = model.__table__
+        if db.session.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        # Defaults Python das colunas (ex: created_at) são aplicados pelo Core
+        statement = dialect_insert(table).values(**row).on_conflict_do_nothing(index_elements=conflict_columns)
+        return db.session.execute(statement).rowcount == 1
+    
     @staticmethod
     def execute_raw_sql(sql, params=None):
         """
@@ -6,5 +6,11 @@
 from .user import User
 from .memory import Memory
 from .theme import Theme
+from .memory_stats import MemoryStats
+from .memory_media import MemoryMedia
+from .memory_tombstone import MemoryTombstone
+from .token_blocklist import TokenBlocklist
+from .login_attempt import LoginAttempt
 
-__all__ = ['User', 'Memory', 'Theme']
\ No newline at end of file
+__all__ = ['User', 'Memory', 'Theme', 'MemoryStats', 'MemoryMedia', 'MemoryTombstone', 'TokenBlocklist',
+           'LoginAttempt']
\ No newline at end of file
@@ -5,6 +5,7 @@
 
 from datetime import datetime
 from src.app_factory import db
+from src.utils.serializers import compile_serializer
 
 class BaseModel(db.Model):
     """
@@ -29,6 +30,10 @@ class BaseModel(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Representação em dicionário (to_dict): colunas omitidas e renomeadas
+    SERIALIZE_EXCLUDE = ()
+    SERIALIZE_RENAME = {}
+    
     @classmethod
     def create(cls, **kwargs):
         """
@@ -81,7 +86,25 @@ class BaseModel(db.Model):
         Returns:
             dict: Representação em dicionário do modelo
         """
-        return {
-            column.name: getattr(self, column.name)
-            for column in self.__table__.columns
-        }
\ No newline at end of file
+        return self.serializer()(self)
+    
+    @classmethod
+    def serializer(cls):
+        """
+        Serializador da classe, compilado na primeira chamada
+        
+        Colunas, renomeações e formatadores de data são resolvidos uma única
+        vez por modelo, e não a cada linha serializada.
+        
+        Returns:
+            Callable: Função instância -> dict
+        """
+        serializer = cls.__dict__.get('_serializer')
+        if serializer is None:
+            serializer = compile_serializer(
+                cls.__table__.columns,
+                exclude=cls.SERIALIZE_EXCLUDE,
+                rename=cls.SERIALIZE_RENAME
+            )
+            cls._serializer = serializer
+        return serializer
@@ -0,0 +1,40 @@
+# ============================================
+# MODEL - login_attempt.py
+# Tentativas de login recentes (limite de tentativas)
+# ============================================
+
+"""
+Modelo LoginAttempt com as tentativas de login aceitas pelo login_throttle.
+
+Responsabilidades:
+- Registrar cada tentativa por chave ('email:<email>' e 'ip:<ip>'), com o
+  instante em created_at
+- Servir de estado compartilhado entre os workers para as janelas deslizantes
+- Permitir o descarte das linhas fora da janela (memory_purger)
+
+Dependências:
+- src.app_factory.db: Instância do SQLAlchemy
+- .base_model.BaseModel: Classe base com funcionalidades comuns
+
+Padrões de Projeto:
+- Template Method Pattern: Herda comportamentos do BaseModel
+"""
+
+from src.app_factory import db
+from .base_model import BaseModel
+
+class LoginAttempt(BaseModel):
+    """Tentativa de login aceita (created_at é o momento da tentativa)"""
+    
+    __tablename__ = 'login_attempts'
+    __table_args__ = (
+        # Últimas tentativas de uma chave dentro da janela
+        db.Index('ix_login_attempts_key_created_at', 'key', 'created_at'),
+        # Descarte das tentativas fora da janela
+        db.Index('ix_login_attempts_created_at', 'created_at'),
+    )
+    
+    key = db.Column(db.String(200), nullable=False)
+    
+    def __repr__(self):
+        return f'<LoginAttempt {self.key}>'
@@ -24,29 +24,72 @@ Padrões de Projeto:
 - Template Method Pattern: Herda comportamentos do BaseModel
 """
 
+from sqlalchemy.orm import deferred, validates
 from src.app_factory import db
 from .base_model import BaseModel
-from src.utils.helpers import serialize_memory_dict
+from src.utils.helpers import format_date, legacy_media_lists, parse_date, to_e7
+from .memory_media import MemoryMedia
+from src.utils.search_index import register_search_index
 
 class Memory(BaseModel):
     """Modelo de memória compatível com o frontend React"""
     
     __tablename__ = 'memories'
+    __table_args__ = (
+        # Suporta a listagem paginada por keyset (user_id, date, id)
+        db.Index('ix_memories_user_date_id', 'user_id', 'date', 'id'),
+        # Índice espacial (pré-filtro por caixa envolvente em inteiros E7)
+        db.Index('ix_memories_user_lat_lng_e7', 'user_id', 'lat_e7', 'lng_e7'),
+        # Sincronização incremental (/changes): alterações por (sync_version, id)
+        db.Index('ix_memories_user_sync_version_id', 'user_id', 'sync_version', 'id'),
+        # Fila do expurgo: apenas as memórias removidas (índice parcial)
+        db.Index('ix_memories_deleted_at', 'deleted_at',
+                 postgresql_where=db.text('deleted_at IS NOT NULL'),
+                 sqlite_where=db.text('deleted_at IS NOT NULL')),
+    )
     
     # Campos da memória (compatíveis com o frontend)
     title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
-    date = db.Column(db.String(10), nullable=False)  # Formato YYYY-MM-DD
+    # Colunas pesadas são adiadas (grupo 'heavy'); use include= nos repositórios para carregá-las
+    description = deferred(db.Column(db.Text), group='heavy')
+    date = db.Column(db.Date, nullable=False)  # Exposta na API como YYYY-MM-DD
     lat = db.Column(db.Float, nullable=False)
     lng = db.Column(db.Float, nullable=False)
-    photos = db.Column(db.JSON)  # Array de URLs/base64 das fotos e (compatível) vídeos
-    music = db.Column(db.JSON)  # Objeto de música selecionada (title, artist, preview_url, spotify_id, startTime, duration)
+    lat_e7 = db.Column(db.Integer)  # Latitude * 1e7 (mantida em sincronia com lat)
+    lng_e7 = db.Column(db.Integer)  # Longitude * 1e7 (mantida em sincronia com lng)
+    # Lista de URLs de fotos e vídeos como enviada pela API: espelho legado das
+    # linhas de memory_media (fonte das respostas), mantido a cada escrita
+    photos = deferred(db.Column(db.JSON), group='heavy')
+    music = deferred(db.Column(db.JSON), group='heavy')  # Objeto de música selecionada (title, artist, preview_url, spotify_id, startTime, duration)
     spotify_url = db.Column(db.String(500))  # (Legado) URL do Spotify
     color = db.Column(db.String(7))  # Cor em hexadecimal (#RRGGBB)
+    # Remoção lógica: a linha e as mídias em disco são apagadas pelo memory_purger
+    deleted_at = db.Column(db.DateTime)
+    # users.memories_version da transação que gravou a linha por último (ordem do /changes)
+    sync_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # Relacionamento com usuário
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
+    # Fotos e vídeos normalizados (use include=('media',) para carregar em lote)
+    media = db.relationship('MemoryMedia', order_by='MemoryMedia.position',
+                            cascade='all, delete-orphan', lazy='select')
+    
+    # Campos necessários para desenhar os marcadores no mapa
+    MARKER_FIELDS = ('id', 'title', 'date', 'lat', 'lng', 'color')
+    
+    # Colunas adiadas por padrão (carregadas apenas sob demanda)
+    DEFERRED_FIELDS = ('description', 'photos', 'music')
+    
+    # Dados pesados de uma resposta completa: colunas adiadas e as mídias
+    # (relacionamento carregado com selectinload)
+    HEAVY_FIELDS = ('description', 'music', 'media')
+    
+    # Colunas internas não saem em to_dict (photos é remontada a partir de media);
+    # spotify_url no formato do frontend
+    SERIALIZE_EXCLUDE = ('user_id', 'lat_e7', 'lng_e7', 'photos', 'deleted_at', 'sync_version')
+    SERIALIZE_RENAME = {'spotify_url': 'spotifyUrl'}
+    
     @classmethod
     def create(cls, title, date, lat, lng, user_id, **kwargs):
         """
@@ -76,6 +119,43 @@ class Memory(BaseModel):
             **kwargs
         )
     
+    @validates('date')
+    def _coerce_date(self, key, value):
+        """
+        Aceita a data no formato da API (YYYY-MM-DD) e armazena como date
+        """
+        return parse_date(value)
+    
+    @validates('photos')
+    def _sync_media(self, key, value):
+        """
+        Mantém as linhas de memory_media em sincronia com a lista de mídias
+        
+        Itens que continuam na lista reaproveitam a linha (e os metadados já
+        calculados); apenas URLs novas são inspecionadas.
+        """
+        existing = {} if self.id is None else {item.url: item for item in self.media}
+        rows = []
+        for position, url in enumerate(value or []):
+            if not isinstance(url, str):
+                continue  # Formato legado inválido: não vira mídia
+            row = existing.pop(url, None) or MemoryMedia.from_item(url, position)
+            row.position = position
+            rows.append(row)
+        self.media = rows
+        return value
+    
+    @validates('lat', 'lng')
+    def _sync_e7(self, key, value):
+        """
+        Mantém as colunas inteiras E7 em sincronia com lat/lng a cada escrita
+        """
+        try:
+            setattr(self, f'{key}_e7', to_e7(value))
+        except (TypeError, ValueError):
+            setattr(self, f'{key}_e7', None)
+        return value
+    
     @staticmethod
     def _generate_random_color():
         """
@@ -121,7 +201,28 @@ class Memory(BaseModel):
             dict: Dados da memória no formato esperado pelo frontend
         """
         data = super().to_dict()
-        return serialize_memory_dict(data)
+        # Mesmo formato de serialize_memory_dict: photos/videos a partir das linhas
+        data['photos'], videos = legacy_media_lists(self.media)
+        if data['photos'] or videos:
+            data['videos'] = videos
+        return data
+    
+    def to_marker_dict(self):
+        """
+        Converte memória para a projeção leve usada pelos marcadores do mapa
+        
+        Lê apenas MARKER_FIELDS, então é seguro em instâncias carregadas com
+        load_only (não dispara carregamento das colunas pesadas).
+        
+        Returns:
+            dict: Dados mínimos do marcador
+        """
+        data = {field: getattr(self, field) for field in self.MARKER_FIELDS}
+        data['date'] = format_date(data['date'])
+        return data
     
     def __repr__(self):
         return f'<Memory {self.title}>'
+
+# Índice de busca textual acompanha create_all/drop_all da tabela memories
+register_search_index(Memory.__table__)
@@ -0,0 +1,69 @@
+# ============================================
+# MODEL - memory_media.py
+# Mídias (fotos e vídeos) de cada memória, uma linha por arquivo
+# ============================================
+
+"""
+Modelo MemoryMedia com as mídias das memórias em forma normalizada.
+
+Responsabilidades:
+- Guardar cada foto/vídeo de uma memória com tipo, URL e posição na lista
+- Guardar metadados calculados na escrita (mime, tamanho, dimensões, sha256)
+  e a duração de vídeos (preenchida por backfill_media.py)
+
+As linhas são criadas a partir da lista de mídias atribuída a Memory.photos
+(ver Memory._sync_media), que continua sendo gravada como espelho legado; as
+respostas da API remontam photos/videos com helpers.legacy_media_lists.
+
+Dependências:
+- src.app_factory.db: Instância do SQLAlchemy
+- .base_model.BaseModel: Classe base com funcionalidades comuns
+- src.utils.media_manager: Extração dos metadados das mídias
+
+Padrões de Projeto:
+- Factory Method Pattern: Método from_item() cria a linha a partir da URL
+- Template Method Pattern: Herda comportamentos do BaseModel
+"""
+
+from src.app_factory import db
+from src.utils.media_manager import describe_media_item
+from .base_model import BaseModel
+
+class MemoryMedia(BaseModel):
+    """Foto ou vídeo de uma memória"""
+    
+    __tablename__ = 'memory_media'
+    __table_args__ = (
+        # Mídias de uma memória na ordem da lista (carregamento em lote por memory_id)
+        db.Index('ix_memory_media_memory_position', 'memory_id', 'position'),
+    )
+    
+    memory_id = db.Column(db.Integer, db.ForeignKey('memories.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(10), nullable=False)  # photo, video
+    url = db.Column(db.Text, nullable=False)
+    mime = db.Column(db.String(100))
+    bytes = db.Column(db.BigInteger)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    duration = db.Column(db.Float)  # Segundos (vídeos)
+    sha256 = db.Column(db.String(64))
+    position = db.Column(db.Integer, nullable=False)
+    
+    SERIALIZE_EXCLUDE = ('memory_id',)
+    
+    @classmethod
+    def from_item(cls, item: str, position: int):
+        """
+        Factory Method: cria a linha de uma URL da lista de mídias
+        
+        Args:
+            item (str): URL (ou data URL legada) da mídia
+            position (int): Posição na lista da memória
+            
+        Returns:
+            MemoryMedia: Instância não adicionada à sessão
+        """
+        return cls(position=position, **describe_media_item(item))
+    
+    def __repr__(self):
+        return f'<MemoryMedia {self.kind} memory={self.memory_id} #{self.position}>'
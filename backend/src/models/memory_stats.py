@@ -0,0 +1,228 @@
+# ============================================
+# MODEL - memory_stats.py
+# Agregados de memórias por usuário (mantidos incrementalmente)
+# ============================================
+
+"""
+Modelo MemoryStats com os agregados das memórias de cada usuário.
+
+Responsabilidades:
+- Guardar totais, contagens por mês, contagens de mídia, caixa envolvente,
+  centroide e primeira/última data das memórias de um usuário
+- Aplicar deltas de inclusão/remoção de memórias (O(1) por memória)
+- Sinalizar quando limites (caixa envolvente e datas) precisam ser recalculados
+
+Os agregados são atualizados pelo MemoryRepository na mesma transação das
+escritas de memórias, então a leitura das estatísticas não varre a tabela.
+
+Dependências:
+- src.app_factory.db: Instância do SQLAlchemy
+- .base_model.BaseModel: Classe base com funcionalidades comuns
+
+Padrões de Projeto:
+- Active Record Pattern: Modelo com a lógica de atualização dos agregados
+- Template Method Pattern: Herda comportamentos do BaseModel
+"""
+
+import math
+from src.app_factory import db
+from src.utils.helpers import format_date, split_media
+from .base_model import BaseModel
+
+class MemoryStats(BaseModel):
+    """Agregados das memórias de um usuário (uma linha por usuário)"""
+
+    __tablename__ = 'memory_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+
+    # Contagens
+    total_memories = db.Column(db.Integer, default=0, nullable=False)
+    monthly_counts = db.Column(db.JSON, default=dict, nullable=False)  # {'YYYY-MM': n}
+    photo_count = db.Column(db.Integer, default=0, nullable=False)
+    video_count = db.Column(db.Integer, default=0, nullable=False)
+    music_count = db.Column(db.Integer, default=0, nullable=False)  # Memórias com música
+
+    # Caixa envolvente e intervalo de datas (recalculados quando um extremo é removido)
+    min_lat = db.Column(db.Float)
+    max_lat = db.Column(db.Float)
+    min_lng = db.Column(db.Float)
+    max_lng = db.Column(db.Float)
+    first_date = db.Column(db.Date)
+    last_date = db.Column(db.Date)
+
+    # Soma dos vetores unitários das coordenadas (centroide esférico)
+    sum_x = db.Column(db.Float, default=0.0, nullable=False)
+    sum_y = db.Column(db.Float, default=0.0, nullable=False)
+    sum_z = db.Column(db.Float, default=0.0, nullable=False)
+
+    @staticmethod
+    def snapshot(memory) -> tuple:
+        """
+        Extrai de uma memória (instância ou dict) os campos que entram nos agregados
+
+        Returns:
+            tuple: (date, lat, lng, fotos, vídeos, tem música)
+        """
+        if isinstance(memory, dict):
+            photos, videos = (len(items) for items in split_media(memory.get('photos')))
+            get = memory.get
+        else:
+            # Instância: tipos já gravados nas linhas de memory_media
+            videos = sum(1 for item in memory.media if item.kind == 'video')
+            photos = len(memory.media) - videos
+            get = lambda key: getattr(memory, key)
+        return get('date'), get('lat'), get('lng'), photos, videos, get('music') is not None
+
+    def add(self, snapshot: tuple) -> None:
+        """Inclui uma memória (snapshot) nos agregados"""
+        self.add_many([snapshot])
+
+    def add_many(self, snapshots) -> None:
+        """
+        Inclui várias memórias de uma vez
+
+        Acumula em variáveis locais e atribui cada coluna uma única vez
+        (importação em massa), em vez de um conjunto de atribuições por memória.
+        """
+        total, photo_count, video_count, music_count = 0, 0, 0, 0
+        sum_x, sum_y, sum_z = 0.0, 0.0, 0.0
+        counts = dict(self.monthly_counts or {})
+        min_lat, max_lat, min_lng, max_lng = self.min_lat, self.max_lat, self.min_lng, self.max_lng
+        first_date, last_date = self.first_date, self.last_date
+        for when, lat, lng, photos, videos, has_music in snapshots:
+            total += 1
+            photo_count += photos
+            video_count += videos
+            music_count += has_music
+            month = when.strftime('%Y-%m')
+            counts[month] = counts.get(month, 0) + 1
+            phi, lam = math.radians(lat), math.radians(lng)
+            cos_phi = math.cos(phi)
+            sum_x += cos_phi * math.cos(lam)
+            sum_y += cos_phi * math.sin(lam)
+            sum_z += math.sin(phi)
+            if min_lat is None:
+                min_lat = max_lat = lat
+                min_lng = max_lng = lng
+                first_date = last_date = when
+                continue
+            if lat < min_lat:
+                min_lat = lat
+            elif lat > max_lat:
+                max_lat = lat
+            if lng < min_lng:
+                min_lng = lng
+            elif lng > max_lng:
+                max_lng = lng
+            if when < first_date:
+                first_date = when
+            elif when > last_date:
+                last_date = when
+
+        self.total_memories = (self.total_memories or 0) + total
+        self.photo_count = (self.photo_count or 0) + photo_count
+        self.video_count = (self.video_count or 0) + video_count
+        self.music_count = (self.music_count or 0) + music_count
+        self.monthly_counts = counts  # Nova referência: o JSON é marcado como alterado
+        self.sum_x = (self.sum_x or 0.0) + sum_x
+        self.sum_y = (self.sum_y or 0.0) + sum_y
+        self.sum_z = (self.sum_z or 0.0) + sum_z
+        self.min_lat, self.max_lat, self.min_lng, self.max_lng = min_lat, max_lat, min_lng, max_lng
+        self.first_date, self.last_date = first_date, last_date
+
+    def remove(self, snapshot: tuple) -> bool:
+        """
+        Retira uma memória (snapshot) dos agregados
+
+        Returns:
+            bool: True se a memória estava em um dos limites (caixa ou datas),
+            que então precisam ser recalculados com bounds_from_rows
+        """
+        self._apply(snapshot, -1)
+        if self.total_memories <= 0:
+            self.bounds_from_rows(None)
+            return False
+        when, lat, lng = snapshot[:3]
+        return (lat in (self.min_lat, self.max_lat) or lng in (self.min_lng, self.max_lng)
+                or when in (self.first_date, self.last_date))
+
+    def bounds_from_rows(self, row) -> None:
+        """Define os limites a partir de (min_lat, max_lat, min_lng, max_lng, first_date, last_date)"""
+        (self.min_lat, self.max_lat, self.min_lng, self.max_lng,
+         self.first_date, self.last_date) = row or (None,) * 6
+
+    def _apply(self, snapshot: tuple, sign: int) -> None:
+        when, lat, lng, photos, videos, has_music = snapshot
+        self.total_memories = (self.total_memories or 0) + sign
+        self.photo_count = (self.photo_count or 0) + sign * photos
+        self.video_count = (self.video_count or 0) + sign * videos
+        self.music_count = (self.music_count or 0) + sign * int(has_music)
+
+        month = when.strftime('%Y-%m')
+        counts = dict(self.monthly_counts or {})
+        counts[month] = counts.get(month, 0) + sign
+        if counts[month] <= 0:
+            del counts[month]
+        self.monthly_counts = counts  # Nova referência: o JSON é marcado como alterado
+
+        phi, lam = math.radians(lat), math.radians(lng)
+        self.sum_x = (self.sum_x or 0.0) + sign * math.cos(phi) * math.cos(lam)
+        self.sum_y = (self.sum_y or 0.0) + sign * math.cos(phi) * math.sin(lam)
+        self.sum_z = (self.sum_z or 0.0) + sign * math.sin(phi)
+
+    def centroid(self):
+        """
+        Centroide esférico das coordenadas (média dos vetores unitários)
+
+        Returns:
+            dict: {'lat', 'lng'} ou None se não houver memórias
+        """
+        if not self.total_memories:
+            return None
+        hyp = math.hypot(self.sum_x, self.sum_y)
+        if hyp == 0 and self.sum_z == 0:
+            return None  # Pontos antipodais se anulam
+        return {
+            'lat': round(math.degrees(math.atan2(self.sum_z, hyp)), 6),
+            'lng': round(math.degrees(math.atan2(self.sum_y, self.sum_x)), 6)
+        }
+
+    def to_dict(self):
+        """
+        Converte os agregados para o formato do endpoint /api/memories/stats
+
+        Returns:
+            dict: Estatísticas do usuário
+        """
+        by_month = dict(sorted((self.monthly_counts or {}).items()))
+        by_year = {}
+        for month, count in by_month.items():
+            by_year[month[:4]] = by_year.get(month[:4], 0) + count
+
+        bounds = None
+        if self.total_memories and self.min_lat is not None:
+            bounds = {
+                'min_lat': self.min_lat,
+                'max_lat': self.max_lat,
+                'min_lng': self.min_lng,
+                'max_lng': self.max_lng
+            }
+
+        return {
+            'total_memories': self.total_memories or 0,
+            'by_year': by_year,
+            'by_month': by_month,
+            'media': {
+                'photos': self.photo_count or 0,
+                'videos': self.video_count or 0,
+                'memories_with_music': self.music_count or 0
+            },
+            'bounds': bounds,
+            'centroid': self.centroid(),
+            'first_date': format_date(self.first_date) if self.first_date else None,
+            'last_date': format_date(self.last_date) if self.last_date else None
+        }
+
+    def __repr__(self):
+        return f'<MemoryStats user={self.user_id} total={self.total_memories}>'
@@ -0,0 +1,38 @@
+# ============================================
+# MODEL - memory_tombstone.py
+# Registro de memórias removidas (sincronização incremental)
+# ============================================
+
+"""
+Modelo MemoryTombstone com as remoções de memórias de cada usuário.
+
+Responsabilidades:
+- Registrar o id de cada memória removida, na mesma transação da remoção
+- Permitir que /api/memories/changes informe remoções desde um token de
+  sincronização (a linha da memória já não existe para ser consultada)
+
+Dependências:
+- src.app_factory.db: Instância do SQLAlchemy
+- .base_model.BaseModel: Classe base com funcionalidades comuns
+
+Padrões de Projeto:
+- Template Method Pattern: Herda comportamentos do BaseModel
+"""
+
+from src.app_factory import db
+from .base_model import BaseModel
+
+class MemoryTombstone(BaseModel):
+    """Remoção de uma memória (created_at é o momento da remoção)"""
+    
+    __tablename__ = 'memory_tombstones'
+    __table_args__ = (
+        # Remoções de um usuário em ordem de registro (cursor por id)
+        db.Index('ix_memory_tombstones_user_id_id', 'user_id', 'id'),
+    )
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    memory_id = db.Column(db.Integer, nullable=False)  # Sem FK: a memória foi removida
+    
+    def __repr__(self):
+        return f'<MemoryTombstone memory={self.memory_id} user={self.user_id}>'
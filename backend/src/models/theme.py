@@ -41,6 +41,14 @@ class Theme(BaseModel):
     # Relacionamento com usuário (um-para-um)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
     
+    # Campos no formato esperado pelo frontend (user_id não sai em to_dict)
+    SERIALIZE_EXCLUDE = ('user_id',)
+    SERIALIZE_RENAME = {
+        'gradient_name': 'gradientName',
+        'gradient_css': 'gradientCss',
+        'is_active': 'isActive'
+    }
+    
     @classmethod
     def create(cls, user_id, gradient_name='default', gradient_css=None, **kwargs):
         """
@@ -95,17 +103,7 @@ class Theme(BaseModel):
         Returns:
             dict: Dados do tema no formato esperado pelo frontend
         """
-        data = super().to_dict()
-        
-        # Remover user_id do retorno
-        data.pop('user_id', None)
-        
-        # Adicionar campos no formato esperado pelo frontend
-        data['gradientName'] = data.pop('gradient_name')
-        data['gradientCss'] = data.pop('gradient_css')
-        data['isActive'] = data.pop('is_active')
-        
-        return data
+        return super().to_dict()
     
     def __repr__(self):
         return f'<Theme {self.gradient_name} for User {self.user_id}>'
\ No newline at end of file
@@ -0,0 +1,39 @@
+# ============================================
+# MODEL - token_blocklist.py
+# Tokens JWT revogados (logout)
+# ============================================
+
+"""
+Modelo TokenBlocklist com os identificadores (jti) de tokens JWT revogados.
+
+Responsabilidades:
+- Registrar o jti de cada token revogado no logout, com a expiração do token
+- Permitir o descarte automático das linhas após a expiração (o token já
+  seria recusado pela assinatura/exp, então a linha deixa de ser necessária)
+
+Dependências:
+- src.app_factory.db: Instância do SQLAlchemy
+- .base_model.BaseModel: Classe base com funcionalidades comuns
+
+Padrões de Projeto:
+- Template Method Pattern: Herda comportamentos do BaseModel
+"""
+
+from src.app_factory import db
+from .base_model import BaseModel
+
+class TokenBlocklist(BaseModel):
+    """Token JWT revogado (created_at é o momento da revogação)"""
+    
+    __tablename__ = 'token_blocklist'
+    __table_args__ = (
+        # Sincronização incremental do filtro de Bloom (revogações recentes)
+        db.Index('ix_token_blocklist_created_at', 'created_at'),
+    )
+    
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<TokenBlocklist {self.jti} user={self.user_id}>'
@@ -3,8 +3,10 @@
 # Modelo de usuário da aplicação
 # ============================================
 
-import bcrypt
+from sqlalchemy.orm import validates
 from src.app_factory import db
+from src.utils.helpers import normalize_email
+from src.utils.password_hasher import password_hasher
 from .base_model import BaseModel
 
 class User(BaseModel):
@@ -25,6 +27,9 @@ class User(BaseModel):
     # Campos específicos do usuário
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    # Email canônico (normalize_email): buscas sem diferenciar maiúsculas e unicidade
+    # entre variações; NULL apenas em contas duplicadas preservadas pela migração 0011
+    email_normalized = db.Column(db.String(120), unique=True, index=True)
     password_hash = db.Column(db.String(128), nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     
@@ -33,9 +38,17 @@ class User(BaseModel):
     theme_preference = db.Column(db.String(20), default='auto', nullable=False)  # light, dark, auto
     map_theme = db.Column(db.String(20), default='light', nullable=False)  # light, dark, satellite
     
+    # Versão da coleção de memórias (incrementada a cada escrita; base dos ETags)
+    memories_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     # Relacionamentos
     memories = db.relationship('Memory', backref='user', lazy=True, cascade='all, delete-orphan')
     theme = db.relationship('Theme', backref='user', uselist=False, cascade='all, delete-orphan')
+    memory_stats = db.relationship('MemoryStats', uselist=False, cascade='all, delete-orphan')
+    memory_tombstones = db.relationship('MemoryTombstone', lazy='dynamic', cascade='all, delete-orphan')
+    
+    # Senha e colunas internas não saem em to_dict
+    SERIALIZE_EXCLUDE = ('password_hash', 'memories_version', 'email_normalized')
     
     @classmethod
     def create(cls, name, email, password, **kwargs):
@@ -83,18 +96,29 @@ class User(BaseModel):
             **kwargs
         )
     
+    @validates('email')
+    def _sync_email_normalized(self, key, value):
+        """
+        Mantém email_normalized em sincronia com o email a cada escrita
+        """
+        self.email_normalized = normalize_email(value)
+        return value
+    
     @staticmethod
     def _hash_password(password):
         """
-        Criptografa a senha usando bcrypt
+        Criptografa a senha usando bcrypt (custo BCRYPT_ROUNDS, no pool de hash)
         
         Args:
             password (str): Senha em texto plano
             
         Returns:
             str: Senha criptografada
+            
+        Raises:
+            HasherBusyError: Se o pool de hash estiver saturado
         """
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return password_hasher.hash(password)
     
     def check_password(self, password):
         """
@@ -105,8 +129,29 @@ class User(BaseModel):
             
         Returns:
             bool: True se a senha estiver correta
+            
+        Raises:
+            HasherBusyError: Se o pool de hash estiver saturado
+        """
+        return password_hasher.verify(password, self.password_hash)
+    
+    def rehash_password_if_needed(self, password):
+        """
+        Regrava o hash com o custo atual (BCRYPT_ROUNDS) se ele for diferente
+        
+        Chamado após uma verificação bem-sucedida, quando a senha em texto plano
+        está disponível. Não grava no banco (o chamador faz o commit).
+        
+        Args:
+            password (str): Senha em texto plano já verificada
+            
+        Returns:
+            bool: True se o hash foi substituído
         """
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        if not password_hasher.needs_rehash(self.password_hash):
+            return False
+        self.password_hash = self._hash_password(password)
+        return True
     
     def to_dict(self):
         """
@@ -115,9 +160,7 @@ class User(BaseModel):
         Returns:
             dict: Dados do usuário sem informações sensíveis
         """
-        data = super().to_dict()
-        data.pop('password_hash', None)  # Remove senha do retorno
-        return data
+        return super().to_dict()
     
     def __repr__(self):
         return f'<User {self.email}>'
@@ -6,6 +6,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, Any
 from src.app_factory import db
+from src.utils.helpers import paginate_keyset
 
 class BaseRepository(ABC):
     """
@@ -179,4 +180,27 @@ class BaseRepository(ABC):
             page=page, 
             per_page=per_page, 
             error_out=False
-        )
\ No newline at end of file
+        )
+    
+    def paginate_by_cursor(self, query=None, order_columns: Optional[List[Any]] = None,
+                           cursor: Optional[str] = None, limit: int = 50) -> dict:
+        """
+        Busca instâncias com paginação por cursor (keyset), sem OFFSET
+        
+        Args:
+            query: Query base já filtrada (padrão: todas as instâncias)
+            order_columns (List, optional): Colunas de ordenação (padrão: [id])
+            cursor (str, optional): Cursor opaco da página anterior
+            limit (int): Itens por página
+            
+        Returns:
+            dict: Itens, próximo cursor e indicador de continuação
+            
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        if query is None:
+            query = self.model_class.query
+        if not order_columns:
+            order_columns = [self.model_class.id]
+        return paginate_keyset(query, order_columns, cursor=cursor, limit=limit)
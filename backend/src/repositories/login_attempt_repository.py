@@ -0,0 +1,86 @@
+# ============================================
+# LOGIN ATTEMPT REPOSITORY - Repository Pattern
+# Repositório das tentativas de login recentes
+# ============================================
+
+from datetime import datetime
+from typing import Iterable, List
+from .base_repository import BaseRepository
+from src.app_factory import db
+from src.database import DatabaseManager
+from src.models.login_attempt import LoginAttempt
+
+class LoginAttemptRepository(BaseRepository):
+    """Repositório das tentativas de login (estado do login_throttle)"""
+    
+    def __init__(self):
+        super().__init__(LoginAttempt)
+    
+    def recent(self, key: str, since: datetime, limit: int) -> List[datetime]:
+        """
+        Instantes das últimas tentativas de uma chave (índice (key, created_at))
+        
+        Args:
+            key (str): Chave da tentativa ('email:...' ou 'ip:...')
+            since (datetime): Apenas tentativas depois deste instante
+            limit (int): Máximo de instantes
+            
+        Returns:
+            Instantes em ordem decrescente
+        """
+        rows = db.session.query(LoginAttempt.created_at).filter(
+            LoginAttempt.key == key,
+            LoginAttempt.created_at > since
+        ).order_by(LoginAttempt.created_at.desc()).limit(limit).all()
+        return [created_at for created_at, in rows]
+    
+    def record(self, keys: Iterable[str], at: datetime) -> None:
+        """
+        Registra uma tentativa para cada chave (INSERT em lote, com commit)
+        
+        Args:
+            keys (Iterable[str]): Chaves da tentativa
+            at (datetime): Instante da tentativa (UTC)
+        """
+        try:
+            DatabaseManager.insert_rows(LoginAttempt, [
+                {'key': key, 'created_at': at, 'updated_at': at} for key in keys
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def clear(self, key: str) -> None:
+        """
+        Remove as tentativas de uma chave (login bem-sucedido)
+        
+        Args:
+            key (str): Chave da tentativa
+        """
+        try:
+            LoginAttempt.query.filter(LoginAttempt.key == key).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def purge_older_than(self, cutoff: datetime) -> int:
+        """
+        Remove tentativas que já saíram de todas as janelas
+        
+        Args:
+            cutoff (datetime): Instante limite (UTC)
+            
+        Returns:
+            Quantidade de linhas removidas
+        """
+        try:
+            removed = LoginAttempt.query.filter(
+                LoginAttempt.created_at < cutoff
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return removed
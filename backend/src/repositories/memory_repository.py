@@ -17,7 +17,8 @@ Responsabilidades:
 Dependências:
 - .base_repository.BaseRepository: Classe base com operações CRUD
 - src.models.memory.Memory: Modelo de dados de memórias
-- src.database.db: Instância do banco de dados
+- src.app_factory.db: Instância do banco de dados
+- src.utils.media_manager: Armazenamento de mídias em disco
 - typing: Tipagem para melhor documentação
 
 Padrões de Projeto:
@@ -26,10 +27,45 @@ Padrões de Projeto:
 - Facade Pattern: Interface simplificada para operações complexas
 """
 
-from typing import List, Optional
+import os
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional
+from sqlalchemy import Integer, and_, cast, func, or_
+from sqlalchemy.orm import load_only, selectinload, undefer
 from .base_repository import BaseRepository
 from src.models.memory import Memory
-from src.database import db
+from src.models.memory_media import MemoryMedia
+from src.models.memory_stats import MemoryStats
+from src.models.memory_tombstone import MemoryTombstone
+from src.models.user import User
+from src.app_factory import db
+from src.database import DatabaseManager
+from src.utils.media_manager import (
+    describe_media_item, externalize_media, media_file_path, parse_file_url, probe_video_duration,
+    remove_media_files, remove_memory_dir
+)
+from src.utils.helpers import (
+    E7, bounding_box_e7, calculate_distance, decode_cursor, encode_cursor, parse_date, to_e7
+)
+from src.utils.spatial_index import coordinate_index
+from src.utils import search_index
+
+# Rótulo do bucket da linha do tempo por dialeto (mesmo formato nos dois bancos):
+# day/week = YYYY-MM-DD (semana começa na segunda), month = YYYY-MM, year = YYYY
+_TIMELINE_BUCKETS = {
+    'sqlite': {
+        'day': lambda column: func.strftime('%Y-%m-%d', column),
+        'week': lambda column: func.date(column, 'weekday 0', '-6 days'),
+        'month': lambda column: func.strftime('%Y-%m', column),
+        'year': lambda column: func.strftime('%Y', column),
+    },
+    'postgresql': {
+        'day': lambda column: func.to_char(column, 'YYYY-MM-DD'),
+        'week': lambda column: func.to_char(func.date_trunc('week', column), 'YYYY-MM-DD'),
+        'month': lambda column: func.to_char(column, 'YYYY-MM'),
+        'year': lambda column: func.to_char(column, 'YYYY'),
+    },
+}
 
 class MemoryRepository(BaseRepository):
     """Repositório para operações com memórias"""
@@ -37,17 +73,193 @@ class MemoryRepository(BaseRepository):
     def __init__(self):
         super().__init__(Memory)
     
-    def get_by_user(self, user_id: int) -> List[Memory]:
+    def _query(self, include: Optional[Iterable[str]] = None):
+        """
+        Monta a query base de memórias, carregando colunas adiadas sob demanda
+        
+        As colunas de Memory.DEFERRED_FIELDS são adiadas no modelo; as listadas em
+        include entram no mesmo SELECT (undefer) em vez de gerar uma consulta
+        extra por linha quando acessadas. 'media' carrega as mídias de todas as
+        memórias do resultado em uma única consulta extra (selectinload).
+        Memórias removidas (deleted_at preenchido) nunca entram no resultado.
+        
+        Args:
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            
+        Returns:
+            Query de Memory
+            
+        Raises:
+            ValueError: Se include tiver campo desconhecido
+        """
+        query = Memory.query.filter(Memory.deleted_at.is_(None))
+        if include:
+            include = set(include)
+            unknown = include - set(Memory.DEFERRED_FIELDS) - {'media'}
+            if unknown:
+                raise ValueError(f"Campos inválidos em include: {', '.join(sorted(unknown))}")
+            query = query.options(*[
+                selectinload(Memory.media) if field == 'media' else undefer(getattr(Memory, field))
+                for field in include
+            ])
+        return query
+    
+    def get_by_user(self, user_id: int, include: Optional[Iterable[str]] = None) -> List[Memory]:
         """
         Busca todas as memórias de um usuário
         
         Args:
             user_id (int): ID do usuário
+            include (Iterable[str], optional): Colunas pesadas a carregar
             
         Returns:
             Lista de memórias do usuário
         """
-        return self.find_by(user_id=user_id)
+        return self._query(include).filter_by(user_id=user_id).all()
+    
+    def get_by_user_page(self, user_id: int, limit: int = 50, cursor: Optional[str] = None,
+                         include: Optional[Iterable[str]] = None, start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> dict:
+        """
+        Busca uma página de memórias de um usuário (mais recentes primeiro)
+        
+        Usa paginação por keyset em (date, id), apoiada pelo índice
+        ix_memories_user_date_id, para que páginas profundas custem o mesmo
+        que a primeira. Com start_date e end_date, apenas o período é paginado.
+        
+        Args:
+            user_id (int): ID do usuário
+            limit (int): Itens por página
+            cursor (str, optional): Cursor opaco da página anterior
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            start_date (str, optional): Data inicial (YYYY-MM-DD)
+            end_date (str, optional): Data final (YYYY-MM-DD)
+            
+        Returns:
+            dict: Itens, próximo cursor e indicador de continuação
+            
+        Raises:
+            ValueError: Se o cursor ou alguma data for inválido
+        """
+        query = self._query(include).filter(Memory.user_id == user_id)
+        if start_date and end_date:
+            query = query.filter(Memory.date.between(parse_date(start_date), parse_date(end_date)))
+        return self.paginate_by_cursor(query, [Memory.date, Memory.id], cursor=cursor, limit=limit)
+    
+    def iter_by_user(self, user_id: int, include: Optional[Iterable[str]] = None,
+                     batch_size: int = 500) -> Iterator[Memory]:
+        """
+        Percorre todas as memórias de um usuário em lotes (ordem de id)
+        
+        Usa yield_per: as linhas são buscadas batch_size por vez e as instâncias
+        já consumidas podem ser liberadas, então a memória não cresce com o
+        tamanho da conta (usado pela exportação em streaming).
+        
+        Args:
+            user_id (int): ID do usuário
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            batch_size (int): Linhas por lote
+            
+        Returns:
+            Iterador de memórias
+        """
+        query = self._query(include).filter(Memory.user_id == user_id).order_by(Memory.id)
+        return iter(query.yield_per(batch_size))
+    
+    def get_changes(self, user_id: int, since: Optional[str] = None, limit: int = 100) -> dict:
+        """
+        Busca as memórias criadas/alteradas e as remoções desde um token de sincronização
+        
+        O token guarda (sync_version, id) da última memória entregue e o id do
+        último tombstone entregue. As memórias seguem em ordem crescente de
+        (sync_version, id), apoiadas pelo índice ix_memories_user_sync_version_id,
+        e as remoções em ordem de id (ix_memory_tombstones_user_id_id): o custo
+        é proporcional às mudanças, não ao tamanho da coleção.
+        
+        sync_version é o users.memories_version obtido por _touch_collection:
+        o UPDATE da linha do usuário fica travado até o commit (lock de linha
+        no Postgres, lock de escrita no SQLite), então as versões de um
+        usuário seguem a ordem de commit e uma alteração nunca é gravada com
+        versão anterior a um token já entregue. Não depende de relógio
+        (updated_at), que não garante essa ordem entre workers.
+        
+        Sem token, entrega a coleção inteira (sincronização inicial) e nenhuma
+        remoção anterior. Tokens anteriores a sync_version (com updated_at)
+        recomeçam as memórias do início, mantendo as remoções já entregues.
+        
+        Args:
+            user_id (int): ID do usuário
+            since (str, optional): Token retornado pela chamada anterior
+            limit (int): Máximo de memórias e de remoções por chamada
+            
+        Returns:
+            dict: 'memories', 'deleted' (ids), 'next_token' e 'has_more'
+            
+        Raises:
+            ValueError: Se o token for inválido
+        """
+        limit = max(1, min(500, limit))
+        
+        if since:
+            try:
+                version, memory_id, tombstone_id = decode_cursor(since, 3)
+                if version is None or isinstance(version, str):
+                    version, memory_id = 0, 0  # Token legado (updated_at, id)
+                version, memory_id, tombstone_id = int(version), int(memory_id), int(tombstone_id)
+            except (TypeError, ValueError):
+                raise ValueError('Token de sincronização inválido')
+        else:
+            version, memory_id = 0, 0
+            tombstone_id = db.session.query(func.max(MemoryTombstone.id)).filter(
+                MemoryTombstone.user_id == user_id
+            ).scalar() or 0
+        
+        query = self._query(Memory.HEAVY_FIELDS).filter(
+            Memory.user_id == user_id,
+            or_(
+                Memory.sync_version > version,
+                and_(Memory.sync_version == version, Memory.id > memory_id)
+            )
+        )
+        memories = query.order_by(Memory.sync_version, Memory.id).limit(limit + 1).all()
+        
+        tombstones = db.session.query(MemoryTombstone.id, MemoryTombstone.memory_id).filter(
+            MemoryTombstone.user_id == user_id,
+            MemoryTombstone.id > tombstone_id
+        ).order_by(MemoryTombstone.id).limit(limit + 1).all()
+        
+        has_more = len(memories) > limit or len(tombstones) > limit
+        memories, tombstones = memories[:limit], tombstones[:limit]
+        if memories:
+            version, memory_id = memories[-1].sync_version, memories[-1].id
+        if tombstones:
+            tombstone_id = tombstones[-1].id
+        
+        return {
+            'memories': memories,
+            'deleted': [row.memory_id for row in tombstones],
+            'next_token': encode_cursor([version, memory_id, tombstone_id]),
+            'has_more': has_more
+        }
+    
+    def get_markers_by_user(self, user_id: int) -> List[Memory]:
+        """
+        Busca as memórias de um usuário carregando apenas os campos do marcador
+        
+        O SELECT é restrito às colunas de Memory.MARKER_FIELDS; description,
+        photos e music não saem do banco.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            Lista de memórias parcialmente carregadas (usar to_marker_dict)
+        """
+        columns = [getattr(Memory, field) for field in Memory.MARKER_FIELDS]
+        return Memory.query.options(load_only(*columns, raiseload=True)).filter(
+            Memory.user_id == user_id,
+            Memory.deleted_at.is_(None)
+        ).all()
     
     def create_memory(self, user_id: int, title: str, date: str, lat: float, lng: float, **kwargs) -> Memory:
         """
@@ -67,32 +279,118 @@ class MemoryRepository(BaseRepository):
         Raises:
             ValueError: Se dados obrigatórios estiverem inválidos
         """
-        memory = self.create(
-            user_id=user_id,
-            title=title,
-            date=date,
-            lat=lat,
-            lng=lng,
-            **kwargs
-        )
-        
-        # Validar a memória criada
-        memory.validate()
+        photos = kwargs.pop('photos', None)
+        memory = None
+        try:
+            stats = self._lock_stats(user_id)
+            memory = self.model_class.create(
+                user_id=user_id,
+                title=title,
+                date=date,
+                lat=lat,
+                lng=lng,
+                **kwargs
+            )
+            
+            # Validar a memória antes de persistir
+            memory.validate()
+            
+            # Flush para obter o ID (diretório de mídias e índice de busca)
+            db.session.flush()
+            if photos:
+                # Mídias inline (base64) vão para o disco; a linha guarda apenas
+                # as URLs de make_file_url
+                memory.photos = externalize_media(user_id, memory.id, photos)
+            
+            search_index.upsert_document(db.session, memory.id, user_id, title, kwargs.get('description'))
+            stats.add(MemoryStats.snapshot(memory))
+            memory.sync_version = self._touch_collection(user_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            if memory is not None and memory.id is not None:
+                remove_memory_dir(user_id, memory.id)
+            raise
         
+        coordinate_index.upsert(user_id, memory.id, lat, lng)
         return memory
     
-    def get_user_memory(self, memory_id: int, user_id: int) -> Optional[Memory]:
+    def bulk_create_memories(self, user_id: int, rows: List[dict]) -> List[int]:
+        """
+        Cria várias memórias já validadas em uma única transação
+        
+        Usa INSERT Core em lote (sem objetos ORM) e indexa os textos em lote;
+        a versão da coleção é incrementada uma vez por chamada.
+        
+        Args:
+            user_id (int): ID do usuário
+            rows (List[dict]): Campos das memórias (title, date, lat, lng e opcionais)
+            
+        Returns:
+            Lista de IDs criados (sem ordem garantida)
+        """
+        if not rows:
+            return []
+        
+        stats = self._lock_stats(user_id)
+        values = []
+        for row in rows:
+            values.append({
+                'user_id': user_id,
+                'title': row['title'],
+                'description': row.get('description'),
+                'date': parse_date(row['date']),
+                'lat': row['lat'],
+                'lng': row['lng'],
+                'lat_e7': to_e7(row['lat']),
+                'lng_e7': to_e7(row['lng']),
+                'photos': row.get('photos'),
+                'music': row.get('music'),
+                'spotify_url': row.get('spotify_url'),
+                'color': row.get('color') or Memory._generate_random_color()
+            })
+        
+        try:
+            version = self._touch_collection(user_id)
+            for value in values:
+                value['sync_version'] = version
+            stats.add_many(MemoryStats.snapshot(value) for value in values)
+            inserted = DatabaseManager.insert_rows(
+                Memory, values, returning=[Memory.id, Memory.title, Memory.description, Memory.photos]
+            )
+            search_index.insert_documents(db.session, [
+                (memory_id, user_id, title, description)
+                for memory_id, title, description, _ in inserted
+            ])
+            # Mídias normalizadas a partir das listas retornadas (sem depender da
+            # ordem do RETURNING)
+            DatabaseManager.insert_rows(MemoryMedia, [
+                dict(describe_media_item(url), memory_id=memory_id, position=position)
+                for memory_id, _, _, photos in inserted
+                for position, url in enumerate(photos or [])
+                if isinstance(url, str)
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        coordinate_index.invalidate(user_id)
+        return [row[0] for row in inserted]
+    
+    def get_user_memory(self, memory_id: int, user_id: int, include: Optional[Iterable[str]] = None) -> Optional[Memory]:
         """
         Busca uma memória específica de um usuário
         
         Args:
             memory_id (int): ID da memória
             user_id (int): ID do usuário
+            include (Iterable[str], optional): Colunas pesadas a carregar
             
         Returns:
             Memória encontrada ou None
         """
-        return self.find_one_by(id=memory_id, user_id=user_id)
+        return self._query(include).filter_by(id=memory_id, user_id=user_id).first()
     
     def update_memory(self, memory_id: int, user_id: int, **kwargs) -> Optional[Memory]:
         """
@@ -106,17 +404,69 @@ class MemoryRepository(BaseRepository):
         Returns:
             Memória atualizada ou None se não encontrada
         """
-        memory = self.get_user_memory(memory_id, user_id)
+        memory = self.get_user_memory(memory_id, user_id, include=Memory.HEAVY_FIELDS)
         if memory:
-            updated_memory = self.update(memory, **kwargs)
-            updated_memory.validate()
-            return updated_memory
+            previous_media = [item.url for item in memory.media]
+            written = []
+            try:
+                if kwargs.get('photos'):
+                    # Mídias novas enviadas em base64 vão para o disco antes do update
+                    kwargs['photos'] = externalize_media(user_id, memory.id, kwargs['photos'], written)
+                stats = self._lock_stats(user_id)
+                previous = MemoryStats.snapshot(memory)
+                memory.update(**kwargs)
+                memory.validate()
+                lat, lng = memory.lat, memory.lng
+                if 'title' in kwargs or 'description' in kwargs:
+                    search_index.upsert_document(db.session, memory_id, user_id, memory.title, memory.description)
+                stale = stats.remove(previous)
+                stats.add(MemoryStats.snapshot(memory))
+                if stale:
+                    self._refresh_stats_bounds(stats)
+                memory.sync_version = self._touch_collection(user_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                remove_media_files(written)
+                raise
+            if 'photos' in kwargs:
+                self._remove_replaced_media(user_id, memory_id, previous_media, kwargs['photos'])
+            coordinate_index.upsert(user_id, memory_id, lat, lng)
+            return memory
         return None
     
+    def _remove_replaced_media(self, user_id: int, memory_id: int, previous: List[str],
+                               current: Optional[List[Any]]) -> None:
+        """
+        Apaga do disco as mídias da memória que saíram da lista (após o commit)
+        
+        Apenas arquivos da pasta da própria memória são considerados, e um
+        arquivo ainda referenciado por outra linha de memory_media é mantido.
+        
+        Args:
+            user_id (int): ID do usuário
+            memory_id (int): ID da memória
+            previous (List[str]): URLs de mídia antes da atualização
+            current (List, optional): Lista de mídias gravada
+        """
+        current = set(current or ())
+        removed = [
+            url for url in previous
+            if url not in current and (parse_file_url(url) or ())[:2] == (user_id, memory_id)
+        ]
+        if not removed:
+            return
+        referenced = {url for (url,) in db.session.query(MemoryMedia.url).filter(MemoryMedia.url.in_(removed))}
+        remove_media_files([media_file_path(url) for url in removed if url not in referenced])
+    
     def delete_memory(self, memory_id: int, user_id: int) -> bool:
         """
         Remove uma memória de um usuário
         
+        A remoção é lógica (deleted_at): a requisição apenas marca a linha e
+        atualiza agregados, índice de busca e tombstone. A linha, as mídias e a
+        pasta em disco são apagadas depois, em lote, pelo memory_purger.
+        
         Args:
             memory_id (int): ID da memória
             user_id (int): ID do usuário
@@ -124,12 +474,249 @@ class MemoryRepository(BaseRepository):
         Returns:
             True se removida com sucesso
         """
-        memory = self.get_user_memory(memory_id, user_id)
+        memory = self.get_user_memory(memory_id, user_id, include=('music', 'media'))
         if memory:
-            return self.delete(memory)
+            try:
+                stats = self._lock_stats(user_id)
+                snapshot = MemoryStats.snapshot(memory)
+                memory.deleted_at = datetime.utcnow()
+                db.session.add(MemoryTombstone(user_id=user_id, memory_id=memory_id))
+                search_index.delete_document(db.session, memory_id)
+                if stats.remove(snapshot):
+                    self._refresh_stats_bounds(stats)
+                self._touch_collection(user_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            coordinate_index.remove(user_id, memory_id)
+            return True
         return False
     
-    def get_memories_by_location(self, user_id: int, lat: float, lng: float, radius: float = 0.01) -> List[Memory]:
+    def get_user_memories_by_ids(self, user_id: int, memory_ids: Iterable[int],
+                                 include: Optional[Iterable[str]] = None) -> dict:
+        """
+        Busca várias memórias de um usuário em uma única consulta (IN)
+        
+        Args:
+            user_id (int): ID do usuário
+            memory_ids (Iterable[int]): IDs procurados
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            
+        Returns:
+            dict: {id: memória} apenas para os IDs que pertencem ao usuário
+        """
+        memory_ids = set(memory_ids)
+        if not memory_ids:
+            return {}
+        memories = self._query(include).filter(
+            Memory.user_id == user_id,
+            Memory.id.in_(memory_ids)
+        ).all()
+        return {memory.id: memory for memory in memories}
+    
+    def apply_batch(self, user_id: int, operations: List[dict]) -> List[dict]:
+        """
+        Aplica criações, atualizações e remoções de memórias em uma única transação
+        
+        A posse das memórias alvo é verificada com uma única consulta IN; uma
+        operação sobre memória inexistente (ou de outro usuário) é recusada sem
+        impedir as demais. O lote é gravado com um único commit e um único
+        incremento da versão da coleção.
+        
+        Args:
+            user_id (int): ID do usuário
+            operations (List[dict]): Operações já validadas, no formato
+                {'op': 'create'|'update'|'delete', 'id': int, 'fields': dict}
+                (id apenas em update/delete; fields apenas em create/update)
+            
+        Returns:
+            Lista de resultados na ordem das operações, com 'op', 'status' e
+            'memory' (create/update), 'id' (delete) ou 'error'
+            
+        Raises:
+            ValueError: Se uma memória criada ou alterada for inválida (validate)
+                ou tiver mídia recusada; nada do lote é gravado
+            Exception: Em erro de banco; nada do lote é gravado
+        """
+        owned = self.get_user_memories_by_ids(
+            user_id,
+            [operation['id'] for operation in operations if operation['op'] != 'create'],
+            include=Memory.HEAVY_FIELDS
+        )
+        results = []
+        created = []
+        replaced = []  # (memory_id, URLs anteriores, lista nova) das atualizações de mídia
+        written = []  # Arquivos gravados pelo lote (removidos se a transação falhar)
+        stale = False
+        try:
+            stats = self._lock_stats(user_id)
+            for operation in operations:
+                kind = operation['op']
+                if kind == 'create':
+                    fields = dict(operation['fields'])
+                    photos = fields.pop('photos', None)
+                    memory = Memory.create(user_id=user_id, **fields)
+                    memory.validate()
+                    created.append((memory, photos))
+                    results.append({'op': kind, 'status': 201, 'memory': memory})
+                    continue
+                
+                memory = owned.get(operation['id'])
+                if memory is None:
+                    results.append({'op': kind, 'status': 404, 'id': operation['id'],
+                                    'error': 'Memória não encontrada'})
+                elif kind == 'update':
+                    fields = dict(operation['fields'])
+                    if 'photos' in fields:
+                        previous_media = [item.url for item in memory.media]
+                        fields['photos'] = externalize_media(user_id, memory.id, fields['photos'], written)
+                        replaced.append((memory.id, previous_media, fields['photos']))
+                    previous = MemoryStats.snapshot(memory)
+                    memory.update(**fields)
+                    memory.validate()
+                    stale = stats.remove(previous) or stale
+                    stats.add(MemoryStats.snapshot(memory))
+                    if 'title' in fields or 'description' in fields:
+                        search_index.upsert_document(db.session, memory.id, user_id, memory.title, memory.description)
+                    results.append({'op': kind, 'status': 200, 'memory': memory})
+                else:
+                    stale = stats.remove(MemoryStats.snapshot(memory)) or stale
+                    memory.deleted_at = datetime.utcnow()  # Apagada depois pelo memory_purger
+                    db.session.add(MemoryTombstone(user_id=user_id, memory_id=memory.id))
+                    search_index.delete_document(db.session, memory.id)
+                    owned.pop(memory.id)
+                    results.append({'op': kind, 'status': 200, 'id': memory.id})
+            
+            if created:
+                # Flush único para obter os IDs das memórias novas
+                db.session.flush()
+                for memory, photos in created:
+                    if photos:
+                        memory.photos = externalize_media(user_id, memory.id, photos, written)
+                    search_index.upsert_document(db.session, memory.id, user_id, memory.title, memory.description)
+                    stats.add(MemoryStats.snapshot(memory))
+            
+            if stale:
+                self._refresh_stats_bounds(stats)
+            if any(result['status'] < 400 for result in results):
+                version = self._touch_collection(user_id)
+                for result in results:
+                    if 'memory' in result:
+                        result['memory'].sync_version = version
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            remove_media_files(written)
+            for memory, _ in created:
+                if memory.id is not None:
+                    remove_memory_dir(user_id, memory.id)
+            raise
+        
+        for memory_id, previous_media, photos in replaced:
+            self._remove_replaced_media(user_id, memory_id, previous_media, photos)
+        coordinate_index.invalidate(user_id)
+        # O commit expira as instâncias: recarregá-las em uma consulta IN em vez
+        # de um SELECT por memória na serialização
+        self.get_user_memories_by_ids(
+            user_id,
+            [result['memory'].id for result in results if 'memory' in result],
+            include=Memory.HEAVY_FIELDS
+        )
+        return results
+    
+    def get_purgeable_memories(self, older_than: datetime, limit: int = 100,
+                               exclude: Iterable[int] = ()) -> List[tuple]:
+        """
+        Busca memórias removidas logicamente prontas para o expurgo
+        
+        Usa o índice parcial ix_memories_deleted_at (apenas linhas removidas),
+        então a consulta não depende do tamanho da tabela.
+        
+        Args:
+            older_than (datetime): Apenas memórias removidas até este instante
+            limit (int): Máximo de memórias
+            exclude (Iterable[int]): IDs a ignorar (ex: aguardando nova tentativa)
+            
+        Returns:
+            Lista de (id, user_id) em ordem de remoção
+        """
+        query = db.session.query(Memory.id, Memory.user_id).filter(
+            Memory.deleted_at.isnot(None),
+            Memory.deleted_at <= older_than
+        )
+        exclude = list(exclude)
+        if exclude:
+            query = query.filter(Memory.id.notin_(exclude))
+        return [tuple(row) for row in query.order_by(Memory.deleted_at).limit(limit).all()]
+    
+    def purge_memories(self, memory_ids: Iterable[int]) -> int:
+        """
+        Apaga definitivamente memórias removidas logicamente (e suas mídias)
+        
+        DELETE em lote com IN; memórias não removidas logicamente são ignoradas.
+        
+        Args:
+            memory_ids (Iterable[int]): IDs das memórias
+            
+        Returns:
+            Quantidade de memórias apagadas
+        """
+        memory_ids = list(memory_ids)
+        if not memory_ids:
+            return 0
+        try:
+            condition = (Memory.id.in_(memory_ids), Memory.deleted_at.isnot(None))
+            MemoryMedia.query.filter(
+                MemoryMedia.memory_id.in_(db.select(Memory.id).where(*condition))
+            ).delete(synchronize_session=False)
+            purged = Memory.query.filter(*condition).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return purged
+    
+    def get_collection_version(self, user_id: int) -> int:
+        """
+        Retorna a versão da coleção de memórias de um usuário
+        
+        Consulta apenas a tabela users (chave primária), sem tocar em memories;
+        usada para gerar ETags das leituras de memórias.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            Versão atual (0 se o usuário não existir)
+        """
+        version = db.session.query(User.memories_version).filter(User.id == user_id).scalar()
+        return version or 0
+    
+    def _touch_collection(self, user_id: int) -> int:
+        """
+        Registra uma escrita na coleção de memórias do usuário
+        
+        Incrementa users.memories_version na mesma transação da escrita
+        (UPDATE atômico, seguro entre workers). Chamado por toda operação que
+        altera memórias, antes do commit; a linha do usuário fica travada até
+        o commit, então as versões seguem a ordem de commit (ver get_changes).
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            Nova versão, a gravar em sync_version das memórias alteradas
+        """
+        return db.session.execute(
+            db.update(User).where(User.id == user_id)
+            .values(memories_version=User.memories_version + 1)
+            .returning(User.memories_version),
+            execution_options={'synchronize_session': False}
+        ).scalar()
+    
+    def get_memories_by_location(self, user_id: int, lat: float, lng: float, radius: float = 0.01,
+                                 include: Optional[Iterable[str]] = None) -> List[Memory]:
         """
         Busca memórias próximas a uma localização
         
@@ -138,17 +725,93 @@ class MemoryRepository(BaseRepository):
             lat (float): Latitude central
             lng (float): Longitude central
             radius (float): Raio de busca em graus (padrão: ~1km)
+            include (Iterable[str], optional): Colunas pesadas a carregar
             
         Returns:
             Lista de memórias próximas
         """
-        return Memory.query.filter(
+        return self._query(include).filter(
             Memory.user_id == user_id,
-            Memory.lat.between(lat - radius, lat + radius),
-            Memory.lng.between(lng - radius, lng + radius)
+            Memory.lat_e7.between(to_e7(lat - radius), to_e7(lat + radius)),
+            Memory.lng_e7.between(to_e7(lng - radius), to_e7(lng + radius))
         ).all()
     
-    def get_memories_by_date_range(self, user_id: int, start_date: str, end_date: str) -> List[Memory]:
+    def get_timeline(self, user_id: int, bucket: str = 'month', bbox: Optional[tuple] = None) -> List[dict]:
+        """
+        Histograma de memórias por período, calculado no banco (GROUP BY)
+        
+        Percorre apenas (user_id, date, id) pelo índice ix_memories_user_date_id;
+        nenhuma memória é carregada.
+        
+        Args:
+            user_id (int): ID do usuário
+            bucket (str): 'day', 'week', 'month' ou 'year'
+            bbox (tuple, optional): (min_lng, min_lat, max_lng, max_lat); min_lng
+                maior que max_lng cruza o antimeridiano
+            
+        Returns:
+            Lista de {'bucket', 'count', 'first_id'} em ordem cronológica
+            (first_id é a primeira memória cadastrada no período)
+            
+        Raises:
+            ValueError: Se o bucket for inválido
+        """
+        dialect = db.session.get_bind().dialect.name
+        buckets = _TIMELINE_BUCKETS.get(dialect, _TIMELINE_BUCKETS['postgresql'])
+        if bucket not in buckets:
+            raise ValueError("Bucket inválido. Use day, week, month ou year")
+        
+        label = buckets[bucket](Memory.date).label('bucket')
+        query = db.session.query(label, func.count(Memory.id), func.min(Memory.id)).filter(
+            Memory.user_id == user_id,
+            Memory.deleted_at.is_(None)
+        )
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = bbox
+            query = query.filter(Memory.lat_e7.between(to_e7(min_lat), to_e7(max_lat)))
+            if min_lng <= max_lng:
+                query = query.filter(Memory.lng_e7.between(to_e7(min_lng), to_e7(max_lng)))
+            else:
+                query = query.filter(or_(Memory.lng_e7 >= to_e7(min_lng), Memory.lng_e7 <= to_e7(max_lng)))
+        
+        rows = query.group_by(label).order_by(label).all()
+        return [{'bucket': row[0], 'count': row[1], 'first_id': row[2]} for row in rows]
+    
+    def get_memories_within_radius(self, user_id: int, lat: float, lng: float, radius_m: float,
+                                   include: Optional[Iterable[str]] = None) -> List[tuple]:
+        """
+        Busca memórias dentro de um raio real (em metros), da mais próxima à mais distante
+        
+        Faz um pré-filtro indexado pela caixa envolvente nas colunas E7
+        (ix_memories_user_lat_lng_e7) e refina com a distância de Haversine.
+        
+        Args:
+            user_id (int): ID do usuário
+            lat (float): Latitude central
+            lng (float): Longitude central
+            radius_m (float): Raio de busca em metros
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            
+        Returns:
+            Lista de tuplas (memória, distância em metros)
+        """
+        (lat_min, lat_max), lng_ranges = bounding_box_e7(lat, lng, radius_m)
+        candidates = self._query(include).filter(
+            Memory.user_id == user_id,
+            Memory.lat_e7.between(lat_min, lat_max),
+            or_(*[Memory.lng_e7.between(lo, hi) for lo, hi in lng_ranges])
+        ).all()
+        
+        results = []
+        for memory in candidates:
+            distance = calculate_distance(lat, lng, memory.lat, memory.lng)
+            if distance <= radius_m:
+                results.append((memory, distance))
+        results.sort(key=lambda item: item[1])
+        return results
+    
+    def get_memories_by_date_range(self, user_id: int, start_date: str, end_date: str,
+                                   include: Optional[Iterable[str]] = None) -> List[Memory]:
         """
         Busca memórias em um período específico
         
@@ -156,15 +819,109 @@ class MemoryRepository(BaseRepository):
             user_id (int): ID do usuário
             start_date (str): Data inicial (YYYY-MM-DD)
             end_date (str): Data final (YYYY-MM-DD)
+            include (Iterable[str], optional): Colunas pesadas a carregar
             
         Returns:
             Lista de memórias no período
+            
+        Raises:
+            ValueError: Se alguma data não estiver no formato YYYY-MM-DD
         """
-        return Memory.query.filter(
+        return self._query(include).filter(
             Memory.user_id == user_id,
-            Memory.date.between(start_date, end_date)
+            Memory.date.between(parse_date(start_date), parse_date(end_date))
         ).order_by(Memory.date.desc()).all()
     
+    def get_stats(self, user_id: int) -> MemoryStats:
+        """
+        Retorna os agregados de memórias do usuário (leitura O(1))
+        
+        Usuários anteriores à tabela memory_stats têm os agregados calculados
+        uma única vez, no primeiro acesso.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            Agregados do usuário
+        """
+        stats = MemoryStats.query.filter_by(user_id=user_id).first()
+        if stats is None:
+            try:
+                self._build_stats(user_id)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            stats = MemoryStats.query.filter_by(user_id=user_id).first()
+        return stats
+    
+    def _lock_stats(self, user_id: int) -> MemoryStats:
+        """
+        Carrega os agregados do usuário com lock de linha (SELECT ... FOR UPDATE)
+        
+        Deve ser chamado antes de alterar memórias na sessão: se os agregados
+        ainda não existirem, são calculados a partir das linhas atuais. Duas
+        primeiras escritas concorrentes não colidem: a que perder o INSERT
+        relê (e trava) a linha gravada pela outra.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            Agregados do usuário (na transação corrente)
+        """
+        query = MemoryStats.query.filter_by(user_id=user_id).with_for_update()
+        stats = query.first()
+        if stats is None:
+            self._build_stats(user_id)
+            stats = query.populate_existing().first()
+        return stats
+    
+    def _build_stats(self, user_id: int) -> bool:
+        """
+        Calcula os agregados do zero a partir das memórias do usuário e os grava
+        
+        INSERT ... ON CONFLICT (user_id) DO NOTHING: se outra transação criou a
+        linha primeiro, a dela prevalece (o chamador relê a linha).
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            True se a linha foi inserida (sem commit)
+        """
+        stats = MemoryStats(
+            user_id=user_id, total_memories=0, monthly_counts={},
+            photo_count=0, video_count=0, music_count=0,
+            sum_x=0.0, sum_y=0.0, sum_z=0.0
+        )
+        rows = db.session.query(
+            Memory.date, Memory.lat, Memory.lng, Memory.photos, Memory.music
+        ).filter(Memory.user_id == user_id, Memory.deleted_at.is_(None)).yield_per(1000)
+        stats.add_many(MemoryStats.snapshot(row._asdict()) for row in rows)
+        values = {column.key: getattr(stats, column.key) for column in MemoryStats.__table__.columns}
+        return DatabaseManager.insert_ignore(
+            MemoryStats, {key: value for key, value in values.items() if value is not None}, ['user_id']
+        )
+    
+    def _refresh_stats_bounds(self, stats: MemoryStats) -> None:
+        """
+        Recalcula caixa envolvente e primeira/última data com uma consulta agregada
+        
+        Necessário apenas quando uma memória removida/alterada estava em um
+        dos limites (ver MemoryStats.remove).
+        
+        Args:
+            stats (MemoryStats): Agregados a atualizar
+        """
+        row = db.session.query(
+            func.min(Memory.lat), func.max(Memory.lat),
+            func.min(Memory.lng), func.max(Memory.lng),
+            func.min(Memory.date), func.max(Memory.date)
+        ).filter(Memory.user_id == stats.user_id, Memory.deleted_at.is_(None)).one()
+        stats.bounds_from_rows(row if row[0] is not None else None)
+    
     def count_user_memories(self, user_id: int) -> int:
         """
         Conta o número de memórias de um usuário
@@ -176,8 +933,210 @@ class MemoryRepository(BaseRepository):
             Número de memórias
         """
         try:
-            from src.app_factory import db
-            return db.session.query(Memory).filter_by(user_id=user_id).count()
+            return db.session.query(Memory).filter_by(user_id=user_id, deleted_at=None).count()
         except Exception as e:
             print(f"Erro ao contar memórias: {e}")
-            return 0
\ No newline at end of file
+            return 0
+    
+    def externalize_inline_media(self, batch_size: int = 50) -> int:
+        """
+        Migra mídias legadas em base64 (coluna photos) para arquivos no disco
+        
+        Processa as memórias em lotes por id, com commit a cada lote, para
+        não segurar locks longos nem carregar toda a tabela em memória.
+        
+        Args:
+            batch_size (int): Quantidade de memórias por lote
+            
+        Returns:
+            Número de memórias migradas
+        """
+        migrated = 0
+        last_id = 0
+        while True:
+            batch = self._query(('photos', 'media')).filter(Memory.id > last_id).order_by(Memory.id).limit(batch_size).all()
+            if not batch:
+                break
+            for memory in batch:
+                photos = memory.photos
+                externalized = externalize_media(memory.user_id, memory.id, photos)
+                if externalized is not photos:
+                    memory.photos = externalized
+                    memory.sync_version = self._touch_collection(memory.user_id)
+                    migrated += 1
+            last_id = batch[-1].id
+            db.session.commit()
+            db.session.expunge_all()
+        return migrated
+    
+    def backfill_media_metadata(self, batch_size: int = 200) -> int:
+        """
+        Completa os metadados das mídias (mime, tamanho, sha256, dimensões, duração)
+        
+        Cobre linhas migradas da coluna photos (0007), que têm apenas tipo e URL,
+        e a duração de vídeos, que não é calculada nas requisições (exige ffmpeg). Percorre memory_media em
+        lotes por id, com commit a cada lote; pode rodar com a aplicação no ar.
+        
+        Args:
+            batch_size (int): Quantidade de mídias por lote
+            
+        Returns:
+            Número de mídias atualizadas
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            batch = MemoryMedia.query.filter(
+                MemoryMedia.id > last_id,
+                or_(MemoryMedia.sha256.is_(None),
+                    (MemoryMedia.kind == 'video') & MemoryMedia.duration.is_(None))
+            ).order_by(MemoryMedia.id).limit(batch_size).all()
+            if not batch:
+                break
+            for item in batch:
+                described = describe_media_item(item.url)
+                if item.kind == 'video' and item.duration is None:
+                    path = media_file_path(item.url)
+                    if path is not None and os.path.isfile(path):
+                        described['duration'] = probe_video_duration(path)
+                changed = False
+                for key in ('mime', 'bytes', 'width', 'height', 'duration', 'sha256'):
+                    if getattr(item, key) is None and described[key] is not None:
+                        setattr(item, key, described[key])
+                        changed = True
+                updated += changed
+            last_id = batch[-1].id
+            db.session.commit()
+            db.session.expunge_all()
+        return updated
+    
+    def search_memories(self, user_id: int, query: str, page: int = 1, per_page: int = 20,
+                        include: Optional[Iterable[str]] = None) -> dict:
+        """
+        Busca textual ranqueada em título e descrição das memórias do usuário
+        
+        Usa o índice de src.utils.search_index (FTS5 no SQLite, tsvector/GIN
+        no Postgres); os termos casam por prefixo e sem distinção de acentos.
+        
+        Args:
+            user_id (int): ID do usuário
+            query (str): Texto de busca
+            page (int): Número da página (começa em 1)
+            per_page (int): Itens por página (máximo 100)
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            
+        Returns:
+            dict: Itens (memória, relevância), página atual e indicador de continuação
+        """
+        page = max(1, page)
+        per_page = max(1, min(100, per_page))
+        
+        # Um item extra indica se existe próxima página
+        hits = search_index.search_ids(db.session, user_id, query, per_page + 1, (page - 1) * per_page)
+        has_next = len(hits) > per_page
+        hits = hits[:per_page]
+        
+        items = []
+        if hits:
+            ids = [memory_id for memory_id, _ in hits]
+            memories = {m.id: m for m in self._query(include).filter(Memory.id.in_(ids)).all()}
+            items = [(memories[memory_id], rank) for memory_id, rank in hits if memory_id in memories]
+        
+        return {
+            'items': items,
+            'current_page': page,
+            'per_page': per_page,
+            'has_next': has_next,
+            'next_page': page + 1 if has_next else None
+        }
+    
+    def rebuild_search_index(self, batch_size: int = 500) -> int:
+        """
+        Reindexa todas as memórias em lotes por id
+        
+        Manutenção manual; a estrutura do índice e a carga inicial ficam na
+        migração 0012_memory_search_index.
+        
+        Args:
+            batch_size (int): Quantidade de memórias por lote
+            
+        Returns:
+            Número de memórias indexadas
+        """
+        indexed = 0
+        last_id = 0
+        while True:
+            rows = db.session.query(Memory.id, Memory.user_id, Memory.title, Memory.description).filter(
+                Memory.id > last_id,
+                Memory.deleted_at.is_(None)
+            ).order_by(Memory.id).limit(batch_size).all()
+            if not rows:
+                break
+            for memory_id, user_id, title, description in rows:
+                search_index.upsert_document(db.session, memory_id, user_id, title, description)
+            last_id = rows[-1].id
+            indexed += len(rows)
+            db.session.commit()
+        return indexed
+    
+    def get_nearest_memories(self, user_id: int, lat: float, lng: float, k: int = 20,
+                             include: Optional[Iterable[str]] = None) -> List[tuple]:
+        """
+        Busca as k memórias mais próximas de um ponto, sem raio definido
+        
+        Usa o índice em memória do processo (src.utils.spatial_index), validado
+        pela versão da coleção; só as k memórias escolhidas são lidas do banco.
+        
+        Args:
+            user_id (int): ID do usuário
+            lat (float): Latitude do ponto
+            lng (float): Longitude do ponto
+            k (int): Quantidade de memórias
+            include (Iterable[str], optional): Colunas pesadas a carregar
+            
+        Returns:
+            Lista de tuplas (memória, distância em metros), da mais próxima à mais distante
+        """
+        def load_coordinates():
+            return db.session.query(Memory.id, Memory.lat, Memory.lng).filter(
+                Memory.user_id == user_id,
+                Memory.deleted_at.is_(None)
+            ).all()
+        
+        version = self.get_collection_version(user_id)
+        neighbours = coordinate_index.nearest(user_id, version, load_coordinates, lat, lng, k)
+        if not neighbours:
+            return []
+        
+        ids = [memory_id for memory_id, _ in neighbours]
+        memories = {m.id: m for m in self._query(include).filter(Memory.id.in_(ids)).all()}
+        return [(memories[memory_id], distance) for memory_id, distance in neighbours if memory_id in memories]
+    
+    def backfill_spatial_columns(self, batch_size: int = 1000) -> int:
+        """
+        Preenche lat_e7/lng_e7 de memórias antigas em lotes por faixa de id
+        
+        Cada lote é um UPDATE curto com commit próprio, evitando locks longos.
+        
+        Args:
+            batch_size (int): Tamanho da faixa de ids por lote
+            
+        Returns:
+            Número de memórias atualizadas
+        """
+        max_id = db.session.query(func.max(Memory.id)).scalar() or 0
+        updated = 0
+        for start in range(0, max_id + 1, batch_size):
+            updated += db.session.query(Memory).filter(
+                Memory.id >= start,
+                Memory.id < start + batch_size,
+                or_(Memory.lat_e7.is_(None), Memory.lng_e7.is_(None))
+            ).update(
+                {
+                    Memory.lat_e7: cast(func.round(Memory.lat * E7), Integer),
+                    Memory.lng_e7: cast(func.round(Memory.lng * E7), Integer)
+                },
+                synchronize_session=False
+            )
+            db.session.commit()
+        return updated
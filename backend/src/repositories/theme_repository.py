@@ -3,9 +3,12 @@
 # Repositório específico para temas
 # ============================================
 
-from typing import Optional
+from typing import Any, Optional
 from .base_repository import BaseRepository
+from src.app_factory import db
+from src.database import DatabaseManager
 from src.models.theme import Theme
+from src.utils.identity_cache import identity_cache
 
 class ThemeRepository(BaseRepository):
     """Repositório para operações com temas"""
@@ -25,6 +28,57 @@ class ThemeRepository(BaseRepository):
         """
         return self.find_one_by(user_id=user_id)
     
+    def get_snapshot(self, user_id: int) -> dict:
+        """
+        Dados serializados do tema do usuário, servidos pelo cache de identidade
+        
+        No acerto, nenhuma consulta ao banco é feita; na falta, busca (ou cria)
+        o tema como get_or_create_default_theme.
+        
+        Args:
+            user_id (int): ID do usuário (identidade JWT)
+            
+        Returns:
+            dict do tema (to_dict)
+        """
+        snapshot = identity_cache.themes.get(user_id)
+        if snapshot is None:
+            epoch = identity_cache.themes.epoch
+            snapshot = self.get_or_create_default_theme(user_id).to_dict()
+            identity_cache.themes.set(user_id, snapshot, epoch)
+        return snapshot
+    
+    def create(self, **kwargs) -> Any:
+        """
+        Cria um tema e invalida o snapshot do usuário em cache
+        
+        Args:
+            **kwargs: Dados do tema (inclui user_id)
+            
+        Returns:
+            Tema criado
+        """
+        try:
+            return super().create(**kwargs)
+        finally:
+            identity_cache.themes.invalidate(kwargs.get('user_id'))
+    
+    def update(self, instance: Any, **kwargs) -> Any:
+        """
+        Atualiza um tema e invalida o snapshot do usuário em cache
+        
+        Args:
+            instance: Tema a ser atualizado
+            **kwargs: Dados para atualização
+            
+        Returns:
+            Tema atualizado
+        """
+        try:
+            return super().update(instance, **kwargs)
+        finally:
+            identity_cache.themes.invalidate(instance.user_id)
+    
     def create_or_update_theme(self, user_id: int, gradient_name: str, gradient_css: str, is_active: bool = True) -> Theme:
         """
         Cria ou atualiza o tema de um usuário
@@ -69,11 +123,33 @@ class ThemeRepository(BaseRepository):
         theme = self.get_by_user(user_id)
         
         if not theme:
-            # Criar tema padrão para o usuário
-            theme = self.create(user_id=user_id)
+            # Criar tema padrão para o usuário (upsert: seguro entre requisições concorrentes)
+            self.insert_default_theme(user_id)
+            db.session.commit()
+            identity_cache.themes.invalidate(user_id)
+            theme = self.get_by_user(user_id)
         
         return theme
     
+    def insert_default_theme(self, user_id: int) -> bool:
+        """
+        Insere o tema padrão do usuário, se ainda não existir (sem commit)
+        
+        INSERT ... ON CONFLICT (user_id) DO NOTHING: usado no registro, na mesma
+        transação que cria o usuário.
+        
+        Args:
+            user_id (int): ID do usuário
+            
+        Returns:
+            True se o tema foi inserido
+        """
+        return DatabaseManager.insert_ignore(Theme, {
+            'user_id': user_id,
+            'gradient_name': 'default',
+            'gradient_css': Theme._get_default_gradient()
+        }, ['user_id'])
+    
     def reset_to_default(self, user_id: int) -> Theme:
         """
         Reseta o tema do usuário para o padrão
@@ -0,0 +1,75 @@
+# ============================================
+# TOKEN REPOSITORY - Repository Pattern
+# Repositório da lista de tokens JWT revogados
+# ============================================
+
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from .base_repository import BaseRepository
+from src.app_factory import db
+from src.models.token_blocklist import TokenBlocklist
+
+class TokenRepository(BaseRepository):
+    """Repositório para a lista de tokens revogados"""
+    
+    def __init__(self):
+        super().__init__(TokenBlocklist)
+    
+    def revoke(self, jti: str, user_id: int, expires_at: datetime) -> None:
+        """
+        Registra a revogação de um token (idempotente)
+        
+        Args:
+            jti (str): Identificador único do token
+            user_id (int): Dono do token
+            expires_at (datetime): Expiração do token (UTC)
+        """
+        try:
+            self.create(jti=jti, user_id=user_id, expires_at=expires_at)
+        except IntegrityError:
+            db.session.rollback()  # Já revogado (logout repetido)
+    
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Verifica no banco se um token foi revogado (consulta pelo índice único)
+        
+        Args:
+            jti (str): Identificador único do token
+            
+        Returns:
+            True se revogado
+        """
+        return db.session.query(TokenBlocklist.id).filter(TokenBlocklist.jti == jti).first() is not None
+    
+    def get_active_jtis(self, since: Optional[datetime] = None) -> List[str]:
+        """
+        Identificadores de tokens revogados ainda não expirados
+        
+        Args:
+            since (datetime, optional): Apenas revogações a partir deste instante
+            
+        Returns:
+            Lista de jti
+        """
+        query = db.session.query(TokenBlocklist.jti).filter(TokenBlocklist.expires_at > datetime.utcnow())
+        if since is not None:
+            query = query.filter(TokenBlocklist.created_at >= since)
+        return [jti for jti, in query.all()]
+    
+    def purge_expired(self) -> int:
+        """
+        Remove revogações de tokens já expirados
+        
+        Returns:
+            Quantidade de linhas removidas
+        """
+        try:
+            removed = TokenBlocklist.query.filter(
+                TokenBlocklist.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return removed
@@ -3,9 +3,15 @@
 # Repositório específico para usuários
 # ============================================
 
-from typing import Optional
+from typing import Any, Optional
+from sqlalchemy import case, or_
 from .base_repository import BaseRepository
+from src.app_factory import db
 from src.models.user import User
+from src.repositories.theme_repository import ThemeRepository
+from src.utils.helpers import normalize_email
+from src.utils.identity_cache import identity_cache
+from src.utils.password_hasher import HasherBusyError
 
 class UserRepository(BaseRepository):
     """Repositório para operações com usuários"""
@@ -13,21 +19,90 @@ class UserRepository(BaseRepository):
     def __init__(self):
         super().__init__(User)
     
+    def get_snapshot(self, user_id: int) -> Optional[dict]:
+        """
+        Dados serializados do usuário (to_dict), servidos pelo cache de identidade
+        
+        Usado pelas leituras autenticadas (/me, /preferences, /refresh): no
+        acerto, nenhuma consulta ao banco é feita.
+        
+        Args:
+            user_id (int): ID do usuário (identidade JWT)
+            
+        Returns:
+            dict do usuário ou None se não existir
+        """
+        snapshot = identity_cache.users.get(user_id)
+        if snapshot is None:
+            epoch = identity_cache.users.epoch
+            user = self.get_by_id(user_id)
+            if user is None:
+                return None
+            snapshot = user.to_dict()
+            identity_cache.users.set(user_id, snapshot, epoch)
+        return snapshot
+    
+    def update(self, instance: Any, **kwargs) -> Any:
+        """
+        Atualiza um usuário e invalida seu snapshot em cache
+        
+        Args:
+            instance: Usuário a ser atualizado
+            **kwargs: Dados para atualização
+            
+        Returns:
+            Usuário atualizado
+        """
+        try:
+            return super().update(instance, **kwargs)
+        finally:
+            identity_cache.users.invalidate(instance.id)
+    
+    def delete(self, instance: Any) -> bool:
+        """
+        Remove um usuário e invalida os snapshots em cache (usuário e tema)
+        
+        Args:
+            instance: Usuário a ser removido
+            
+        Returns:
+            True se removido com sucesso
+        """
+        user_id = instance.id
+        try:
+            return super().delete(instance)
+        finally:
+            identity_cache.users.invalidate(user_id)
+            identity_cache.themes.invalidate(user_id)
+    
+    def _email_filter(self, email: str):
+        """
+        Condição de busca por email sem diferenciar maiúsculas
+        
+        Compara email_normalized (índice único) e, para contas duplicadas que a
+        migração 0011 manteve sem email_normalized, o email exato (índice único
+        de users.email). As duas colunas são indexadas: nenhuma busca aplica
+        lower() no SQL.
+        """
+        return or_(User.email_normalized == normalize_email(email), User.email == email)
+    
     def get_by_email(self, email: str) -> Optional[User]:
         """
-        Busca usuário pelo email
+        Busca usuário pelo email (sem diferenciar maiúsculas)
         
         Args:
             email (str): Email do usuário
             
         Returns:
-            Usuário encontrado ou None
+            Usuário encontrado ou None (a conta com o email exato tem prioridade)
         """
-        return self.find_one_by(email=email)
+        return User.query.filter(self._email_filter(email)).order_by(
+            case((User.email == email, 0), else_=1)
+        ).first()
     
     def email_exists(self, email: str) -> bool:
         """
-        Verifica se o email já está cadastrado
+        Verifica se o email já está cadastrado (sem diferenciar maiúsculas)
         
         Args:
             email (str): Email a ser verificado
@@ -35,7 +110,7 @@ class UserRepository(BaseRepository):
         Returns:
             True se o email já existe
         """
-        return self.exists(email=email)
+        return db.session.query(User.id).filter(self._email_filter(email)).first() is not None
     
     def create_user(self, name: str, email: str, password: str) -> User:
         """
@@ -57,6 +132,37 @@ class UserRepository(BaseRepository):
         
         return self.create(name=name, email=email, password=password)
     
+    def register_user(self, name: str, email: str, password: str) -> User:
+        """
+        Registra um usuário com o tema padrão em uma única transação
+        
+        Não consulta o email antes: a restrição única de users.email decide.
+        O usuário e o tema são inseridos na mesma transação, com um único
+        commit; se algo falhar, nada é gravado.
+        
+        Args:
+            name (str): Nome do usuário
+            email (str): Email do usuário
+            password (str): Senha em texto plano
+            
+        Returns:
+            Usuário criado
+            
+        Raises:
+            IntegrityError: Se o email já estiver em uso
+            HasherBusyError: Se o pool de hash estiver saturado
+        """
+        try:
+            user = User.create(name=name, email=email, password=password)
+            db.session.flush()  # INSERT do usuário (id para o tema)
+            ThemeRepository().insert_default_theme(user.id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        identity_cache.themes.invalidate(user.id)
+        return user
+    
     def authenticate(self, email: str, password: str) -> Optional[User]:
         """
         Autentica um usuário
@@ -71,6 +177,7 @@ class UserRepository(BaseRepository):
         user = self.get_by_email(email)
         
         if user and user.check_password(password) and user.is_active:
+            self._rehash_password(user, password)
             return user
         
         return None
@@ -97,8 +204,29 @@ class UserRepository(BaseRepository):
         if not user.check_password(password):
             return None, "invalid_password"
         
+        self._rehash_password(user, password)
         return user, "success"
     
+    def _rehash_password(self, user: User, password: str) -> None:
+        """
+        Atualiza o hash da senha para o custo atual após um login bem-sucedido
+        
+        Falhas (pool saturado ou erro de banco) não impedem o login: o hash
+        antigo continua válido e a troca é tentada no próximo login.
+        
+        Args:
+            user (User): Usuário autenticado
+            password (str): Senha em texto plano já verificada
+        """
+        try:
+            if user.rehash_password_if_needed(password):
+                db.session.commit()
+                identity_cache.users.invalidate(user.id)
+        except HasherBusyError:
+            pass
+        except Exception:
+            db.session.rollback()
+    
     def get_active_users(self):
         """
         Busca todos os usuários ativos
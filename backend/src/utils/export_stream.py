@@ -0,0 +1,136 @@
+# ============================================
+# EXPORT STREAM
+# Geradores de exportação das memórias em streaming (NDJSON, GeoJSON e ZIP)
+# ============================================
+
+"""
+Serialização incremental das memórias de um usuário para exportação.
+
+Responsabilidades:
+- Gerar NDJSON (uma memória por linha) e GeoJSON (FeatureCollection de pontos)
+- Montar um ZIP em streaming com memories.ndjson e os arquivos de mídia locais
+- Nunca materializar a coleção inteira: cada gerador consome um iterável de
+  registros (dicts) e produz pedaços prontos para a resposta HTTP
+
+O ZIP é escrito sobre um destino não-seekable (o zipfile usa descritores de
+dados), então não há arquivo temporário: os bytes produzidos a cada escrita
+são drenados e enviados ao cliente. A memória de pico fica limitada a um
+registro ou a um bloco de leitura de mídia, independente do tamanho da conta.
+"""
+
+import json
+import os
+import zipfile
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from src.utils.media_manager import memory_media_dir, parse_file_url
+
+READ_CHUNK_SIZE = 64 * 1024
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+def iter_ndjson(records: Iterable[dict]) -> Iterator[str]:
+    """Uma memória JSON por linha"""
+    for record in records:
+        yield _dumps(record) + '\n'
+
+def to_feature(record: dict) -> dict:
+    """Converte uma memória em Feature GeoJSON (Point em [lng, lat])"""
+    properties = dict(record)
+    lat = properties.pop('lat', None)
+    lng = properties.pop('lng', None)
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+        'properties': properties
+    }
+
+def iter_geojson(records: Iterable[dict]) -> Iterator[str]:
+    """FeatureCollection escrita feature a feature"""
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ''
+    for record in records:
+        yield separator + _dumps(to_feature(record))
+        separator = ','
+    yield ']}\n'
+
+class _ZipSink:
+    """Destino não-seekable do ZipFile: acumula bytes até o gerador drená-los"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _local_media(user_id: int, record: dict) -> List[Tuple[str, str, str]]:
+    """
+    Mídias da memória gravadas em disco (via make_file_url) que pertencem ao usuário
+
+    Returns:
+        Lista de (url, caminho no disco, caminho no ZIP)
+    """
+    media = []
+    for url in record.get('photos') or []:
+        parsed = parse_file_url(url)
+        if parsed is None or parsed[0] != user_id:
+            continue
+        _, memory_id, media_type, filename = parsed
+        path = os.path.join(memory_media_dir(user_id, memory_id, media_type), filename)
+        if os.path.isfile(path):
+            media.append((url, path, f'media/memory_{memory_id}/{media_type}/{filename}'))
+    return media
+
+def iter_zip(user_id: int, records: Callable[[], Iterable[dict]], include_media: bool = True) -> Iterator[bytes]:
+    """
+    ZIP em streaming com memories.ndjson e, opcionalmente, as mídias locais
+
+    Args:
+        user_id (int): Dono das memórias (mídias de outros usuários são ignoradas)
+        records (Callable): Fábrica de iteráveis de memórias; chamada uma vez para
+            o NDJSON e outra para as mídias, evitando guardar a lista entre as passadas
+        include_media (bool): Incluir os arquivos de mídia no ZIP
+
+    Returns:
+        Iterador de pedaços de bytes do arquivo ZIP
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('memories.ndjson', 'w', force_zip64=True) as entry:
+            for record in records():
+                if include_media:
+                    # No ZIP, as URLs de mídia local apontam para o arquivo dentro do pacote
+                    local = {url: arcname for url, _, arcname in _local_media(user_id, record)}
+                    if local:
+                        record['photos'] = [local.get(url, url) for url in record['photos']]
+                entry.write((_dumps(record) + '\n').encode('utf-8'))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+        if include_media:
+            for record in records():
+                for _, path, arcname in _local_media(user_id, record):
+                    # Fotos e vídeos já são comprimidos: armazenar sem recompressão
+                    info = zipfile.ZipInfo.from_file(path, arcname)
+                    info.compress_type = zipfile.ZIP_STORED
+                    with archive.open(info, 'w') as entry, open(path, 'rb') as source:
+                        while True:
+                            block = source.read(READ_CHUNK_SIZE)
+                            if not block:
+                                break
+                            entry.write(block)
+                            chunk = sink.drain()
+                            if chunk:
+                                yield chunk
+    yield sink.drain()
@@ -4,9 +4,11 @@
 # ============================================
 
 import json
+import math
 import random
-from datetime import datetime
-from typing import Any, Optional, List
+import unicodedata
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, List
 
 def generate_random_color() -> str:
     """
@@ -33,18 +35,49 @@ def generate_random_color() -> str:
     
     return random.choice(colors)
 
-def format_date(date_obj: datetime, format_str: str = '%Y-%m-%d') -> str:
+def normalize_text(text: str) -> str:
     """
-    Formata objeto datetime para string
+    Normaliza texto para comparação: minúsculas, sem espaços nas pontas e sem acentos
     
     Args:
-        date_obj (datetime): Objeto datetime
+        text (str): Texto original
+        
+    Returns:
+        str: Texto normalizado (ex: "Evidências" -> "evidencias")
+    """
+    text = (text or '').lower().strip()
+    if text.isascii():
+        # Caminho rápido: texto ASCII não tem acentos a remover
+        return text
+    # Decomposição NFD (mesma dos documentos já indexados) sem as marcas combinantes
+    return ''.join(char for char in unicodedata.normalize('NFD', text) if not unicodedata.combining(char))
+
+def normalize_email(email: Any) -> Optional[str]:
+    """
+    Forma canônica de um email para busca e unicidade (users.email_normalized)
+    
+    Args:
+        email (str): Email como digitado
+        
+    Returns:
+        str: Email sem espaços nas pontas e em minúsculas (None se não for texto)
+    """
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower()
+
+def format_date(date_obj: date, format_str: str = '%Y-%m-%d') -> str:
+    """
+    Formata objeto date/datetime para string
+    
+    Args:
+        date_obj (date): Objeto date ou datetime
         format_str (str): Formato desejado
         
     Returns:
         str: Data formatada
     """
-    if not isinstance(date_obj, datetime):
+    if not isinstance(date_obj, date):
         return str(date_obj)
     
     return date_obj.strftime(format_str)
@@ -122,20 +155,222 @@ def paginate_results(query, page: int = 1, per_page: int = 10):
         'prev_page': paginated.prev_num if paginated.has_prev else None
     }
 
+def parse_date(value: Any) -> Optional[date]:
+    """
+    Converte uma data no formato da API (YYYY-MM-DD) para date
+    
+    Args:
+        value: String YYYY-MM-DD, date/datetime ou None
+        
+    Returns:
+        date: Data convertida (None se value for None)
+        
+    Raises:
+        ValueError: Se a string não estiver no formato esperado
+    """
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    raise ValueError('Formato de data inválido. Use YYYY-MM-DD')
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da última linha de uma página em um cursor opaco
+    
+    Args:
+        values (List[Any]): Valores das colunas de ordenação (ex: [date, id])
+        
+    Returns:
+        str: Cursor em base64 url-safe (sem padding)
+    """
+    import base64
+    # Datas viajam como texto ISO (paginate_keyset converte de volta pelo tipo da coluna)
+    values = [v.isoformat() if isinstance(v, date) else v for v in values]
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodifica um cursor gerado por encode_cursor
+    
+    Args:
+        cursor (str): Cursor opaco recebido do cliente
+        size (int): Quantidade esperada de valores
+        
+    Returns:
+        List[Any]: Valores das colunas de ordenação
+        
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    import base64
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError('Cursor inválido')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor inválido')
+    return values
+
+def paginate_keyset(query, order_columns: List[Any], cursor: Optional[str] = None, limit: int = 50) -> dict:
+    """
+    Pagina resultados de query SQLAlchemy por keyset (seek) em vez de OFFSET
+    
+    A ordenação é descendente em todas as colunas informadas; a última coluna
+    deve ser única (ex: id) para desempate. O custo de cada página é
+    proporcional a `limit`, independente da profundidade, desde que exista
+    um índice cobrindo as colunas de ordenação.
+    
+    Args:
+        query: Query SQLAlchemy já filtrada
+        order_columns (List): Colunas de ordenação (ex: [Memory.date, Memory.id])
+        cursor (str, optional): Cursor retornado pela página anterior
+        limit (int): Itens por página
+        
+    Returns:
+        dict: Itens da página, próximo cursor e indicador de continuação
+    """
+    from sqlalchemy import Date, and_, or_
+    
+    # Garantir valores mínimos (mesmo teto de paginate_results)
+    limit = max(1, min(100, limit))
+    
+    if cursor:
+        values = decode_cursor(cursor, len(order_columns))
+        for i, column in enumerate(order_columns):
+            if isinstance(column.type, Date):
+                try:
+                    values[i] = parse_date(values[i])
+                except ValueError:
+                    raise ValueError('Cursor inválido')
+        # (c1, c2, ...) < (v1, v2, ...) expandido para funcionar em SQLite e Postgres
+        clauses = []
+        for i, column in enumerate(order_columns):
+            equals = [order_columns[j] == values[j] for j in range(i)]
+            clauses.append(and_(*equals, column < values[i]))
+        query = query.filter(or_(*clauses))
+    
+    # Buscar um item extra para saber se existe próxima página
+    rows = query.order_by(*[column.desc() for column in order_columns]).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    items = rows[:limit]
+    
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    
+    return {
+        'items': items,
+        'limit': limit,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
+
+EARTH_RADIUS_M = 6371008.8  # Raio médio da Terra em metros
+METERS_PER_DEGREE_LAT = 111320.0
+E7 = 10_000_000  # Fator de escala das colunas inteiras de coordenadas
+
 def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
-    Calcula distância aproximada entre duas coordenadas (em graus)
+    Calcula a distância real entre duas coordenadas (fórmula de Haversine)
     
     Args:
-        lat1, lng1: Coordenadas do primeiro ponto
-        lat2, lng2: Coordenadas do segundo ponto
+        lat1, lng1: Coordenadas do primeiro ponto (graus)
+        lat2, lng2: Coordenadas do segundo ponto (graus)
         
     Returns:
-        float: Distância aproximada
+        float: Distância em metros
     """
-    # Cálculo simples de distância euclidiana
-    # Para uso mais preciso, usar fórmula de Haversine
-    return ((lat2 - lat1) ** 2 + (lng2 - lng1) ** 2) ** 0.5
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def to_e7(value: float) -> int:
+    """
+    Converte uma coordenada em graus para inteiro escalado (graus * 1e7)
+    
+    Args:
+        value (float): Latitude ou longitude em graus
+        
+    Returns:
+        int: Coordenada escalada (~1 cm de precisão)
+    """
+    return int(round(float(value) * E7))
+
+def parse_bbox(value: str) -> tuple:
+    """
+    Converte um filtro bbox "min_lng,min_lat,max_lng,max_lat" (ordem GeoJSON)
+    
+    min_lng maior que max_lng indica uma caixa que cruza o antimeridiano.
+    
+    Args:
+        value (str): Quatro números separados por vírgula
+        
+    Returns:
+        tuple: (min_lng, min_lat, max_lng, max_lat)
+        
+    Raises:
+        ValueError: Se o formato ou os limites forem inválidos
+    """
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError('bbox inválido. Use min_lng,min_lat,max_lng,max_lat')
+    if not (-90 <= min_lat <= max_lat <= 90) or not all(-180 <= v <= 180 for v in (min_lng, max_lng)):
+        raise ValueError('bbox fora dos limites de latitude/longitude')
+    return min_lng, min_lat, max_lng, max_lat
+
+def bounding_box_e7(lat: float, lng: float, radius_m: float) -> tuple:
+    """
+    Calcula a caixa envolvente (em E7) de um círculo de raio radius_m
+    
+    A faixa de longitude é dividida em duas quando cruza o antimeridiano,
+    e cobre todas as longitudes perto dos polos.
+    
+    Args:
+        lat (float): Latitude central
+        lng (float): Longitude central
+        radius_m (float): Raio em metros
+        
+    Returns:
+        tuple: ((lat_min, lat_max), [(lng_min, lng_max), ...]) em E7
+    """
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    lat_min = max(-90.0, lat - dlat)
+    lat_max = min(90.0, lat + dlat)
+    
+    cos_lat = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+    if lat_min <= -90.0 or lat_max >= 90.0 or cos_lat <= 1e-9:
+        lng_ranges = [(-180.0, 180.0)]
+    else:
+        dlng = dlat / cos_lat
+        if dlng >= 180.0:
+            lng_ranges = [(-180.0, 180.0)]
+        else:
+            lng_min = lng - dlng
+            lng_max = lng + dlng
+            if lng_min < -180.0:
+                lng_ranges = [(lng_min + 360.0, 180.0), (-180.0, lng_max)]
+            elif lng_max > 180.0:
+                lng_ranges = [(lng_min, 180.0), (-180.0, lng_max - 360.0)]
+            else:
+                lng_ranges = [(lng_min, lng_max)]
+    
+    return (
+        (to_e7(lat_min), to_e7(lat_max)),
+        [(to_e7(lo), to_e7(hi)) for lo, hi in lng_ranges]
+    )
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -243,25 +478,81 @@ def generate_unique_filename(original_filename: str) -> str:
         return f"{timestamp}_{unique_id}"
 
 VIDEO_EXTENSIONS = {"mp4", "mov", "avi", "webm", "mkv", "m4v"}
+_VIDEO_SUFFIXES = tuple(f'.{ext}' for ext in VIDEO_EXTENSIONS)
+
+def is_video_media(item: Any) -> bool:
+    """
+    Regra de classificação de um item da coluna photos como vídeo
+    
+    Data URLs são classificadas apenas pelo cabeçalho (sem copiar o base64);
+    demais URLs pela extensão ou pela pasta /videos/.
+    
+    Args:
+        item: URL, data URL ou outro valor
+        
+    Returns:
+        bool: True se o item é um vídeo
+    """
+    if not isinstance(item, str):
+        return False
+    if item[:5].lower() == 'data:':
+        return item[5:11].lower() == 'video/'
+    lower = item.lower()
+    return lower.endswith(_VIDEO_SUFFIXES) or '/videos/' in lower
+
+def split_media(media: Any) -> tuple:
+    """
+    Separa a lista unificada de mídias (coluna photos) em fotos e vídeos
+    
+    Args:
+        media: Lista de URLs/data URLs (ou None)
+        
+    Returns:
+        tuple: (fotos, vídeos)
+    """
+    photos = []
+    videos = []
+    for m in media or []:
+        (videos if is_video_media(m) else photos).append(m)
+    return photos, videos
+
+def legacy_media_lists(media: Iterable) -> tuple:
+    """
+    Listas photos/videos no formato das respostas anteriores à tabela memory_media
+    
+    Apenas lê o tipo já gravado em cada linha (nenhuma URL é classificada);
+    mídias locais saem como links absolutos assinados (public_media_url).
+    
+    Args:
+        media: Linhas de MemoryMedia (ou dicts com kind/url) em ordem de position
+        
+    Returns:
+        tuple: (fotos, vídeos), cada uma None quando vazia
+    """
+    from src.utils.media_manager import public_media_url
+    photos = []
+    videos = []
+    for item in media:
+        kind, url = (item['kind'], item['url']) if isinstance(item, dict) else (item.kind, item.url)
+        (videos if kind == 'video' else photos).append(public_media_url(url))
+    return photos or None, videos or None
 
 def serialize_memory_dict(data: dict) -> dict:
+    if 'date' in data:
+        data['date'] = format_date(data['date'])
     if 'spotify_url' in data:
         data['spotifyUrl'] = data.pop('spotify_url')
     data.pop('user_id', None)
+    data.pop('lat_e7', None)
+    data.pop('lng_e7', None)
+    media_rows = data.pop('media', None)
+    if media_rows:
+        # Linhas de memory_media (kind/url): tipo lido, sem classificar URLs
+        data['photos'], data['videos'] = legacy_media_lists(media_rows)
+        return data
     media = data.get('photos') or []
     if isinstance(media, list) and media:
-        videos = []
-        photos = []
-        for m in media:
-            if isinstance(m, str):
-                lower = m.lower()
-                is_video = lower.startswith('data:video/') or any(lower.endswith(f'.{ext}') for ext in VIDEO_EXTENSIONS) or '/videos/' in lower
-                if is_video:
-                    videos.append(m)
-                else:
-                    photos.append(m)
-            else:
-                photos.append(m)
+        photos, videos = split_media(media)
         data['photos'] = photos if photos else None
         data['videos'] = videos if videos else None
     return data
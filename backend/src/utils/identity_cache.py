@@ -0,0 +1,107 @@
+# ============================================
+# IDENTITY CACHE
+# Cache LRU com TTL dos snapshots de usuário e tema por identidade JWT
+# ============================================
+
+"""
+Cache em memória dos dados do usuário autenticado e do seu tema.
+
+Responsabilidades:
+- Guardar snapshots (dicts já serializados) por ID do usuário (identidade JWT)
+- Expirar entradas após IDENTITY_CACHE_TTL segundos e descartar as menos
+  recentes acima de IDENTITY_CACHE_MAX_ENTRIES
+- Ser invalidado pelos repositórios a cada escrita de usuário ou tema
+
+Os snapshots são dicts (nunca instâncias do SQLAlchemy, presas a uma sessão).
+A invalidação é local ao processo: em outros workers uma alteração fica
+visível em no máximo TTL segundos.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """Mapa LRU com expiração por entrada, seguro entre threads"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave -> (expira em, valor)
+        self.epoch = 0  # Incrementada a cada invalidação
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, epoch: Optional[int] = None) -> None:
+        """
+        Grava um snapshot
+
+        epoch é o valor de self.epoch lido antes de carregar o snapshot do
+        banco: se houve invalidação no meio, o snapshot pode estar desatualizado
+        e não é gravado.
+        """
+        if self.ttl <= 0:
+            return  # Cache desativado
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self.epoch += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.epoch += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class IdentityCache:
+    """Snapshots de usuário e de tema, ambos chaveados pelo ID do usuário"""
+
+    def __init__(self):
+        self.users = TTLCache()
+        self.themes = TTLCache()
+
+    def configure(self, config) -> None:
+        """Lê IDENTITY_CACHE_TTL e IDENTITY_CACHE_MAX_ENTRIES da configuração"""
+        for cache in (self.users, self.themes):
+            cache.ttl = config.get('IDENTITY_CACHE_TTL', cache.ttl)
+            cache.max_entries = config.get('IDENTITY_CACHE_MAX_ENTRIES', cache.max_entries)
+            cache.clear()
+
+    def clear(self) -> None:
+        self.users.clear()
+        self.themes.clear()
+
+    def metrics(self) -> dict:
+        """Acertos, falhas e tamanho de cada cache neste processo"""
+        return {
+            name: {'hits': cache.hits, 'misses': cache.misses, 'entries': len(cache)}
+            for name, cache in (('users', self.users), ('themes', self.themes))
+        }
+
+# Instância compartilhada pelo processo
+identity_cache = IdentityCache()
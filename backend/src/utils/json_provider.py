@@ -0,0 +1,88 @@
+# ============================================
+# JSON PROVIDER
+# Provedor JSON da aplicação (orjson quando disponível)
+# ============================================
+
+"""
+Provedor JSON rápido para app.json (jsonify, request.get_json).
+
+Responsabilidades:
+- Codificar respostas com orjson quando o pacote estiver instalado,
+  gerando bytes diretamente (sem str intermediária)
+- Manter o formato do provedor padrão do Flask: chaves ordenadas, datas no
+  formato HTTP (RFC 822), indentação em modo debug
+- Voltar ao módulo json da biblioteca padrão quando o orjson não estiver
+  instalado ou não suportar o valor (ex.: inteiros acima de 64 bits)
+
+Dependências:
+- orjson (opcional)
+
+Padrões de Projeto:
+- Strategy Pattern: Codificador escolhido conforme a disponibilidade do orjson
+"""
+
+import typing as t
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider com codificação e decodificação via orjson"""
+
+    # orjson emite UTF-8 diretamente (equivalente a ensure_ascii=False)
+    ensure_ascii = False
+
+    def _options(self, indent=None) -> int:
+        # Datas passam por self.default para manter o formato HTTP do Flask
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj: t.Any, indent=None) -> bytes:
+        """
+        Serializa para bytes UTF-8
+        
+        Args:
+            obj: Valor a serializar
+            indent: Qualquer valor verdadeiro ativa a indentação de 2 espaços
+            
+        Returns:
+            bytes: JSON codificado
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._options(indent))
+            except orjson.JSONEncodeError:
+                pass  # Valor não suportado pelo orjson: usar a biblioteca padrão
+        separators = None if indent else (',', ':')
+        return super().dumps(obj, indent=indent, separators=separators).encode('utf-8')
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        # Argumentos específicos do json padrão (cls, separators...) não existem no orjson
+        if orjson is None or set(kwargs) - {'indent'}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj, kwargs.get('indent')).decode('utf-8')
+
+    def loads(self, s: t.Union[str, bytes], **kwargs: t.Any) -> t.Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity e outros casos aceitos pela biblioteca padrão
+            return super().loads(s)
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=2 if indent else None) + b'\n',
+            mimetype=self.mimetype
+        )
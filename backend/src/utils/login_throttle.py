@@ -0,0 +1,128 @@
+# ============================================
+# LOGIN THROTTLE
+# Limite de tentativas de login por email e por IP (janela deslizante)
+# ============================================
+
+"""
+Limitação de tentativas de login antes de qualquer hash de senha.
+
+Responsabilidades:
+- Contar tentativas por email e por IP do cliente em janelas deslizantes
+- Recusar a tentativa excedente com o tempo de espera (Retry-After)
+- Liberar o email após um login bem-sucedido
+- Expor contadores para monitoramento (/api/health)
+
+O estado fica na tabela login_attempts (uma linha por chave e tentativa
+aceita, índice (key, created_at)), então o limite vale para todos os workers
+e sobrevive a reinícios; apenas os contadores de métricas são do processo.
+Tentativas recusadas não são gravadas, e as linhas fora da janela são apagadas
+pelo memory_purger. Consulta e registro não são atômicos entre workers: em
+rajadas simultâneas o limite pode ser excedido por poucas tentativas.
+"""
+
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from src.utils.helpers import normalize_email
+
+class SlidingWindow:
+    """Janela deslizante de tentativas por chave (estado em login_attempts)"""
+
+    def __init__(self, scope: str, limit: int, window: float):
+        self.scope = scope  # Prefixo das chaves ('email' ou 'ip')
+        self.limit = limit
+        self.window = window  # Segundos
+
+    def key(self, value: str) -> str:
+        return f'{self.scope}:{value}'
+
+    def retry_after(self, repository, value: str, now: datetime) -> float:
+        """Segundos até a próxima tentativa permitida (0 se permitida agora)"""
+        if self.limit <= 0:
+            return self.window
+        hits = repository.recent(self.key(value), now - timedelta(seconds=self.window), self.limit)
+        if len(hits) < self.limit:
+            return 0.0
+        return (hits[-1] - now).total_seconds() + self.window
+
+class LoginThrottle:
+    """Limites de login por email e por IP com contadores"""
+
+    def __init__(self, email_limit: int = 10, email_window: float = 300.0,
+                 ip_limit: int = 50, ip_window: float = 300.0):
+        self._lock = threading.Lock()
+        self.enabled = True
+        self._email = SlidingWindow('email', email_limit, email_window)
+        self._ip = SlidingWindow('ip', ip_limit, ip_window)
+        self._metrics = {'allowed': 0, 'throttled_email': 0, 'throttled_ip': 0}
+
+    def configure(self, config) -> None:
+        """Lê os parâmetros LOGIN_THROTTLE_* da configuração da aplicação"""
+        with self._lock:
+            self.enabled = config.get('LOGIN_THROTTLE_ENABLED', self.enabled)
+            self._email = SlidingWindow('email', config.get('LOGIN_THROTTLE_EMAIL_LIMIT', self._email.limit),
+                                        config.get('LOGIN_THROTTLE_EMAIL_WINDOW', self._email.window))
+            self._ip = SlidingWindow('ip', config.get('LOGIN_THROTTLE_IP_LIMIT', self._ip.limit),
+                                     config.get('LOGIN_THROTTLE_IP_WINDOW', self._ip.window))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._metrics[name] += 1
+
+    def attempt(self, email: str, ip: Optional[str]) -> Optional[Tuple[str, int]]:
+        """
+        Registra uma tentativa de login, se permitida (requer contexto de aplicação)
+
+        A tentativa só é contada quando as duas chaves estão dentro do limite
+        (uma tentativa recusada pelo IP não consome o limite do email).
+
+        Args:
+            email (str): Email informado no login
+            ip (str, optional): IP do cliente
+
+        Returns:
+            None se permitida, ou (escopo 'email'|'ip', segundos de espera)
+        """
+        if not self.enabled:
+            return None
+        from src.repositories.login_attempt_repository import LoginAttemptRepository
+        repository = LoginAttemptRepository()
+        email_key = normalize_email(email) or ''
+        ip_key = ip or 'unknown'
+        now = datetime.utcnow()
+        for window, key in ((self._ip, ip_key), (self._email, email_key)):
+            wait = window.retry_after(repository, key, now)
+            if wait > 0:
+                self._count(f'throttled_{window.scope}')
+                return window.scope, max(1, math.ceil(wait))
+        repository.record([self._email.key(email_key), self._ip.key(ip_key)], now)
+        self._count('allowed')
+        return None
+
+    def succeeded(self, email: str) -> None:
+        """Libera o email após login bem-sucedido (o limite por IP continua)"""
+        if not self.enabled:
+            return
+        from src.repositories.login_attempt_repository import LoginAttemptRepository
+        LoginAttemptRepository().clear(self._email.key(normalize_email(email) or ''))
+
+    def purge(self) -> int:
+        """
+        Apaga as tentativas fora de todas as janelas (memory_purger)
+
+        Returns:
+            Quantidade de linhas removidas
+        """
+        from src.repositories.login_attempt_repository import LoginAttemptRepository
+        longest = max(self._email.window, self._ip.window)
+        return LoginAttemptRepository().purge_older_than(datetime.utcnow() - timedelta(seconds=longest))
+
+    def metrics(self) -> dict:
+        """Cópia dos contadores acumulados neste processo"""
+        with self._lock:
+            return dict(self._metrics)
+
+# Instância compartilhada pelo processo
+login_throttle = LoginThrottle()
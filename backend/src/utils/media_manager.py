@@ -1,10 +1,16 @@
 import os
 import base64
+import hashlib
+import hmac
+import mimetypes
 import re
-from typing import Tuple
-from flask import current_app
+import shutil
+import time
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+from flask import current_app, has_app_context, has_request_context, request
 from werkzeug.utils import secure_filename
-from src.utils.helpers import sanitize_filename, generate_unique_filename
+from src.utils.helpers import sanitize_filename, generate_unique_filename, is_video_media
 
 def build_memory_dirs(user_id: int, memory_id: int) -> Tuple[str, str, str]:
     root = current_app.instance_path
@@ -15,18 +21,50 @@ def build_memory_dirs(user_id: int, memory_id: int) -> Tuple[str, str, str]:
     os.makedirs(videos_dir, exist_ok=True)
     return base_dir, photos_dir, videos_dir
 
+# Tipos aceitos em data URLs e a extensão fixa de cada um: apenas imagens raster
+# e vídeos (SVG/HTML servidos pela origem da API seriam XSS armazenado)
+DATA_URL_MIME_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'video/mp4': 'mp4',
+    'video/webm': 'webm',
+    'video/quicktime': 'mov',
+}
+
+# Extensões servidas por GET /api/media (data URLs e /api/media/upload) e o
+# Content-Type enviado; demais arquivos da pasta não são servidos
+SERVED_MEDIA_TYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'mp4': 'video/mp4',
+    'webm': 'video/webm',
+    'mov': 'video/quicktime',
+    'm4v': 'video/x-m4v',
+    'avi': 'video/x-msvideo',
+    'mkv': 'video/x-matroska',
+}
+
+def data_url_mime(data_url: str) -> str:
+    # Tipo declarado na data URL, sem parâmetros e em minúsculas
+    return data_url[5:].split(',', 1)[0].split(';', 1)[0].strip().lower()
+
 def data_url_to_file(data_url: str, dest_dir: str, prefix: str = 'media') -> str:
-    m = re.match(r'^data:(.+?);base64,(.*)$', data_url)
+    m = re.match(r'^data:(.+?);base64,(.*)$', data_url, re.DOTALL)
     if not m:
         raise ValueError('Data URL inválida')
-    mime = m.group(1)
-    b64 = m.group(2)
-    ext = 'bin'
-    if '/' in mime:
-        ext = mime.split('/')[-1].lower()
-        if ext == 'jpeg':
-            ext = 'jpg'
-    raw = base64.b64decode(b64)
+    mime = data_url_mime(data_url)
+    ext = DATA_URL_MIME_EXTENSIONS.get(mime)
+    if ext is None:
+        raise ValueError(f'Tipo de mídia não suportado: {mime or "desconhecido"}')
+    try:
+        raw = base64.b64decode(m.group(2))
+    except ValueError:
+        raise ValueError('Data URL inválida')
     name = generate_unique_filename(f'{prefix}.{ext}')
     path = os.path.join(dest_dir, secure_filename(sanitize_filename(name)))
     with open(path, 'wb') as f:
@@ -37,5 +75,174 @@ def make_file_url(user_id: int, memory_id: int, media_type: str, filename: str)
     media_type = 'photos' if media_type == 'photo' else ('videos' if media_type == 'video' else media_type)
     return f"/api/media/user_{user_id}/memory_{memory_id}/{media_type}/{filename}"
 
+_FILE_URL_RE = re.compile(r'^/api/media/user_(\d+)/memory_(\d+)/(photos|videos)/([^/]+)$')
+
+def parse_file_url(url: Any) -> Optional[Tuple[int, int, str, str]]:
+    # Inverso de make_file_url: (user_id, memory_id, 'photos'|'videos', filename) ou None;
+    # aceita também a forma pública de public_media_url (absoluta e assinada)
+    if not isinstance(url, str) or url.startswith('data:'):
+        return None
+    try:
+        m = _FILE_URL_RE.match(urlsplit(url).path)
+    except ValueError:
+        return None
+    if not m:
+        return None
+    return int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+
+def canonical_media_url(url: Any, user_id: int) -> Any:
+    # Forma gravada (make_file_url) de uma URL de mídia local recebida do cliente,
+    # que pode voltar como link público assinado; demais URLs ficam como estão.
+    # Mídia local de outro usuário é recusada: o link seria assinado para quem a referencia
+    parsed = parse_file_url(url)
+    if parsed is None:
+        return url
+    if parsed[0] != user_id:
+        raise ValueError('Mídia não pertence ao usuário')
+    return make_file_url(*parsed)
+
+def media_url_window() -> int:
+    # Janela de assinatura atual (muda a cada MEDIA_URL_TTL segundos); entra no
+    # ETag das listagens para que respostas em cache não carreguem links expirados
+    return int(time.time()) // current_app.config.get('MEDIA_URL_TTL', 43200)
+
+def _media_signature(path: str, expires: int) -> str:
+    key = current_app.config['SECRET_KEY'].encode('utf-8')
+    return hmac.new(key, f'{path}?expires={expires}'.encode('utf-8'), hashlib.sha256).hexdigest()
+
+def public_media_url(url: Any) -> Any:
+    # Link absoluto e assinado (com expiração) de uma mídia local para as respostas
+    # da API; o frontend roda em outra origem e usa a URL direto em <img>/<video>.
+    # URLs externas seguem sem alteração
+    parsed = parse_file_url(url)
+    if parsed is None or not has_app_context():
+        return url
+    path = make_file_url(*parsed)
+    # Expira no fim da janela seguinte: vale por ao menos MEDIA_URL_TTL segundos
+    # e é a mesma em todas as respostas da janela
+    expires = (media_url_window() + 2) * current_app.config.get('MEDIA_URL_TTL', 43200)
+    base = current_app.config.get('MEDIA_BASE_URL') or (request.host_url if has_request_context() else '')
+    return f"{base.rstrip('/')}{path}?expires={expires}&signature={_media_signature(path, expires)}"
+
+def verify_media_url(path: str, expires: Optional[int], signature: Optional[str]) -> bool:
+    # Confere assinatura e validade de um link de public_media_url
+    if expires is None or not signature or expires < time.time():
+        return False
+    return hmac.compare_digest(_media_signature(path, expires), signature)
+
+def memory_media_dir(user_id: int, memory_id: int, media_type: str) -> str:
+    return os.path.join(current_app.instance_path, 'uploads', f'user_{user_id}', f'memory_{memory_id}', media_type)
+
+def is_data_url(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith('data:') and ';base64,' in value[:100]
+
+def externalize_media(user_id: int, memory_id: int, media: Optional[List[Any]],
+                      written: Optional[List[str]] = None) -> Optional[List[Any]]:
+    # Converte data URLs (base64 inline) em arquivos no disco e devolve a lista
+    # com referências make_file_url; links de mídia local voltam à forma gravada
+    # (canonical_media_url) e as demais URLs são mantidas como estão. Sem
+    # alterações, devolve a própria lista recebida. Os caminhos gravados são
+    # acrescentados a `written` (para remove_media_files se a transação falhar)
+    if not media:
+        return media
+    result = []
+    for m in media:
+        if is_data_url(m):
+            _, photos_dir, videos_dir = build_memory_dirs(user_id, memory_id)
+            media_type = 'video' if data_url_mime(m).startswith('video/') else 'photo'
+            dest_dir = videos_dir if media_type == 'video' else photos_dir
+            filename = data_url_to_file(m, dest_dir, prefix=media_type)
+            if written is not None:
+                written.append(os.path.join(dest_dir, filename))
+            result.append(make_file_url(user_id, memory_id, media_type, filename))
+        else:
+            result.append(canonical_media_url(m, user_id))
+    return media if result == media else result
+
+def media_file_path(url: Any) -> Optional[str]:
+    # Caminho no disco de uma URL de make_file_url (None para URLs externas/data URLs)
+    parsed = parse_file_url(url)
+    if parsed is None:
+        return None
+    user_id, memory_id, media_type, filename = parsed
+    return os.path.join(memory_media_dir(user_id, memory_id, media_type), filename)
+
+def probe_media_file(path: str, kind: str) -> dict:
+    # Tamanho, sha256 e dimensões (imagens) de um arquivo local; leitura em blocos
+    # e apenas o cabeçalho da imagem. A duração de vídeos (ffmpeg) fica com
+    # probe_video_duration, fora do caminho das requisições
+    info = {}
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(block)
+        info['bytes'] = os.path.getsize(path)
+        info['sha256'] = digest.hexdigest()
+    except OSError:
+        return info
+    if kind == 'photo':
+        try:
+            from PIL import Image
+            with Image.open(path) as image:
+                info['width'], info['height'] = image.size
+        except Exception:
+            pass
+    return info
+
+def probe_video_duration(path: str) -> Optional[float]:
+    # Duração de um vídeo local em segundos (None se não for possível ler)
+    try:
+        from src.utils.validators import validate_video_duration
+        return validate_video_duration(path, max_seconds=float('inf'))
+    except ValueError:
+        return None
+
+def describe_media_item(item: Any) -> dict:
+    # Campos de MemoryMedia de um item da lista de mídias, calculados uma vez na escrita
+    # (o tipo segue is_video_media, a mesma regra das respostas antigas)
+    meta = {'kind': 'video' if is_video_media(item) else 'photo', 'url': item, 'mime': None,
+            'bytes': None, 'width': None, 'height': None, 'duration': None, 'sha256': None}
+    if is_data_url(item):
+        header, _, payload = item.partition(',')
+        meta['mime'] = header[5:].split(';', 1)[0].lower() or None
+        # Tamanho decodificado a partir do comprimento do base64 (sem decodificar)
+        meta['bytes'] = len(payload) * 3 // 4 - payload[-2:].count('=')
+        return meta
+    meta['mime'] = mimetypes.guess_type(item.split('?', 1)[0])[0]
+    path = media_file_path(item)
+    if path is not None:
+        meta.update(probe_media_file(path, meta['kind']))
+    return meta
+
+def remove_media_files(paths: List[str]) -> None:
+    # Remove arquivos de mídia (gravados por uma transação desfeita ou que
+    # deixaram de ser referenciados); arquivos já ausentes são ignorados
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def remove_memory_dir(user_id: int, memory_id: int) -> None:
+    base_dir = os.path.join(current_app.instance_path, 'uploads', f'user_{user_id}', f'memory_{memory_id}')
+    shutil.rmtree(base_dir, ignore_errors=True)
+
+def purge_memory_dir(user_id: int, memory_id: int) -> int:
+    # Remove a pasta de mídias da memória e retorna os bytes liberados
+    # (diferente de remove_memory_dir, erros de remoção são propagados)
+    base_dir = os.path.join(current_app.instance_path, 'uploads', f'user_{user_id}', f'memory_{memory_id}')
+    if not os.path.isdir(base_dir):
+        return 0
+    reclaimed = 0
+    for root, _, files in os.walk(base_dir):
+        for name in files:
+            try:
+                reclaimed += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    shutil.rmtree(base_dir)
+    return reclaimed
+
 # validação de vídeo consolidada em src.utils.validators
 
@@ -0,0 +1,168 @@
+# ============================================
+# MEMORY PURGER
+# Expurgo em segundo plano das memórias removidas logicamente
+# ============================================
+
+"""
+Expurgo assíncrono das memórias marcadas com deleted_at.
+
+Responsabilidades:
+- Apagar em lote as linhas removidas (memories e memory_media) fora da requisição
+- Remover a pasta instance/uploads/user_X/memory_Y de cada memória apagada
+- Limitar o ritmo (lotes pequenos, pausa entre lotes, teto de lotes por ciclo)
+- Repetir falhas com espera exponencial e expor métricas (bytes liberados etc.)
+- Apagar as revogações de tokens já expirados (token_blocklist), para que o
+  filtro de token_revocation só leia o banco na requisição
+- Apagar as tentativas de login fora da janela do login_throttle (login_attempts)
+
+A pasta é removida antes da linha: se o DELETE falhar, a memória continua na
+fila e a próxima tentativa encontra a pasta já removida. Vários workers podem
+rodar o expurgo ao mesmo tempo sem coordenação: remover uma pasta inexistente
+e apagar uma linha já apagada são operações sem efeito.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+class MemoryPurger:
+    """Laço de expurgo com limitação de ritmo, novas tentativas e métricas"""
+
+    def __init__(self, batch_size: int = 100, interval: float = 30.0, pause: float = 0.5,
+                 grace_seconds: float = 60.0, max_batches: int = 20, max_attempts: int = 5):
+        self.batch_size = batch_size
+        self.interval = interval  # Segundos entre ciclos
+        self.pause = pause  # Segundos entre lotes de um ciclo
+        self.grace_seconds = grace_seconds  # Idade mínima da remoção antes do expurgo
+        self.max_batches = max_batches  # Teto de lotes por ciclo
+        self.max_attempts = max_attempts  # Tentativas por pasta antes de desistir
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._retry = {}  # memory_id -> (tentativas, instante da próxima tentativa)
+        self._errors = 0  # Falhas consecutivas do ciclo (espera exponencial)
+        self._metrics = {
+            'purged_memories': 0,
+            'purged_tokens': 0,
+            'purged_login_attempts': 0,
+            'reclaimed_bytes': 0,
+            'runs': 0,
+            'failures': 0,
+            'retries': 0,
+            'abandoned': 0,
+            'last_run_at': None,
+            'last_error': None
+        }
+
+    def configure(self, config) -> None:
+        """Lê os parâmetros MEMORY_PURGE_* da configuração da aplicação"""
+        self.batch_size = config.get('MEMORY_PURGE_BATCH_SIZE', self.batch_size)
+        self.interval = config.get('MEMORY_PURGE_INTERVAL', self.interval)
+        self.pause = config.get('MEMORY_PURGE_PAUSE', self.pause)
+        self.grace_seconds = config.get('MEMORY_PURGE_GRACE_SECONDS', self.grace_seconds)
+        self.max_batches = config.get('MEMORY_PURGE_MAX_BATCHES', self.max_batches)
+        self.max_attempts = config.get('MEMORY_PURGE_MAX_ATTEMPTS', self.max_attempts)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._metrics[name] += amount
+
+    def metrics(self) -> dict:
+        """Cópia das métricas acumuladas neste processo"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['pending_retries'] = len(self._retry)
+        return metrics
+
+    def _waiting(self, now: float) -> list:
+        """IDs fora da próxima rodada (em espera ou abandonados)"""
+        return [memory_id for memory_id, (attempts, retry_at) in self._retry.items()
+                if attempts >= self.max_attempts or retry_at > now]
+
+    def run_once(self) -> int:
+        """
+        Executa um ciclo de expurgo (requer contexto de aplicação)
+
+        Returns:
+            int: Memórias apagadas no ciclo
+
+        Raises:
+            Exception: Em erro de banco (a sessão já foi revertida)
+        """
+        from src.repositories.memory_repository import MemoryRepository
+        from src.repositories.token_repository import TokenRepository
+        from src.utils.login_throttle import login_throttle
+        from src.utils.media_manager import purge_memory_dir
+
+        repository = MemoryRepository()
+        purged = 0
+        for batch in range(self.max_batches):
+            if batch and self.pause:
+                time.sleep(self.pause)
+            cutoff = datetime.utcnow() - timedelta(seconds=self.grace_seconds)
+            rows = repository.get_purgeable_memories(cutoff, self.batch_size,
+                                                     exclude=self._waiting(time.monotonic()))
+            if not rows:
+                break
+
+            ready = []
+            for memory_id, user_id in rows:
+                try:
+                    self._count('reclaimed_bytes', purge_memory_dir(user_id, memory_id))
+                except OSError as e:
+                    attempts = self._retry.get(memory_id, (0, 0))[0] + 1
+                    self._retry[memory_id] = (attempts, time.monotonic() + self.interval * 2 ** attempts)
+                    self._count('failures')
+                    self._count('abandoned' if attempts >= self.max_attempts else 'retries')
+                    with self._lock:
+                        self._metrics['last_error'] = str(e)
+                    continue
+                ready.append(memory_id)
+
+            purged += repository.purge_memories(ready)
+            for memory_id in ready:
+                self._retry.pop(memory_id, None)
+            if len(rows) < self.batch_size:
+                break
+
+        self._count('purged_memories', purged)
+        # DELETE pelo índice ix_token_blocklist_expires_at (fora das requisições)
+        self._count('purged_tokens', TokenRepository().purge_expired())
+        self._count('purged_login_attempts', login_throttle.purge())
+        self._count('runs')
+        with self._lock:
+            self._metrics['last_run_at'] = datetime.utcnow().isoformat()
+        return purged
+
+    def _loop(self, app) -> None:
+        while not self._stop.is_set():
+            try:
+                with app.app_context():
+                    self.run_once()
+                self._errors = 0
+            except Exception as e:
+                # Banco indisponível etc.: nova tentativa com espera exponencial
+                self._errors += 1
+                self._count('failures')
+                with self._lock:
+                    self._metrics['last_error'] = str(e)
+            self._stop.wait(min(self.interval * 2 ** self._errors, 3600))
+
+    def start(self, app) -> None:
+        """Inicia o laço em uma thread daemon (uma por processo)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.configure(app.config)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(app,), name='memory-purger', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Interrompe o laço ao fim do ciclo atual"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+# Instância compartilhada pelo processo
+memory_purger = MemoryPurger()
@@ -0,0 +1,134 @@
+# ============================================
+# PASSWORD HASHER
+# Hash de senhas (bcrypt) em um pool de processos limitado
+# ============================================
+
+"""
+Hash e verificação de senhas com bcrypt fora da thread da requisição.
+
+Responsabilidades:
+- Aplicar o custo configurado (BCRYPT_ROUNDS) aos novos hashes
+- Indicar hashes gravados com outro custo (rehash transparente no login)
+- Executar bcrypt em um pool de processos de tamanho fixo por worker
+- Recusar trabalho quando o pool está cheio (HasherBusyError), em vez de
+  enfileirar requisições atrás de uma fila que só cresce
+
+Cada worker do gunicorn cria o próprio pool em post_worker_init
+(gunicorn.conf.py), antes de atender requisições; fora do gunicorn, no primeiro
+hash. Os processos do pool são iniciados com spawn, não fork: o worker já pode
+ter threads (memory_purger, threads de requisição) e um fork copiaria locks
+em uso. Os limites valem por worker: com N workers, até N * PASSWORD_HASH_WORKERS
+hashes simultâneos e N * PASSWORD_HASH_MAX_PENDING pendências no total.
+
+Com PASSWORD_HASH_WORKERS = 0, bcrypt roda na própria thread, ainda limitado
+por PASSWORD_HASH_MAX_PENDING.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+class HasherBusyError(RuntimeError):
+    """Pool de hash saturado: a requisição deve falhar rápido (503)"""
+
+def _hashpw(password: bytes, rounds: int) -> bytes:
+    # Executada no processo do pool (função de módulo: precisa ser serializável)
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _checkpw(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+class PasswordHasher:
+    """bcrypt com custo configurável, pool de processos e limite de pendências"""
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 4, timeout: float = 10.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending  # Hashes em execução ou na fila, por processo
+        self.timeout = timeout  # Segundos de espera pelo resultado
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._pid = None
+
+    def configure(self, config) -> None:
+        """Lê BCRYPT_ROUNDS e PASSWORD_HASH_* da configuração da aplicação"""
+        with self._lock:
+            self.rounds = config.get('BCRYPT_ROUNDS', self.rounds)
+            self.workers = config.get('PASSWORD_HASH_WORKERS', self.workers)
+            self.max_pending = config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+            self.timeout = config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                self._pid = os.getpid()
+            return self._executor
+
+    def start(self) -> None:
+        """Cria o pool neste processo (gunicorn: post_worker_init, após configure)"""
+        if self.workers:
+            self._pool()
+
+    def _run(self, func, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HasherBusyError('Pool de hash de senhas saturado')
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                slots.release()
+        try:
+            future = self._pool().submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        # O slot só volta quando o hash termina (ou é cancelado antes de começar):
+        # cancel() não interrompe um bcrypt que já está rodando no pool
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HasherBusyError('Tempo esgotado no hash de senha')
+
+    def hash(self, password: str) -> str:
+        """
+        Gera o hash bcrypt de uma senha com o custo configurado
+
+        Raises:
+            HasherBusyError: Se o pool estiver saturado
+        """
+        return self._run(_hashpw, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """
+        Verifica uma senha contra um hash bcrypt
+
+        Raises:
+            HasherBusyError: Se o pool estiver saturado
+        """
+        return self._run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True se o hash foi gerado com um custo diferente de BCRYPT_ROUNDS"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds  # $2b$<custo>$<salt+hash>
+        except (IndexError, ValueError):
+            return True
+
+# Instância compartilhada pelo processo
+password_hasher = PasswordHasher()
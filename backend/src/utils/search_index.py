@@ -0,0 +1,221 @@
+# ============================================
+# SEARCH INDEX
+# Índice de texto completo das memórias (SQLite FTS5 / Postgres tsvector)
+# ============================================
+
+"""
+Índice de busca textual sobre título e descrição das memórias.
+
+Responsabilidades:
+- Criar/remover a estrutura de índice conforme o banco (DDL por dialeto)
+- Manter documentos do índice sincronizados com as escritas de memórias
+- Executar buscas ranqueadas e paginadas por usuário
+
+Estratégias por dialeto:
+- SQLite: tabela virtual FTS5 (memories_fts, rowid = id da memória), ranking bm25;
+  o dono é um token indexado (coluna owner = 'u<user_id>') e entra no MATCH,
+  então a busca percorre só as listas de termos do usuário, não o corpus inteiro
+- Postgres: tabela memory_search com coluna tsvector e índice GIN, ranking ts_rank;
+  o filtro por user_id usa o índice B-tree próprio (o planner combina os dois)
+- Outros bancos: sem índice; LIKE sobre memories (sem ranking nem remoção de acentos)
+
+A estrutura é criada pela migração 0012_memory_search_index (bancos existentes)
+ou junto com db.create_all() (bancos novos). As funções aceitam uma Session ou
+uma Connection, para serem usadas também pelas migrações.
+
+O texto é normalizado com normalize_text (minúsculas e sem acentos) antes de
+indexar e de consultar, então a busca é insensível a acentos nos dois bancos.
+
+Padrões de Projeto:
+- Strategy Pattern: Implementação escolhida pelo dialeto da conexão
+"""
+
+import re
+from typing import List, Tuple
+from sqlalchemy import event, inspect, text
+from src.utils.helpers import normalize_text
+
+SQLITE_TABLE = 'memories_fts'
+POSTGRES_TABLE = 'memory_search'
+
+_SQLITE_CREATE = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+    "title, description, owner, tokenize='unicode61 remove_diacritics 2')"
+]
+_POSTGRES_CREATE = [
+    f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+    "memory_id INTEGER PRIMARY KEY REFERENCES memories(id) ON DELETE CASCADE, "
+    "user_id INTEGER NOT NULL, "
+    "document TSVECTOR NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_TABLE}_document ON {POSTGRES_TABLE} USING GIN (document)",
+    f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_TABLE}_user_id ON {POSTGRES_TABLE} (user_id)",
+]
+
+def _dialect(executor) -> str:
+    # Connection tem .dialect; Session expõe o engine em get_bind()
+    bind = executor if hasattr(executor, 'dialect') else executor.get_bind()
+    return bind.dialect.name
+
+def _owner(user_id: int) -> str:
+    # Token do dono no FTS5 (um único termo para o tokenizer unicode61)
+    return f'u{user_id}'
+
+def _table_name(bind) -> str:
+    return POSTGRES_TABLE if _dialect(bind) == 'postgresql' else SQLITE_TABLE
+
+def is_supported(bind) -> bool:
+    return _dialect(bind) in ('sqlite', 'postgresql')
+
+def search_index_exists(connection) -> bool:
+    if not is_supported(connection):
+        return False
+    return inspect(connection).has_table(_table_name(connection))
+
+def create_statements(dialect_name: str) -> List[str]:
+    """DDL idempotente do índice para o dialeto (vazia se não suportado)"""
+    return {'sqlite': _SQLITE_CREATE, 'postgresql': _POSTGRES_CREATE}.get(dialect_name, [])
+
+def create_search_index(connection) -> None:
+    """Cria a estrutura do índice (idempotente)"""
+    for statement in create_statements(_dialect(connection)):
+        connection.execute(text(statement))
+
+def drop_search_index(connection) -> None:
+    """Remove a estrutura do índice (idempotente)"""
+    if is_supported(connection):
+        connection.execute(text(f"DROP TABLE IF EXISTS {_table_name(connection)}"))
+
+def register_search_index(table) -> None:
+    """
+    Acopla o índice ao ciclo de vida da tabela de memórias
+
+    Assim db.create_all()/db.drop_all() também criam e removem o índice.
+    """
+    event.listen(table, 'after_create', lambda target, connection, **kw: create_search_index(connection))
+    event.listen(table, 'before_drop', lambda target, connection, **kw: drop_search_index(connection))
+
+def upsert_document(session, memory_id: int, user_id: int, title: str, description: str) -> None:
+    """
+    Insere ou substitui o documento de uma memória (na transação da sessão)
+    """
+    params = {
+        'id': memory_id,
+        'user_id': user_id,
+        'owner': _owner(user_id),
+        'title': normalize_text(title),
+        'description': normalize_text(description),
+    }
+    if _dialect(session) == 'sqlite':
+        session.execute(text(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = :id"), params)
+        session.execute(text(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, title, description, owner) "
+            "VALUES (:id, :title, :description, :owner)"
+        ), params)
+    elif _dialect(session) == 'postgresql':
+        session.execute(text(
+            f"INSERT INTO {POSTGRES_TABLE} (memory_id, user_id, document) VALUES (:id, :user_id, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :description), 'B')) "
+            "ON CONFLICT (memory_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document"
+        ), params)
+
+def insert_documents(session, documents: List[Tuple[int, int, str, str]]) -> None:
+    """
+    Indexa várias memórias novas de uma vez (executemany)
+
+    Args:
+        session: Sessão SQLAlchemy (ou Connection)
+        documents: Tuplas (memory_id, user_id, title, description) de memórias sem documento
+    """
+    if not documents:
+        return
+    params = [
+        {'id': memory_id, 'user_id': user_id, 'owner': _owner(user_id),
+         'title': normalize_text(title), 'description': normalize_text(description)}
+        for memory_id, user_id, title, description in documents
+    ]
+    if _dialect(session) == 'sqlite':
+        session.execute(text(
+            f"INSERT INTO {SQLITE_TABLE} (rowid, title, description, owner) "
+            "VALUES (:id, :title, :description, :owner)"
+        ), params)
+    elif _dialect(session) == 'postgresql':
+        session.execute(text(
+            f"INSERT INTO {POSTGRES_TABLE} (memory_id, user_id, document) VALUES (:id, :user_id, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :description), 'B'))"
+        ), params)
+
+def delete_document(session, memory_id: int) -> None:
+    """Remove o documento de uma memória (na transação da sessão)"""
+    if _dialect(session) == 'sqlite':
+        session.execute(text(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = :id"), {'id': memory_id})
+    elif _dialect(session) == 'postgresql':
+        session.execute(text(f"DELETE FROM {POSTGRES_TABLE} WHERE memory_id = :id"), {'id': memory_id})
+
+def tokenize_query(query: str) -> List[str]:
+    """Extrai os termos de busca já normalizados (sem operadores da sintaxe de busca)"""
+    return re.findall(r'\w+', normalize_text(query))
+
+def search_ids(session, user_id: int, query: str, limit: int, offset: int = 0) -> List[Tuple[int, float]]:
+    """
+    Busca ids de memórias do usuário que contêm todos os termos (por prefixo)
+
+    Args:
+        session: Sessão SQLAlchemy
+        user_id (int): ID do usuário
+        query (str): Texto digitado pelo usuário
+        limit (int): Máximo de resultados
+        offset (int): Resultados a pular
+
+    Returns:
+        Lista de (id da memória, relevância), da mais relevante para a menos
+    """
+    terms = tokenize_query(query)
+    if not terms:
+        return []
+
+    params = {'user_id': user_id, 'limit': limit, 'offset': offset}
+    if _dialect(session) == 'sqlite':
+        # Dono e termos no mesmo MATCH; os termos só casam em título/descrição
+        params['match'] = (
+            f'owner:{_owner(user_id)} AND '
+            '{title description}: (' + ' AND '.join(f'"{term}"*' for term in terms) + ')'
+        )
+        rows = session.execute(text(
+            f"SELECT rowid, bm25({SQLITE_TABLE}, 10.0, 1.0, 0.0) AS rank FROM {SQLITE_TABLE} "
+            f"WHERE {SQLITE_TABLE} MATCH :match "
+            "ORDER BY rank, rowid DESC LIMIT :limit OFFSET :offset"
+        ), params).all()
+        # bm25 é menor para documentos mais relevantes; inverter para manter "maior = melhor"
+        return [(row[0], -row[1]) for row in rows]
+    if _dialect(session) == 'postgresql':
+        params['tsquery'] = ' & '.join(f'{term}:*' for term in terms)
+        rows = session.execute(text(
+            f"SELECT memory_id, ts_rank(document, to_tsquery('simple', :tsquery)) AS rank "
+            f"FROM {POSTGRES_TABLE} "
+            "WHERE user_id = :user_id AND document @@ to_tsquery('simple', :tsquery) "
+            "ORDER BY rank DESC, memory_id DESC LIMIT :limit OFFSET :offset"
+        ), params).all()
+        return [(row[0], row[1]) for row in rows]
+    return _search_ids_like(session, terms, params)
+
+def _search_ids_like(session, terms: List[str], params: dict) -> List[Tuple[int, float]]:
+    """
+    Busca sem índice textual (bancos sem FTS5/tsvector): LIKE por termo em memories
+
+    Varre as memórias do usuário (índice por user_id); sem ranking (relevância
+    0.0, mais recentes primeiro) e sem remoção de acentos no texto armazenado.
+    """
+    conditions = []
+    for position, term in enumerate(terms):
+        # \w inclui '_', curinga do LIKE
+        params[f'term_{position}'] = '%' + term.replace('_', '\\_') + '%'
+        conditions.append(
+            f"(lower(title) LIKE :term_{position} ESCAPE '\\' "
+            f"OR lower(coalesce(description, '')) LIKE :term_{position} ESCAPE '\\')"
+        )
+    rows = session.execute(text(
+        "SELECT id FROM memories WHERE user_id = :user_id AND deleted_at IS NULL AND "
+        + ' AND '.join(conditions) +
+        " ORDER BY id DESC LIMIT :limit OFFSET :offset"
+    ), params).all()
+    return [(row[0], 0.0) for row in rows]
@@ -0,0 +1,91 @@
+# ============================================
+# SERIALIZERS
+# Serializadores pré-compilados por modelo
+# ============================================
+
+"""
+Geração de serializadores de modelos (instância -> dict) compilados uma vez por classe.
+
+Responsabilidades:
+- Resolver, na primeira chamada, as colunas exportadas, renomeações
+  (ex.: spotify_url -> spotifyUrl) e formatadores de data
+- Ler todas as colunas de uma linha com um único attrgetter
+- Formatar datas (YYYY-MM-DD) e datas/horas (RFC 822, o mesmo formato que o
+  provedor JSON padrão do Flask produzia) antes da codificação JSON
+
+Padrões de Projeto:
+- Strategy Pattern: Formatador escolhido por tipo de coluna na compilação
+"""
+
+from datetime import datetime, timezone
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterable, Mapping
+
+from sqlalchemy import Date, DateTime
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def http_date(value: datetime) -> str:
+    """
+    Formata data/hora no padrão HTTP (RFC 822), igual a werkzeug.http.http_date
+    
+    Datas/horas sem fuso são tratadas como UTC (as colunas usam utcnow).
+    Nomes de dia e mês fixos em inglês, independentes do locale.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (f'{_WEEKDAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} '
+            f'{value.year:04d} {value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT')
+
+def _formatter(column) -> Callable:
+    """Formatador da coluna (ou None se o valor já é serializável)"""
+    if isinstance(column.type, DateTime):
+        return http_date
+    if isinstance(column.type, Date):
+        return lambda value: value.isoformat()
+    return None
+
+def compile_serializer(columns: Iterable, exclude: Iterable[str] = (),
+                       rename: Mapping[str, str] = None) -> Callable[[object], dict]:
+    """
+    Compila o serializador de um conjunto de colunas
+    
+    Args:
+        columns: Colunas da tabela (Model.__table__.columns)
+        exclude: Colunas que não saem na representação
+        rename: Mapa coluna -> chave no dicionário
+        
+    Returns:
+        Callable: Função instância -> dict
+    """
+    rename = rename or {}
+    selected = [column for column in columns if column.name not in exclude]
+    names = tuple(column.name for column in selected)
+    keys = tuple(rename.get(name, name) for name in names)
+    formatters = tuple(
+        (rename.get(column.name, column.name), formatter)
+        for column in selected
+        for formatter in (_formatter(column),) if formatter
+    )
+    # attr/itemgetter com um único nome devolvem o valor, não uma tupla
+    if len(names) > 1:
+        loaded, fetch = itemgetter(*names), attrgetter(*names)
+    else:
+        loaded = lambda state: (state[names[0]],)
+        fetch = lambda instance: (getattr(instance, names[0]),)
+    
+    def serialize(instance) -> dict:
+        try:
+            # Linha já carregada: valores direto do __dict__, sem os descritores do ORM
+            values = loaded(instance.__dict__)
+        except KeyError:
+            values = fetch(instance)  # Coluna adiada ou expirada: carregamento normal
+        data = dict(zip(keys, values))
+        for key, formatter in formatters:
+            value = data[key]
+            if value is not None:
+                data[key] = formatter(value)
+        return data
+    
+    return serialize
@@ -0,0 +1,179 @@
+# ============================================
+# SPATIAL INDEX
+# Índice em memória de coordenadas por usuário (k vizinhos mais próximos)
+# ============================================
+
+"""
+Índice de coordenadas por usuário para consultas k-NN em memória.
+
+Responsabilidades:
+- Manter, por usuário, arrays contíguos float64 (radianos e vetores unitários) e os ids
+- Selecionar os k mais próximos com argpartition (O(n) em vez de ordenar tudo)
+- Calcular distâncias de Haversine vetorizadas com NumPy para os selecionados
+- Aplicar escritas de forma incremental (inserção, atualização e remoção em O(1))
+- Detectar índices desatualizados pela versão da coleção (users.memories_version)
+
+Cada escrita em memórias incrementa a versão da coleção em exatamente 1, então
+um índice que acompanha as escritas locais continua com a mesma versão do banco;
+se outro worker escrever, a versão diverge e o índice é reconstruído na próxima
+consulta.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+from src.utils.helpers import EARTH_RADIUS_M
+
+class _UserCoordinates:
+    """Arrays de coordenadas de um usuário com capacidade crescente"""
+
+    def __init__(self, rows: Iterable[Tuple[int, float, float]], version: int):
+        rows = list(rows)
+        capacity = max(16, len(rows))
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.radians = np.zeros((capacity, 2), dtype=np.float64)  # (lat, lng) em radianos
+        self.unit = np.zeros((capacity, 3), dtype=np.float64)  # vetores unitários (x, y, z)
+        self.size = 0
+        self.positions = {}
+        self.version = version
+
+        if rows:
+            n = len(rows)
+            self.ids[:n] = [r[0] for r in rows]
+            self.radians[:n] = np.radians(np.asarray([(r[1], r[2]) for r in rows], dtype=np.float64))
+            self._fill_unit(slice(0, n))
+            self.size = n
+            self.positions = {int(memory_id): i for i, memory_id in enumerate(self.ids[:n])}
+
+    def _fill_unit(self, rows):
+        lat = self.radians[rows, 0]
+        lng = self.radians[rows, 1]
+        cos_lat = np.cos(lat)
+        self.unit[rows, 0] = cos_lat * np.cos(lng)
+        self.unit[rows, 1] = cos_lat * np.sin(lng)
+        self.unit[rows, 2] = np.sin(lat)
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        for name in ('ids', 'radians', 'unit'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def upsert(self, memory_id: int, lat: float, lng: float):
+        pos = self.positions.get(memory_id)
+        if pos is None:
+            if self.size == len(self.ids):
+                self._grow()
+            pos = self.size
+            self.size += 1
+            self.positions[memory_id] = pos
+            self.ids[pos] = memory_id
+        self.radians[pos] = np.radians((lat, lng))
+        self._fill_unit(slice(pos, pos + 1))
+
+    def remove(self, memory_id: int):
+        pos = self.positions.pop(memory_id, None)
+        if pos is None:
+            return
+        last = self.size - 1
+        if pos != last:
+            # Troca com o último elemento para remover em O(1)
+            for arr in (self.ids, self.radians, self.unit):
+                arr[pos] = arr[last]
+            self.positions[int(self.ids[pos])] = pos
+        self.size = last
+
+    def nearest(self, lat: float, lng: float, k: int) -> List[Tuple[int, float]]:
+        n = self.size
+        if n == 0 or k <= 0:
+            return []
+        phi, lam = np.radians((lat, lng))
+        query = np.array((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+
+        # Seleção: o produto escalar dos vetores unitários é monotônico com a
+        # distância de Haversine (maior produto = mais próximo), e custa um único
+        # produto matriz-vetor em vez de funções trigonométricas por ponto
+        similarity = self.unit[:n] @ query
+        k = min(k, n)
+        if k < n:
+            idx = np.argpartition(-similarity, k - 1)[:k]
+        else:
+            idx = np.arange(n)
+
+        # Distância exata (Haversine vetorizado) apenas para os k escolhidos
+        lat_arr = self.radians[idx, 0]
+        a = (np.sin((lat_arr - phi) / 2.0) ** 2
+             + np.cos(phi) * np.cos(lat_arr) * np.sin((self.radians[idx, 1] - lam) / 2.0) ** 2)
+        distances = 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+        order = np.argsort(distances, kind='stable')
+        return list(zip(self.ids[idx][order].tolist(), distances[order].tolist()))
+
+class CoordinateIndex:
+    """
+    Cache LRU de índices de coordenadas por usuário (seguro entre threads)
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._entries: "OrderedDict[int, _UserCoordinates]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def nearest(self, user_id: int, version: int, loader: Callable[[], Iterable[Tuple[int, float, float]]],
+                lat: float, lng: float, k: int) -> List[Tuple[int, float]]:
+        """
+        Retorna os k ids mais próximos e suas distâncias em metros
+
+        Args:
+            user_id (int): ID do usuário
+            version (int): Versão atual da coleção no banco
+            loader (Callable): Função que retorna (id, lat, lng) de todas as memórias
+            lat, lng (float): Ponto de consulta em graus
+            k (int): Quantidade de vizinhos
+
+        Returns:
+            Lista de (id da memória, distância em metros), da mais próxima à mais distante
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(user_id)
+                return entry.nearest(lat, lng, k)
+
+        # Reconstrução fora do lock (consulta ao banco)
+        entry = _UserCoordinates(loader(), version)
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+            return entry.nearest(lat, lng, k)
+
+    def upsert(self, user_id: int, memory_id: int, lat: float, lng: float):
+        """Aplica inserção/atualização local (acompanha o incremento de versão)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.upsert(memory_id, float(lat), float(lng))
+                entry.version += 1
+
+    def remove(self, user_id: int, memory_id: int):
+        """Aplica remoção local (acompanha o incremento de versão)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.remove(memory_id)
+                entry.version += 1
+
+    def invalidate(self, user_id: int):
+        """Descarta o índice de um usuário"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+# Instância global por processo (Singleton)
+coordinate_index = CoordinateIndex()
@@ -0,0 +1,159 @@
+# ============================================
+# TOKEN REVOCATION
+# Filtro de Bloom na frente da lista de tokens JWT revogados
+# ============================================
+
+"""
+Verificação de revogação de tokens JWT sem consulta ao banco no caso comum.
+
+Responsabilidades:
+- Manter em memória um filtro de Bloom com os jti revogados e não expirados
+- Responder "não revogado" sem consulta quando o jti não está no filtro
+  (sem falsos negativos); apenas acertos do filtro consultam o banco
+- Sincronizar o filtro periodicamente com as revogações feitas em outros
+  workers (consulta incremental por created_at, com sobreposição)
+- Reconstruir o filtro de tempos em tempos, sem as revogações expiradas
+
+A verificação roda na thread da requisição e apenas lê o banco; as linhas
+expiradas de token_blocklist são apagadas pelo memory_purger, em segundo plano.
+
+Uma revogação feita neste worker entra no filtro na hora; nos demais, em até
+JWT_BLOCKLIST_SYNC_INTERVAL segundos.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+class BloomFilter:
+    """Filtro de Bloom em bytearray com hashing duplo (blake2b)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> bool:
+        """Inclui a chave; só conta (e retorna True) se algum bit era novo"""
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        self.count += added
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class RevocationFilter:
+    """Filtro de Bloom de jti revogados, sincronizado com token_blocklist"""
+
+    # Sobreposição da sincronização incremental: cobre commits tardios e
+    # diferenças de relógio entre workers (jti repetidos não alteram o filtro
+    # nem a contagem que dispara a reconstrução)
+    SYNC_OVERLAP = timedelta(seconds=60)
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01,
+                 sync_interval: float = 5.0, rebuild_interval: float = 3600.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_at = None  # datetime (UTC) da última sincronização
+        self._next_sync = 0.0  # time.monotonic()
+        self._next_rebuild = 0.0
+        self._metrics = {'checks': 0, 'filter_hits': 0, 'db_checks': 0, 'revoked': 0, 'syncs': 0, 'rebuilds': 0}
+
+    def configure(self, config) -> None:
+        """Lê os parâmetros JWT_BLOCKLIST_* da configuração da aplicação"""
+        with self._lock:
+            self.capacity = config.get('JWT_BLOCKLIST_CAPACITY', self.capacity)
+            self.error_rate = config.get('JWT_BLOCKLIST_ERROR_RATE', self.error_rate)
+            self.sync_interval = config.get('JWT_BLOCKLIST_SYNC_INTERVAL', self.sync_interval)
+            self.rebuild_interval = config.get('JWT_BLOCKLIST_REBUILD_INTERVAL', self.rebuild_interval)
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._synced_at = None
+            self._next_sync = self._next_rebuild = 0.0
+
+    def _refresh(self, repository) -> None:
+        """Sincroniza (incremental) ou reconstrói o filtro quando for a hora"""
+        now = time.monotonic()
+        if now < self._next_sync or not self._lock.acquire(blocking=False):
+            return  # Outra thread já está sincronizando
+        try:
+            started = datetime.utcnow()
+            if now >= self._next_rebuild or self._filter.count >= self._filter.capacity:
+                jtis = repository.get_active_jtis()
+                bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+                for jti in jtis:
+                    bloom.add(jti)
+                self._filter = bloom
+                self._next_rebuild = now + self.rebuild_interval
+                self._metrics['rebuilds'] += 1
+            else:
+                for jti in repository.get_active_jtis(since=self._synced_at - self.SYNC_OVERLAP):
+                    self._filter.add(jti)
+                self._metrics['syncs'] += 1
+            self._synced_at = started
+            self._next_sync = now + self.sync_interval
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Verifica se um token foi revogado (requer contexto de aplicação)
+
+        Args:
+            jti (str): Identificador único do token
+
+        Returns:
+            True se revogado
+        """
+        from src.repositories.token_repository import TokenRepository
+        repository = TokenRepository()
+        self._refresh(repository)
+        self._metrics['checks'] += 1
+        if jti not in self._filter:
+            return False
+        # Possível falso positivo do filtro: confirmar no banco
+        self._metrics['filter_hits'] += 1
+        self._metrics['db_checks'] += 1
+        return repository.is_revoked(jti)
+
+    def revoke(self, jti: str, user_id: int, expires_at: datetime) -> None:
+        """
+        Revoga um token: grava em token_blocklist e inclui no filtro local
+
+        Args:
+            jti (str): Identificador único do token
+            user_id (int): Dono do token
+            expires_at (datetime): Expiração do token (UTC)
+        """
+        from src.repositories.token_repository import TokenRepository
+        TokenRepository().revoke(jti, user_id, expires_at)
+        self._filter.add(jti)
+        self._metrics['revoked'] += 1
+
+    def metrics(self) -> dict:
+        """Contadores deste processo e ocupação do filtro"""
+        metrics = dict(self._metrics)
+        metrics['filter_entries'] = self._filter.count
+        metrics['filter_capacity'] = self._filter.capacity
+        return metrics
+
+# Instância compartilhada pelo processo
+revocation_filter = RevocationFilter()
@@ -3,11 +3,12 @@ import React, { useState } from "react";
 export function MemoryMediaGallery({ memory }) {
   const [activeTab, setActiveTab] = useState('all');
 
+  // Mídias do backend chegam como links assinados (?expires=...&signature=...)
   const isPhoto = (src) => typeof src === 'string' && (
-    src.startsWith('data:image/') || /\.(jpg|jpeg|png|gif|bmp|webp)$/i.test(src)
+    src.startsWith('data:image/') || /\.(jpg|jpeg|png|gif|bmp|webp)(\?.*)?$/i.test(src)
   );
   const isVideo = (src) => typeof src === 'string' && (
-    src.startsWith('data:video/') || /\.(mp4|mov|avi|mkv|webm)$/i.test(src)
+    src.startsWith('data:video/') || /\.(mp4|mov|avi|mkv|webm)(\?.*)?$/i.test(src)
   );
 
   const photos = Array.isArray(memory.photos) ? memory.photos.filter(isPhoto) : [];
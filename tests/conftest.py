@@ -27,6 +27,8 @@ class TestConfig(DevelopmentConfig):
     # Configuração de teste (modo TESTING; banco SQLite isolado)
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test_memory_book.sqlite'
+    MEMORY_PURGE_ENABLED = False  # Expurgo executado explicitamente nos testes
+    LOGIN_THROTTLE_ENABLED = False  # Todos os logins dos testes vêm do mesmo IP
 
 
 def unique_email(prefix="user"):
@@ -47,6 +49,9 @@ def client(app):
     with app.app_context():
         db.drop_all()
         db.create_all()
+    # IDs se repetem entre testes: descartar snapshots de usuário/tema em cache
+    from src.utils.identity_cache import identity_cache
+    identity_cache.clear()
     # Client do Flask para enviar requisições reais
     return app.test_client()
 
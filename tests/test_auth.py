@@ -59,3 +59,158 @@ def test_logout_without_token(client):
     print("Testando: Logout (sem token)")
     res = client.post("/api/auth/logout")
     assert res.status_code == 401
+
+
+def test_login_rehash_and_busy_pool(app, client, create_test_user, login_user):
+    # Cenário: login regrava o hash com o novo custo e responde 503 com o pool saturado
+    print("Testando: Rehash do bcrypt e pool de hash saturado")
+    from src.models import User
+    from src.utils.password_hasher import password_hasher
+    create_test_user(client, email="rehash@example.com", password="segredo123")
+    try:
+        password_hasher.configure({**app.config, "BCRYPT_ROUNDS": 5})
+        res, _, _ = login_user(client, "rehash@example.com", "segredo123")
+        assert res.status_code == 200
+        with app.app_context():
+            assert User.query.filter_by(email="rehash@example.com").first().password_hash.startswith("$2b$05$")
+
+        password_hasher.configure({**app.config, "PASSWORD_HASH_MAX_PENDING": 0})
+        res, _, _ = login_user(client, "rehash@example.com", "segredo123")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "1"
+    finally:
+        password_hasher.configure(app.config)
+
+
+def test_password_hasher_slot_held_until_done():
+    # Cenário: hash que estourou o tempo continua ocupando o slot até terminar no pool
+    print("Testando: Slot do pool de hash após timeout")
+    import time
+    from src.utils.password_hasher import HasherBusyError, PasswordHasher
+    hasher = PasswordHasher(rounds=12, workers=1, max_pending=1, timeout=0.01)
+    try:
+        hasher.start()
+        with pytest.raises(HasherBusyError, match="Tempo esgotado"):
+            hasher.hash("segredo123")
+        with pytest.raises(HasherBusyError, match="saturado"):
+            hasher.hash("segredo123")
+
+        hasher.timeout = 30.0
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                assert hasher.verify("segredo123", hasher.hash("segredo123"))
+                break
+            except HasherBusyError:
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+    finally:
+        hasher.configure({})
+
+def test_login_throttle(app, client, create_test_user, login_user):
+    # Cenário: tentativas excedentes por email recebem 429 com Retry-After
+    print("Testando: Limite de tentativas de login")
+    from src.utils.login_throttle import login_throttle
+    create_test_user(client, email="throttle@example.com", password="segredo123")
+    try:
+        login_throttle.configure({**app.config, "LOGIN_THROTTLE_ENABLED": True, "LOGIN_THROTTLE_EMAIL_LIMIT": 2})
+        for _ in range(2):
+            res, _, _ = login_user(client, "throttle@example.com", "errada123")
+            assert res.status_code == 401
+        res, data, _ = login_user(client, "Throttle@example.com", "segredo123")
+        assert res.status_code == 429
+        assert data["error_type"] == "too_many_attempts" and int(res.headers["Retry-After"]) >= 1
+        assert client.get("/api/health").get_json()["login_throttle"]["throttled_email"] == 1
+
+        # Outro worker (outra instância) enxerga as mesmas tentativas, pelo banco
+        from src.models import LoginAttempt
+        from src.utils.login_throttle import LoginThrottle
+        worker = LoginThrottle()
+        worker.configure({**app.config, "LOGIN_THROTTLE_ENABLED": True, "LOGIN_THROTTLE_EMAIL_LIMIT": 2})
+        with app.app_context():
+            assert worker.attempt("throttle@example.com", "10.0.0.9")[0] == "email"
+            worker.configure({**app.config, "LOGIN_THROTTLE_EMAIL_WINDOW": 0, "LOGIN_THROTTLE_IP_WINDOW": 0})
+            assert worker.purge() == 4 and LoginAttempt.query.count() == 0
+    finally:
+        login_throttle.configure(app.config)
+
+
+def test_logout_revokes_token(app, client, create_test_user, login_user):
+    # Cenário: token revogado no logout é recusado, inclusive por outro worker
+    print("Testando: Logout (revogação do token)")
+    create_test_user(client, email="revoke@example.com", password="segredo123")
+    _, _, token = login_user(client, "revoke@example.com", "segredo123")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/me", headers=headers).status_code == 401
+
+    _, _, other = login_user(client, "revoke@example.com", "segredo123")
+    assert client.get("/api/auth/me", headers={"Authorization": f"Bearer {other}"}).status_code == 200
+
+    import jwt
+    from src.utils.token_revocation import RevocationFilter
+    with app.app_context():
+        worker = RevocationFilter()  # Filtro de outro processo, montado a partir do banco
+        assert worker.is_revoked(jwt.decode(token, options={"verify_signature": False})["jti"])
+        assert not worker.is_revoked(jwt.decode(other, options={"verify_signature": False})["jti"])
+
+
+def test_revocation_filter_sync_and_purge(app, client, create_test_user, login_user):
+    # Cenário: sincronização repetida não infla o filtro; expiradas só saem pelo expurgo
+    print("Testando: Filtro de revogação (sincronização e expurgo)")
+    from datetime import datetime, timedelta
+    from src.app_factory import db
+    from src.models.token_blocklist import TokenBlocklist
+    from src.utils.memory_purger import MemoryPurger
+    from src.utils.token_revocation import RevocationFilter
+    create_test_user(client, email="sync@example.com", password="segredo123")
+    _, _, token = login_user(client, "sync@example.com", "segredo123")
+    assert client.post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    with app.app_context():
+        user_id = TokenBlocklist.query.first().user_id
+        db.session.add(TokenBlocklist(jti="expirado", user_id=user_id,
+                                      expires_at=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+
+        worker = RevocationFilter()
+        for _ in range(3):
+            worker._next_sync = 0.0  # Força a sincronização incremental (mesma janela de sobreposição)
+            worker.is_revoked("outro")
+        assert worker.metrics()["filter_entries"] == 1 and worker.metrics()["rebuilds"] == 1
+        assert TokenBlocklist.query.count() == 2  # A verificação não apaga nada
+
+        purger = MemoryPurger()
+        purger.run_once()
+        assert purger.metrics()["purged_tokens"] == 1
+        assert TokenBlocklist.query.count() == 1
+        assert TokenBlocklist.query.filter_by(jti="expirado").count() == 0
+
+
+def test_register_single_transaction(app, client, create_test_user):
+    # Cenário: registro grava usuário e tema juntos; email repetido vira 400
+    print("Testando: Registro (transação única)")
+    from src.models import Theme, User
+    res, data, _ = create_test_user(client, email="dup@example.com", password="segredo123")
+    assert res.status_code == 201
+    with app.app_context():
+        assert Theme.query.filter_by(user_id=data["user"]["id"]).count() == 1
+
+    res = client.post("/api/auth/register", json={"name": "Outro", "email": "dup@example.com", "password": "segredo123"})
+    assert res.status_code == 400
+    assert res.get_json()["error_type"] == "email_already_exists"
+    with app.app_context():
+        assert User.query.count() == 1 and Theme.query.count() == 1
+
+
+def test_email_case_insensitive(client, create_test_user, login_user):
+    # Cenário: email é comparado sem diferenciar maiúsculas no login e no registro
+    print("Testando: Email sem diferenciar maiúsculas")
+    res, _, _ = create_test_user(client, email="Case@Example.com", password="segredo123")
+    assert res.status_code == 201
+    res, _, _ = login_user(client, " case@example.com ", "segredo123")
+    assert res.status_code == 200
+
+    res = client.post("/api/auth/register", json={"name": "Outro", "email": "CASE@example.com", "password": "segredo123"})
+    assert res.status_code == 400
+    assert res.get_json()["error_type"] == "email_already_exists"
@@ -9,6 +9,7 @@ Padrão seguido:
 - Mesmo estilo dos demais testes (client, prints, asserts diretos)
 - Comentários curtos explicando cada cenário
 """
+import json
 import pytest
 
 
@@ -69,6 +70,27 @@ def test_update_memory_success(client, create_test_user):
     assert res.status_code == 200
 
 
+def test_update_memory_internal_fields(client, create_test_user):
+    # Cenário: PUT só altera campos editáveis; colunas internas são ignoradas ou recusadas
+    print("Testando: Atualizar memória (campos internos)")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    mem_id = client.post("/api/memories", headers=headers, json={
+        "title": "X", "date": "2024-01-10", "lat": -23.5505, "lng": -46.6333
+    }).get_json()["memory"]["id"]
+
+    for body in ({"lat_e7": 0, "lng_e7": 0}, {"deleted_at": "2024-01-01"}, {"media": ["x"]}):
+        res = client.put(f"/api/memories/{mem_id}", headers=headers, json=body)
+        assert res.status_code == 400
+    res = client.put(f"/api/memories/{mem_id}", headers=headers,
+                     json={"title": "Y", "lat_e7": 0, "deleted_at": "2024-01-01", "media": ["x"]})
+    assert res.status_code == 200 and res.get_json()["memory"]["title"] == "Y"
+    assert client.put(f"/api/memories/{mem_id}", headers=headers, json={"lat": 200}).status_code == 400
+
+    res = client.get("/api/memories/nearby?lat=-23.5505&lng=-46.6333&radius_m=100", headers=headers)
+    assert [m["id"] for m in res.get_json()["memories"]] == [mem_id]
+
+
 def test_update_memory_nonexistent(client, create_test_user):
     # Cenário: tentativa de atualizar um recurso inexistente
     print("Testando: Atualizar memória (ID inexistente)")
@@ -108,3 +130,532 @@ def test_delete_memory_other_user(client, create_test_user):
     _, _, token2 = create_test_user(client, email="u2@example.com")
     res = client.delete(f"/api/memories/{mem_id}", headers={"Authorization": f"Bearer {token2}"})
     assert res.status_code in (403, 404)
+
+
+def test_list_memories_cursor_pagination(client, create_test_user):
+    # Cenário: paginação por cursor percorre todas as memórias sem repetição
+    print("Testando: Listar memórias (paginação por cursor)")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for day in (1, 2, 2, 3, 4):
+        client.post(
+            "/api/memories",
+            headers=headers,
+            json={"title": f"M{day}", "date": f"2024-01-0{day}", "lat": 1, "lng": 1},
+        )
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/memories?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        res = client.get(url, headers=headers)
+        assert res.status_code == 200
+        body = res.get_json()
+        seen.extend(m["id"] for m in body["memories"])
+        cursor = body["next_cursor"]
+        if not body["has_next"]:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    res = client.get("/api/memories?cursor=invalido", headers=headers)
+    assert res.status_code == 400
+
+
+def test_list_memory_markers(client, create_test_user):
+    # Cenário: projeção de marcadores retorna apenas os campos do mapa
+    print("Testando: Listar marcadores do mapa")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "X", "date": "2024-01-10", "lat": 1, "lng": 2, "description": "longa"},
+    )
+    res = client.get("/api/memories/markers", headers=headers)
+    assert res.status_code == 200
+    markers = res.get_json()["markers"]
+    assert len(markers) == 1
+    assert set(markers[0]) == {"id", "title", "date", "lat", "lng", "color"}
+
+
+def test_heavy_columns_deferred_by_default(app, client, create_test_user):
+    # Cenário: colunas pesadas só são carregadas quando pedidas via include
+    print("Testando: Colunas pesadas adiadas por padrão")
+    _, data, token = create_test_user(client)
+    client.post(
+        "/api/memories",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "X", "date": "2024-01-10", "lat": 1, "lng": 1, "description": "D"},
+    )
+    from src.repositories.memory_repository import MemoryRepository
+    with app.app_context():
+        repo = MemoryRepository()
+        user_id = data["user"]["id"]
+        lean = repo.get_by_user(user_id)[0]
+        assert "description" not in lean.__dict__
+        full = repo.get_by_user(user_id, include=("description", "photos", "music"))[0]
+        assert full.__dict__["description"] == "D"
+        with pytest.raises(ValueError):
+            repo.get_by_user(user_id, include=("title_inexistente",))
+
+
+def test_list_memories_etag_not_modified(client, create_test_user):
+    # Cenário: If-None-Match com ETag atual retorna 304; após escrita volta a 200
+    print("Testando: Listar memórias (ETag / 304)")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.get("/api/memories", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    cached = client.get("/api/memories", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "X", "date": "2024-01-10", "lat": 1, "lng": 1},
+    )
+    changed = client.get("/api/memories", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_nearby_memories_radius_m(client, create_test_user):
+    # Cenário: busca por raio real em metros filtra e ordena por distância
+    print("Testando: Buscar memórias próximas (radius_m)")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    # ~111 m e ~1,1 km ao norte do centro, e outra em outro continente
+    for title, lat, lng in (("perto", -23.5495, -46.6333), ("medio", -23.5405, -46.6333), ("longe", 48.85, 2.35)):
+        client.post(
+            "/api/memories",
+            headers=headers,
+            json={"title": title, "date": "2024-01-10", "lat": lat, "lng": lng},
+        )
+    res = client.get("/api/memories/nearby?lat=-23.5505&lng=-46.6333&radius_m=2000", headers=headers)
+    assert res.status_code == 200
+    memories = res.get_json()["memories"]
+    assert [m["title"] for m in memories] == ["perto", "medio"]
+    assert 100 < memories[0]["distance_m"] < 125
+    assert "lat_e7" not in memories[0]
+
+
+def test_nearest_memories_knn(client, create_test_user):
+    # Cenário: k vizinhos mais próximos, refletindo criação e exclusão
+    print("Testando: Buscar k memórias mais próximas")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    ids = {}
+    for title, lat in (("a", 0.001), ("b", 0.002), ("c", 0.003)):
+        res = client.post(
+            "/api/memories",
+            headers=headers,
+            json={"title": title, "date": "2024-01-10", "lat": lat, "lng": 10},
+        )
+        ids[title] = res.get_json()["memory"]["id"]
+
+    res = client.get("/api/memories/nearest?lat=0&lng=10&k=2", headers=headers)
+    assert res.status_code == 200
+    assert [m["title"] for m in res.get_json()["memories"]] == ["a", "b"]
+
+    client.delete(f"/api/memories/{ids['a']}", headers=headers)
+    res = client.get("/api/memories/nearest?lat=0&lng=10&k=2", headers=headers)
+    assert [m["title"] for m in res.get_json()["memories"]] == ["b", "c"]
+
+
+def test_search_memories_full_text(monkeypatch, client, create_test_user):
+    # Cenário: busca textual sem acentos, por prefixo, refletindo edições
+    print("Testando: Buscar memórias por texto")
+    _, other_data, other_token = create_test_user(client)
+    client.post(
+        "/api/memories",
+        headers={"Authorization": f"Bearer {other_token}"},
+        json={"title": "Praia de outro usuário", "date": "2024-01-11", "lat": 1, "lng": 1},
+    )
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "Viagem a São Paulo", "date": "2024-01-10", "lat": 1, "lng": 1,
+              "description": "Passeio na Avenida Paulista"},
+    )
+    mem_id = res.get_json()["memory"]["id"]
+    client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "Praia", "date": "2024-01-11", "lat": 1, "lng": 1},
+    )
+
+    res = client.get("/api/memories/search?q=sao paul", headers=headers)
+    assert res.status_code == 200
+    assert [m["id"] for m in res.get_json()["memories"]] == [mem_id]
+
+    client.put(f"/api/memories/{mem_id}", headers=headers, json={"title": "Viagem ao Rio"})
+    res = client.get("/api/memories/search?q=rio", headers=headers)
+    assert [m["id"] for m in res.get_json()["memories"]] == [mem_id]
+
+    res = client.get("/api/memories/search", headers=headers)
+    assert res.status_code == 400
+
+    # Apenas memórias do usuário; o token do dono não casa como termo de busca
+    res = client.get("/api/memories/search?q=praia", headers=headers)
+    assert len(res.get_json()["memories"]) == 1
+    res = client.get(f"/api/memories/search?q=u{other_data['user']['id']}", headers=headers)
+    assert res.get_json()["memories"] == []
+
+    # Banco sem índice textual: LIKE sobre memories
+    from src.utils import search_index
+    monkeypatch.setattr(search_index, "_dialect", lambda executor: "mysql")
+    res = client.get("/api/memories/search?q=viagem rio", headers=headers)
+    assert [(m["id"], m["rank"]) for m in res.get_json()["memories"]] == [(mem_id, 0.0)]
+
+
+def test_import_memories_ndjson(client, create_test_user):
+    # Cenário: importação NDJSON cria linhas válidas e reporta erros por linha
+    print("Testando: Importar memórias (NDJSON)")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    body = "\n".join([
+        json.dumps({"title": "A", "date": "2024-01-10", "lat": 1, "lng": 1, "description": "café"}),
+        "nao-e-json",
+        json.dumps({"title": "B", "date": "2024-13-40", "lat": 1, "lng": 1}),
+        json.dumps({"title": "C", "date": "2024-01-12", "lat": 2, "lng": 2}),
+    ])
+    res = client.post(
+        "/api/memories/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        data=body,
+    )
+    assert res.status_code == 200
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [item["line"] for item in lines[:-1]] == [2, 3]
+    assert lines[-1]["summary"] == {"imported": 2, "failed": 2}
+
+    listed = client.get("/api/memories", headers=headers).get_json()
+    assert listed["total"] == 2
+    found = client.get("/api/memories/search?q=cafe", headers=headers).get_json()
+    assert found["total"] == 1
+
+
+def test_export_memories_streaming(client, create_test_user):
+    # Cenário: exportação em NDJSON, GeoJSON e ZIP (com a mídia gravada em disco)
+    print("Testando: Exportar memórias (NDJSON/GeoJSON/ZIP)")
+    import io
+    import zipfile
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    photo = "data:image/png;base64,iVBORw0KGgo="
+    client.post("/api/memories", headers=headers,
+                json={"title": "Com foto", "date": "2024-01-10", "lat": 1, "lng": 2, "photos": [photo]})
+    client.post("/api/memories", headers=headers,
+                json={"title": "Sem foto", "date": "2024-01-11", "lat": 3, "lng": 4})
+
+    res = client.get("/api/memories/export", headers=headers)
+    assert res.status_code == 200
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [row["title"] for row in rows] == ["Com foto", "Sem foto"]
+
+    res = client.get("/api/memories/export?format=geojson", headers=headers)
+    collection = json.loads(res.get_data(as_text=True))
+    assert collection["features"][1]["geometry"]["coordinates"] == [4, 3]
+
+    res = client.get("/api/memories/export?format=zip", headers=headers)
+    assert res.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(res.get_data()))
+    first = json.loads(archive.read("memories.ndjson").decode("utf-8").splitlines()[0])
+    assert first["photos"][0].startswith("media/memory_")
+    assert archive.read(first["photos"][0]) == b"\x89PNG\r\n\x1a\n"
+
+    res = client.get("/api/memories/export?format=xml", headers=headers)
+    assert res.status_code == 400
+
+
+def test_batch_memory_operations(client, create_test_user):
+    # Cenário: lote com criação, atualização, remoção e operações recusadas
+    print("Testando: Lote de operações de memórias")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.post("/api/memories", headers=headers,
+                        json={"title": "Antiga", "date": "2024-01-10", "lat": 1, "lng": 1}).get_json()["memory"]
+    second = client.post("/api/memories", headers=headers,
+                         json={"title": "Apagar", "date": "2024-01-11", "lat": 2, "lng": 2}).get_json()["memory"]
+    _, _, other_token = create_test_user(client, email="outro@example.com")
+    foreign = client.post("/api/memories", headers={"Authorization": f"Bearer {other_token}"},
+                          json={"title": "Alheia", "date": "2024-01-12", "lat": 3, "lng": 3}).get_json()["memory"]
+
+    res = client.post("/api/memories/batch", headers=headers, json={"operations": [
+        {"op": "create", "client_id": "tmp-1", "data": {"title": "Nova", "date": "2024-02-01", "lat": 4, "lng": 4}},
+        {"op": "update", "id": first["id"], "data": {"title": "Renomeada"}},
+        {"op": "delete", "id": second["id"]},
+        {"op": "delete", "id": foreign["id"]},
+        {"op": "update", "id": first["id"], "data": {"lat": 200}},
+    ]})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert [r["status"] for r in body["results"]] == [201, 200, 200, 404, 400]
+    assert body["results"][0]["client_id"] == "tmp-1"
+    assert body["results"][1]["memory"]["title"] == "Renomeada"
+    assert body["applied"] == 3 and body["failed"] == 2
+
+    titles = sorted(m["title"] for m in client.get("/api/memories", headers=headers).get_json()["memories"])
+    assert titles == ["Nova", "Renomeada"]
+
+
+def test_list_memories_date_range(client, create_test_user):
+    # Cenário: filtro por período sobre a coluna DATE (e data inválida recusada)
+    print("Testando: Listar memórias por período")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for day in ("2024-01-05", "2024-01-15", "2024-02-01"):
+        client.post("/api/memories", headers=headers, json={"title": day, "date": day, "lat": 1, "lng": 1})
+
+    res = client.get("/api/memories?start_date=2024-01-01&end_date=2024-01-31", headers=headers)
+    assert sorted(m["date"] for m in res.get_json()["memories"]) == ["2024-01-05", "2024-01-15"]
+
+    res = client.get("/api/memories?start_date=01/01/2024&end_date=2024-01-31", headers=headers)
+    assert res.status_code == 400
+
+
+def test_list_memories_date_range_paged(client, create_test_user):
+    # Cenário: paginação por cursor respeita o período (memórias fora dele não aparecem)
+    print("Testando: Listar memórias por período com paginação")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for day in ("2020-06-01", "2024-01-05", "2024-01-15", "2024-02-01"):
+        client.post("/api/memories", headers=headers, json={"title": day, "date": day, "lat": 1, "lng": 1})
+
+    url = "/api/memories?start_date=2024-01-01&end_date=2024-12-31&limit=2"
+    first = client.get(url, headers=headers).get_json()
+    assert [m["date"] for m in first["memories"]] == ["2024-02-01", "2024-01-15"] and first["has_next"]
+    rest = client.get(f"{url}&cursor={first['next_cursor']}", headers=headers).get_json()
+    assert [m["date"] for m in rest["memories"]] == ["2024-01-05"] and not rest["has_next"]
+
+    res = client.get("/api/memories?start_date=01/01/2024&end_date=2024-12-31&limit=2", headers=headers)
+    assert res.status_code == 400
+
+
+def test_memory_stats_aggregates(client, create_test_user):
+    # Cenário: agregados acompanham criação, edição e remoção de memórias
+    print("Testando: Estatísticas agregadas de memórias")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.post("/api/memories", headers=headers, json={
+        "title": "A", "date": "2023-05-01", "lat": -10, "lng": 20,
+        "photos": ["/static/uploads/photos/a.jpg", "/static/uploads/videos/b.mp4"],
+    }).get_json()["memory"]
+    client.post("/api/memories", headers=headers, json={
+        "title": "B", "date": "2024-01-15", "lat": 10, "lng": 40,
+        "music": {"spotify_id": "abc123", "title": "Song", "artist": "Artist"},
+    })
+    client.post("/api/memories", headers=headers, json={"title": "C", "date": "2024-01-20", "lat": 0.5, "lng": 30})
+
+    stats = client.get("/api/memories/stats", headers=headers).get_json()
+    assert stats["total_memories"] == 3
+    assert stats["by_year"] == {"2023": 1, "2024": 2}
+    assert stats["by_month"]["2024-01"] == 2
+    assert stats["media"] == {"photos": 1, "videos": 1, "memories_with_music": 1}
+    assert stats["bounds"] == {"min_lat": -10, "max_lat": 10, "min_lng": 20, "max_lng": 40}
+    assert stats["first_date"] == "2023-05-01" and stats["last_date"] == "2024-01-20"
+    assert abs(stats["centroid"]["lng"] - 30) < 1
+
+    client.delete(f"/api/memories/{first['id']}", headers=headers)
+    stats = client.get("/api/memories/stats", headers=headers).get_json()
+    assert stats["total_memories"] == 2
+    assert stats["by_year"] == {"2024": 2}
+    assert stats["bounds"]["min_lat"] == 0.5
+    assert stats["first_date"] == "2024-01-15"
+    assert stats["media"]["photos"] == 0
+
+
+def test_memory_stats_concurrent_first_write(monkeypatch, app, client, create_test_user):
+    # Cenário: outra transação cria os agregados entre o SELECT e o INSERT da primeira escrita
+    print("Testando: Primeira escrita concorrente dos agregados")
+    from src.app_factory import db
+    from src.models.memory_stats import MemoryStats
+    from src.repositories.memory_repository import MemoryRepository
+    _, data, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = data["user"]["id"]
+    with app.app_context():
+        MemoryStats.query.filter_by(user_id=user_id).delete()
+        db.session.commit()
+
+    build_stats = MemoryRepository._build_stats
+
+    def racing_build(self, user_id):
+        with db.engine.begin() as connection:
+            connection.execute(MemoryStats.__table__.insert().values(
+                user_id=user_id, total_memories=0, monthly_counts={}, photo_count=0, video_count=0,
+                music_count=0, sum_x=0.0, sum_y=0.0, sum_z=0.0))
+        return build_stats(self, user_id)
+    monkeypatch.setattr(MemoryRepository, "_build_stats", racing_build)
+
+    res = client.post("/api/memories", headers=headers,
+                      json={"title": "Primeira", "date": "2024-01-10", "lat": 1, "lng": 1})
+    assert res.status_code == 201
+    assert client.get("/api/memories/stats", headers=headers).get_json()["total_memories"] == 1
+
+def test_memory_timeline_buckets(client, create_test_user):
+    # Cenário: histograma por mês/semana e filtro por bbox
+    print("Testando: Linha do tempo de memórias")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for day, lat, lng in (("2024-01-03", 1, 1), ("2024-01-07", 1, 1), ("2024-01-08", 50, 50), ("2024-03-10", 1, 1)):
+        client.post("/api/memories", headers=headers, json={"title": day, "date": day, "lat": lat, "lng": lng})
+
+    res = client.get("/api/memories/timeline?bucket=month", headers=headers)
+    assert res.status_code == 200
+    assert [(t["bucket"], t["count"]) for t in res.get_json()["timeline"]] == [("2024-01", 3), ("2024-03", 1)]
+
+    weeks = client.get("/api/memories/timeline?bucket=week", headers=headers).get_json()["timeline"]
+    assert [(t["bucket"], t["count"]) for t in weeks] == [("2024-01-01", 2), ("2024-01-08", 1), ("2024-03-04", 1)]
+
+    res = client.get("/api/memories/timeline?bucket=month&bbox=0,0,10,10", headers=headers)
+    assert res.get_json()["total"] == 3
+
+    assert client.get("/api/memories/timeline?bucket=decade", headers=headers).status_code == 400
+
+
+def test_memory_serialization_shape(client, create_test_user):
+    # Cenário: serializador pré-compilado mantém o formato da API
+    print("Testando: Formato da memória serializada")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post("/api/memories", headers=headers, json={
+        "title": "Viagem à praia", "date": "2024-01-15", "lat": -23.5, "lng": -46.6,
+        "photos": ["/api/media/files/1/memory_1/videos/a.mp4"]
+    })
+    assert res.status_code == 201
+
+    memory = client.get("/api/memories", headers=headers).get_json()["memories"][0]
+    assert memory["title"] == "Viagem à praia"
+    assert memory["date"] == "2024-01-15"
+    assert memory["created_at"].endswith(" GMT")
+    assert "spotifyUrl" in memory and "spotify_url" not in memory
+    assert not {"user_id", "lat_e7", "lng_e7"} & memory.keys()
+    assert memory["photos"] is None and memory["videos"] == ["/api/media/files/1/memory_1/videos/a.mp4"]
+
+
+def test_memory_media_rows(app, client, create_test_user):
+    # Cenário: mídias normalizadas em memory_media, com o formato photos/videos mantido
+    print("Testando: Tabela memory_media")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post("/api/memories", headers=headers, json={
+        "title": "Mídias", "date": "2024-01-10", "lat": 1, "lng": 1,
+        "photos": ["data:image/png;base64,iVBORw0KGgo="],
+        "videos": ["https://cdn.example.com/clip.mp4"]
+    })
+    memory_id = res.get_json()["memory"]["id"]
+
+    from src.app_factory import db
+    from src.models import MemoryMedia
+    from src.repositories.memory_repository import MemoryRepository
+    with app.app_context():
+        rows = MemoryMedia.query.filter_by(memory_id=memory_id).order_by(MemoryMedia.position).all()
+        assert [(row.kind, row.mime, row.bytes) for row in rows] == [
+            ("photo", "image/png", 8), ("video", "video/mp4", None)
+        ]
+        assert len(rows[0].sha256) == 64
+        photo_id = rows[0].id
+        # Linha migrada da coluna photos (só tipo e URL): o backfill completa o resto
+        rows[0].sha256 = rows[0].bytes = None
+        db.session.commit()
+        assert MemoryRepository().backfill_media_metadata() == 1
+        assert db.session.get(MemoryMedia, photo_id).bytes == 8
+
+    memory = client.get("/api/memories", headers=headers).get_json()["memories"][0]
+    photo_url = memory["photos"][0]
+    assert memory["videos"] == ["https://cdn.example.com/clip.mp4"]
+
+    # Atualização mantém a linha (e os metadados) das mídias que continuam
+    res = client.put(f"/api/memories/{memory_id}", headers=headers, json={"photos": [photo_url], "videos": []})
+    assert res.get_json()["memory"]["videos"] is None
+    with app.app_context():
+        assert [row.id for row in MemoryMedia.query.filter_by(memory_id=memory_id)] == [photo_id]
+
+    client.delete(f"/api/memories/{memory_id}", headers=headers)
+    from src.utils.memory_purger import MemoryPurger
+    with app.app_context():
+        MemoryPurger(grace_seconds=0, pause=0).run_once()
+        assert MemoryMedia.query.count() == 0
+
+
+def test_memory_changes_sync(app, client, create_test_user):
+    # Cenário: sincronização incremental com token, alterações e remoções
+    print("Testando: Sincronização incremental de memórias")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    ids = [
+        client.post("/api/memories", headers=headers, json={
+            "title": f"M{i}", "date": "2024-01-10", "lat": 1, "lng": 1
+        }).get_json()["memory"]["id"]
+        for i in range(3)
+    ]
+
+    first = client.get("/api/memories/changes?limit=2", headers=headers).get_json()
+    assert [m["id"] for m in first["memories"]] == ids[:2] and first["has_more"]
+    rest = client.get(f"/api/memories/changes?since={first['next_token']}", headers=headers).get_json()
+    assert [m["id"] for m in rest["memories"]] == ids[2:] and not rest["has_more"]
+    assert rest["deleted"] == []
+
+    client.put(f"/api/memories/{ids[0]}", headers=headers, json={"title": "Editada"})
+    client.delete(f"/api/memories/{ids[1]}", headers=headers)
+    changes = client.get(f"/api/memories/changes?since={rest['next_token']}", headers=headers).get_json()
+    assert [m["title"] for m in changes["memories"]] == ["Editada"]
+    assert changes["deleted"] == [ids[1]]
+
+    empty = client.get(f"/api/memories/changes?since={changes['next_token']}", headers=headers).get_json()
+    assert empty["memories"] == [] and empty["deleted"] == []
+    assert client.get("/api/memories/changes?since=invalido", headers=headers).status_code == 400
+
+    # Escrita com updated_at anterior ao token (relógio de outro worker) ainda é entregue
+    from datetime import datetime
+    from src.app_factory import db
+    from src.models.memory import Memory
+    client.put(f"/api/memories/{ids[2]}", headers=headers, json={"title": "Atrasada"})
+    with app.app_context():
+        Memory.query.filter_by(id=ids[2]).update({"updated_at": datetime(2000, 1, 1)})
+        db.session.commit()
+    late = client.get(f"/api/memories/changes?since={empty['next_token']}", headers=headers).get_json()
+    assert [m["title"] for m in late["memories"]] == ["Atrasada"]
+
+    # Token legado (updated_at, id) recomeça as memórias do início
+    from src.utils.helpers import encode_cursor
+    legacy = encode_cursor(["2024-01-01T00:00:00", ids[0], 0])
+    res = client.get(f"/api/memories/changes?since={legacy}", headers=headers).get_json()
+    assert sorted(m["id"] for m in res["memories"]) == [ids[0], ids[2]]
+
+
+def test_memory_soft_delete_and_purge(app, client, create_test_user):
+    # Cenário: remoção lógica na requisição e expurgo da linha e da pasta depois
+    print("Testando: Remoção lógica e expurgo de memórias")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    memory = client.post("/api/memories", headers=headers, json={
+        "title": "Com foto", "date": "2024-01-10", "lat": 1, "lng": 1,
+        "photos": ["data:image/png;base64,iVBORw0KGgo="]
+    }).get_json()["memory"]
+
+    assert client.delete(f"/api/memories/{memory['id']}", headers=headers).status_code == 200
+    assert client.get(f"/api/memories/{memory['id']}", headers=headers).status_code == 404
+    assert client.get("/api/memories", headers=headers).get_json()["memories"] == []
+
+    import os
+    from src.models import Memory, MemoryMedia
+    from src.utils.media_manager import media_file_path
+    from src.utils.memory_purger import MemoryPurger
+    with app.app_context():
+        path = media_file_path(memory["photos"][0])
+        assert Memory.query.get(memory["id"]).deleted_at is not None and os.path.isfile(path)
+
+        purger = MemoryPurger(grace_seconds=0, pause=0)
+        assert purger.run_once() == 1
+        assert Memory.query.get(memory["id"]) is None
+        assert MemoryMedia.query.filter_by(memory_id=memory["id"]).count() == 0
+        assert not os.path.exists(path)
+        assert purger.metrics()["reclaimed_bytes"] >= 8
@@ -0,0 +1,118 @@
+"""
+Testes de migrações do banco:
+- Upgrade de um banco criado pelo esquema original (create_all, sem alembic_version)
+
+Padrão seguido:
+- Mesmo estilo dos demais testes (prints, asserts diretos)
+- Banco SQLite próprio em tmp_path (não usa o client/banco dos outros testes)
+"""
+import sqlite3
+
+import pytest
+
+from src.app_factory import create_app
+from conftest import TestConfig
+
+# Esquema gerado por db.create_all() na versão anterior às migrações
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    name VARCHAR(100) NOT NULL, email VARCHAR(120) NOT NULL, password_hash VARCHAR(128) NOT NULL,
+    is_active BOOLEAN NOT NULL, selected_gradient VARCHAR(50) NOT NULL,
+    theme_preference VARCHAR(20) NOT NULL, map_theme VARCHAR(20) NOT NULL,
+    id INTEGER NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE memories (
+    title VARCHAR(200) NOT NULL, description TEXT, date VARCHAR(10) NOT NULL,
+    lat FLOAT NOT NULL, lng FLOAT NOT NULL, photos JSON, music JSON,
+    spotify_url VARCHAR(500), color VARCHAR(7), user_id INTEGER NOT NULL,
+    id INTEGER NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id)
+);
+CREATE TABLE themes (
+    gradient_name VARCHAR(50) NOT NULL, gradient_css TEXT NOT NULL, is_active BOOLEAN NOT NULL,
+    user_id INTEGER NOT NULL, id INTEGER NOT NULL, created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL, PRIMARY KEY (id), UNIQUE (user_id),
+    FOREIGN KEY(user_id) REFERENCES users (id)
+);
+INSERT INTO users VALUES ('Ana', 'Ana@Example.com', 'hash', 1, 'aurora', 'auto', 'light', 1,
+                          '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+INSERT INTO memories VALUES ('Viagem a São Paulo', 'Paulista', '2024-01-10', -23.5505, -46.6333, '[]',
+                             NULL, NULL, '#FF6B6B', 1, 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+"""
+
+
+def _baseline_app(path, extra_sql=""):
+    # Banco no esquema original (mais extra_sql) e aplicação apontando para ele
+    connection = sqlite3.connect(path)
+    connection.executescript(BASELINE_SCHEMA + extra_sql)
+    connection.close()
+
+    class BaselineConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        AUTO_MIGRATE = False  # Como em produção: o esquema só muda na etapa release
+
+    return create_app(BaselineConfig)
+
+
+def test_release_upgrade_on_baseline_database(tmp_path):
+    # Cenário: `flask db upgrade` (etapa release) em banco criado antes das migrações
+    print("Testando: Upgrade de banco sem alembic_version")
+    path = tmp_path / "baseline.sqlite"
+    app = _baseline_app(path)
+    result = app.test_cli_runner().invoke(args=["db", "upgrade"])
+    assert result.exit_code == 0, result.output
+
+    from alembic.script import ScriptDirectory
+    from src.database import migrate
+    with app.app_context():
+        head = ScriptDirectory.from_config(migrate.get_config()).get_current_head()
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT version_num FROM alembic_version").fetchone() == (head,)
+        assert connection.execute("SELECT email_normalized FROM users").fetchone() == ("ana@example.com",)
+        assert connection.execute("SELECT date, lat_e7, deleted_at FROM memories").fetchone() == (
+            "2024-01-10", -235505000, None)
+    finally:
+        connection.close()
+
+    # Aplicação sobre o banco migrado: busca com os dados antigos
+    with app.app_context():
+        from src.repositories.memory_repository import MemoryRepository
+        items = MemoryRepository().search_memories(1, "sao paul")["items"]
+        assert [memory.id for memory, _ in items] == [1]
+
+
+def test_upgrade_legacy_dates(tmp_path):
+    # Cenário: datas gravadas em texto livre antes do tipo DATE
+    print("Testando: Upgrade com datas legadas fora do formato")
+    path = tmp_path / "dates.sqlite"
+    app = _baseline_app(path, """
+        INSERT INTO memories VALUES ('Com hora', NULL, '2024-02-01T10:00', 1, 1, '[]', NULL, NULL, NULL, 1, 2,
+                                     '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+        INSERT INTO memories VALUES ('Ambígua', NULL, '10/01/2024', 1, 1, '[]', NULL, NULL, NULL, 1, 3,
+                                     '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+    """)
+    from alembic import command
+    from src.database import migrate
+    with app.app_context(), pytest.raises(RuntimeError, match=r"\(ids: 3\)"):
+        command.upgrade(migrate.get_config(), "head")  # Sem o catch_errors do Flask-Migrate
+
+    # Após a correção manual, a migração continua de onde parou
+    connection = sqlite3.connect(path)
+    connection.execute("UPDATE memories SET date = '2024-01-10' WHERE id = 3")
+    connection.commit()
+    connection.close()
+    result = app.test_cli_runner().invoke(args=["db", "upgrade"])
+    assert result.exit_code == 0, result.output
+
+    connection = sqlite3.connect(path)
+    try:
+        assert connection.execute("SELECT id, date FROM memories ORDER BY id").fetchall() == [
+            (1, "2024-01-10"), (2, "2024-02-01"), (3, "2024-01-10")]
+    finally:
+        connection.close()
+    with app.app_context():
+        from src.repositories.memory_repository import MemoryRepository
+        assert len(MemoryRepository().get_by_user(1)) == 3
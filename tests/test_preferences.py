@@ -28,3 +28,20 @@ def test_update_preferences_invalid_value(client, create_test_user):
         json={"selected_gradient": "invalid"},
     )
     assert res.status_code == 400
+
+
+def test_preferences_cache_invalidation(app, client, create_test_user):
+    # Cenário: leituras servidas pelo cache de identidade refletem a atualização
+    print("Testando: Preferências (cache de identidade)")
+    from src.utils.identity_cache import identity_cache
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/auth/me", headers=headers)
+    hits = identity_cache.users.hits
+    assert client.get("/api/auth/preferences", headers=headers).status_code == 200
+    assert identity_cache.users.hits == hits + 1
+
+    res = client.put("/api/auth/preferences", headers=headers, json={"map_theme": "dark"})
+    assert res.status_code == 200
+    res = client.get("/api/auth/preferences", headers=headers)
+    assert res.get_json()["preferences"]["map_theme"] == "dark"
@@ -5,6 +5,7 @@ Testes de upload de vídeos na memória:
 - Exclusão de vídeo anexado à memória (via edição)
 """
 import io
+import os
 import pytest
 
 
@@ -100,3 +101,171 @@ def test_delete_video_from_memory(monkeypatch, client, create_test_user):
     mem = get_res.get_json()["memory"]
     # Após remoção, esperamos photos ausente ou vazio; videos não é preenchido por URL simples
     assert mem.get("photos") in (None, [])
+
+
+def test_inline_media_stored_on_disk(client, create_test_user):
+    # Cenário: mídia enviada em base64 é gravada em disco e a memória guarda só a URL
+    print("Testando: Armazenamento de mídia base64 em disco")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    create_res = client.post(
+        "/api/memories",
+        headers=headers,
+        json={
+            "title": "Mem com foto",
+            "date": "2024-01-10",
+            "lat": 1,
+            "lng": 1,
+            "photos": ["data:image/png;base64,aGVsbG8="],
+            "videos": ["data:video/mp4;base64,dmlkZW8="],
+        },
+    )
+    assert create_res.status_code == 201
+    mem = create_res.get_json()["memory"]
+    assert mem["photos"][0].startswith("http://localhost/api/media/user_")
+    assert "/photos/" in mem["photos"][0]
+    assert "/videos/" in mem["videos"][0]
+
+    media_res = client.get(mem["photos"][0])
+    assert media_res.status_code == 200
+    assert media_res.data == b"hello"
+
+
+def test_inline_media_mime_allowlist(app, client, create_test_user):
+    # Cenário: data URLs fora de imagens raster/vídeos são recusadas e não viram arquivo servido
+    print("Testando: Tipos de mídia base64 permitidos")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for payload in ("data:text/html;base64,PHNjcmlwdD4=", "data:image/svg+xml;base64,PHN2Zz4="):
+        res = client.post(
+            "/api/memories",
+            headers=headers,
+            json={"title": "XSS", "date": "2024-01-10", "lat": 1, "lng": 1, "photos": [payload]},
+        )
+        assert res.status_code == 400
+        assert "não suportado" in res.get_json()["error"]
+
+    res = client.post(
+        "/api/memories/batch",
+        headers=headers,
+        json={"operations": [{"op": "create", "data": {"title": "XSS", "date": "2024-01-10", "lat": 1, "lng": 1,
+                                                         "photos": ["data:text/html;base64,PHNjcmlwdD4="]}}]},
+    )
+    assert res.get_json()["results"][0]["status"] == 400
+
+    # Arquivo já gravado com extensão perigosa não é servido
+    from src.utils.media_manager import build_memory_dirs
+    with app.app_context():
+        _, photos_dir, _ = build_memory_dirs(999, 999)
+    with open(os.path.join(photos_dir, "page.html"), "w") as f:
+        f.write("<script>alert(1)</script>")
+    assert client.get("/api/media/user_999/memory_999/photos/page.html").status_code == 404
+    with app.app_context():
+        from src.utils.media_manager import remove_memory_dir
+        remove_memory_dir(999, 999)
+
+
+def test_media_links_signed_and_private(app, client, create_test_user):
+    # Cenário: mídia só é servida com link assinado e válido, sem cache compartilhado
+    print("Testando: Links de mídia assinados")
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "Foto", "date": "2024-01-10", "lat": 1, "lng": 1,
+              "photos": ["data:image/png;base64,aGVsbG8="]},
+    )
+    memory = res.get_json()["memory"]
+    url = memory["photos"][0]
+    path, _, query = url.partition("?")
+
+    res = client.get(url)
+    assert res.status_code == 200
+    assert "private" in res.headers["Cache-Control"] and "public" not in res.headers["Cache-Control"]
+    assert client.get(path).status_code == 403
+    assert client.get(url[:-1] + ("0" if url[-1] != "0" else "1")).status_code == 403
+    expired = query.replace("expires=", "expires=1", 1)  # Outra validade invalida a assinatura
+    assert client.get(f"{path}?{expired}").status_code == 403
+
+    # O link público volta à forma gravada na edição; mídia de outro usuário é recusada
+    res = client.put(f"/api/memories/{memory['id']}", headers=headers, json={"photos": [url]})
+    assert res.status_code == 200
+    assert res.get_json()["memory"]["photos"][0].split("?")[0] == path
+    res = client.put(f"/api/memories/{memory['id']}", headers=headers,
+                     json={"photos": ["/api/media/user_999/memory_1/photos/x.png"]})
+    assert res.status_code == 400
+
+
+def test_update_media_files_cleanup(monkeypatch, app, client, create_test_user):
+    # Cenário: foto substituída sai do disco; arquivo gravado por edição desfeita também
+    print("Testando: Limpeza de mídias na edição")
+    from src.repositories.memory_repository import MemoryRepository
+    from src.utils.media_manager import media_file_path
+    _, _, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    res = client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "Foto", "date": "2024-01-10", "lat": 1, "lng": 1,
+              "photos": ["data:image/png;base64,YQ=="]},
+    )
+    memory = res.get_json()["memory"]
+    with app.test_request_context():
+        first = media_file_path(memory["photos"][0])
+    assert os.path.isfile(first)
+
+    res = client.put(f"/api/memories/{memory['id']}", headers=headers,
+                     json={"photos": ["data:image/png;base64,Yg=="]})
+    assert res.status_code == 200
+    with app.test_request_context():
+        second = media_file_path(res.get_json()["memory"]["photos"][0])
+    assert os.path.isfile(second) and not os.path.exists(first)
+
+    def fail(self, user_id):
+        raise RuntimeError("falha no commit")
+    monkeypatch.setattr(MemoryRepository, "_touch_collection", fail)
+    photos_dir = os.path.dirname(second)
+    before = set(os.listdir(photos_dir))
+    res = client.put(f"/api/memories/{memory['id']}", headers=headers,
+                     json={"photos": ["data:image/png;base64,Yw=="]})
+    assert res.status_code == 500
+    assert set(os.listdir(photos_dir)) == before and os.path.isfile(second)
+
+
+def test_batch_media_cleanup_and_validation(app, client, create_test_user):
+    # Cenário: lote desfeito (memória inválida no repositório) não deixa arquivos; lote aplicado remove a foto substituída
+    print("Testando: Limpeza de mídias e validação no lote")
+    from src.repositories.memory_repository import MemoryRepository
+    from src.utils.media_manager import media_file_path
+    _, data, token = create_test_user(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    memory = client.post(
+        "/api/memories",
+        headers=headers,
+        json={"title": "Foto", "date": "2024-01-10", "lat": 1, "lng": 1,
+              "photos": ["data:image/png;base64,YQ=="]},
+    ).get_json()["memory"]
+    with app.test_request_context():
+        first = media_file_path(memory["photos"][0])
+    photos_dir = os.path.dirname(first)
+    before = set(os.listdir(photos_dir))
+
+    with app.app_context():
+        try:
+            MemoryRepository().apply_batch(data["user"]["id"], [
+                {"op": "update", "id": memory["id"], "fields": {"photos": ["data:image/png;base64,Yg=="]}},
+                {"op": "update", "id": memory["id"], "fields": {"lat": 200}},
+            ])
+            assert False, "lote inválido deveria falhar"
+        except ValueError:
+            pass
+    assert set(os.listdir(photos_dir)) == before
+
+    res = client.post("/api/memories/batch", headers=headers, json={"operations": [
+        {"op": "update", "id": memory["id"], "data": {"photos": ["data:image/png;base64,Yw=="]}},
+    ]})
+    assert res.status_code == 200
+    with app.test_request_context():
+        second = media_file_path(res.get_json()["results"][0]["memory"]["photos"][0])
+    assert os.path.isfile(second) and not os.path.exists(first)